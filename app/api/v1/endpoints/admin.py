@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import List, Optional, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+from app.core.profiling import profile_store
+from app.models.models import User
+
+router = APIRouter()
+
+# Helper function for auth (to be implemented in auth.py)
+def get_current_user():
+    # This is a placeholder - implement proper authentication
+    return User(id=1, email="admin@example.com", role="admin")
+
+def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    query: str
+    started_at: datetime
+    status_code: Optional[int]
+    wall_ms: float
+    cpu_ms: float
+    sql_count: int
+    sql_ms: float
+    profiler: Optional[str]
+
+class ProfileDetail(ProfileSummary):
+    queries: List[Dict[str, Any]]
+    report: Optional[str]
+
+@router.get("/profiles", response_model=List[ProfileSummary])
+async def list_profiles(current_user: User = Depends(require_admin)):
+    """Most recent request profiles, newest first."""
+    return [profile.summary() for profile in profile_store.list()]
+
+@router.get("/profiles/{profile_id}", response_model=ProfileDetail)
+async def get_profile(profile_id: str, current_user: User = Depends(require_admin)):
+    """A profile with its SQL statements and profiler report."""
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return profile.as_dict()
+
+@router.get("/profiles/{profile_id}/report", response_class=PlainTextResponse)
+async def get_profile_report(profile_id: str, current_user: User = Depends(require_admin)):
+    """The raw profiler output, for reading in a terminal."""
+    profile = profile_store.get(profile_id)
+    if not profile or not profile.report:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile report not found"
+        )
+    return profile.report
+
+@router.delete("/profiles")
+async def clear_profiles(current_user: User = Depends(require_admin)):
+    profile_store.clear()
+    return {"message": "Profiles cleared"}
@@ -1,14 +1,25 @@
+import os
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import FileResponse
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from pydantic import BaseModel
-from datetime import datetime
+from typing import List, Optional, Dict, Any, Tuple
+from pydantic import BaseModel, create_model
+from datetime import datetime, timedelta
 
+from app.core.config import settings
+from app.core.responses import rows_response
+from app.core.transcripts import load_timings
 from app.db.base import get_db
-from app.models.models import Chunk, ChunkStatus, SpeakerRole, Call, User
+from app.models.models import Chunk, ChunkStatus, SpeakerRole, Call, Review, User
 
 router = APIRouter()
 
+# Helper function for auth (to be implemented in auth.py)
+def get_current_user():
+    # This is a placeholder - implement proper authentication
+    return User(id=1, email="admin@example.com", role="admin")
+
 class ChunkResponse(BaseModel):
     id: int
     call_id: int
@@ -19,22 +30,107 @@ class ChunkResponse(BaseModel):
     corrected_text: Optional[str]
     speaker_role: str
     status: str
+    confidence: Optional[float] = None
+    avg_logprob: Optional[float] = None
+    no_speech_prob: Optional[float] = None
+    compression_ratio: Optional[float] = None
+    review_priority: Optional[float] = None
+    lease_expires_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
 
+class CallSummary(BaseModel):
+    id: int
+    original_filename: str
+    duration: Optional[float]
+    language: Optional[str]
+    status: str
+
+class ReviewSummary(BaseModel):
+    id: int
+    reviewer_id: int
+    notes: Optional[str]
+    changes: Optional[Any]
+    created_at: datetime
+
+# Shape of a list_chunks row for the OpenAPI schema: the requested fields
+# (id always) plus the embedded call/reviews when asked for
+ChunkListItem = create_model(
+    "ChunkListItem",
+    id=(int, ...),
+    **{
+        name: (Optional[field.annotation], None)
+        for name, field in ChunkResponse.model_fields.items()
+        if name != "id"
+    },
+    call=(Optional[CallSummary], None),
+    reviews=(Optional[List[ReviewSummary]], None),
+)
+
+# Fields list_chunks can project (all plain Chunk columns) and related data
+# it can embed
+CHUNK_FIELDS = tuple(ChunkResponse.model_fields)
+CHUNK_INCLUDES = ("call", "reviews")
+CALL_SUMMARY_FIELDS = tuple(CallSummary.model_fields)
+REVIEW_SUMMARY_FIELDS = tuple(ReviewSummary.model_fields)
+
+def parse_list_param(value: Optional[str], allowed: Tuple[str, ...], name: str) -> Tuple[str, ...]:
+    """Split a comma-separated query parameter, rejecting unknown entries."""
+    if not value:
+        return ()
+    items = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = [item for item in items if item not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown {name}: {', '.join(unknown)} (allowed: {', '.join(allowed)})"
+        )
+    # Keep the canonical field order whatever order they were asked in
+    return tuple(item for item in allowed if item in items)
+
+class WordTiming(BaseModel):
+    word: str
+    start: float
+    end: float
+    probability: float
+    segment: int
+
+class SegmentTiming(BaseModel):
+    text: str
+    start: float
+    end: float
+    avg_logprob: float
+    no_speech_prob: float
+    compression_ratio: float
+
+class ChunkTimingsResponse(BaseModel):
+    chunk_id: int
+    segments: List[SegmentTiming]
+    words: List[WordTiming]
+
 class UpdateChunkRequest(BaseModel):
     corrected_text: Optional[str] = None
     speaker_role: Optional[SpeakerRole] = None
     status: Optional[ChunkStatus] = None
 
-@router.get("/", response_model=List[ChunkResponse])
+@router.get(
+    "/",
+    response_model=None,
+    responses={200: {
+        "model": List[ChunkListItem],
+        "description": "Chunks with the fields selected by `fields` (all by default) and the data named in `include`",
+    }}
+)
 async def list_chunks(
     call_id: Optional[int] = None,
     status: Optional[ChunkStatus] = None,
     speaker_role: Optional[SpeakerRole] = None,
+    sort_by: Optional[str] = Query(None, pattern="^(confidence|priority|start_time)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    include: Optional[str] = Query(None, description="Comma-separated related data: call, reviews"),
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
@@ -42,8 +138,26 @@ async def list_chunks(
 ):
     """
     List chunks with optional filtering.
+    
+    sort_by=confidence returns the least confident transcriptions first.
+    
+    fields=id,start_time,status returns only those fields (id is always
+    included); include=call,reviews embeds the chunk's call and its
+    reviews. Only the needed columns are selected and rows are encoded
+    straight to JSON without loading ORM objects: one query, plus one for
+    reviews when requested.
     """
-    query = db.query(Chunk)
+    selected = parse_list_param(fields, CHUNK_FIELDS, "fields") or CHUNK_FIELDS
+    if "id" not in selected:
+        selected = ("id",) + selected
+    included = parse_list_param(include, CHUNK_INCLUDES, "include")
+    
+    columns = [getattr(Chunk, name) for name in selected]
+    if "call" in included:
+        columns += [getattr(Call, name).label(f"call__{name}") for name in CALL_SUMMARY_FIELDS]
+    query = db.query(*columns)
+    if "call" in included:
+        query = query.join(Call, Chunk.call_id == Call.id)
     
     if call_id is not None:
         query = query.filter(Chunk.call_id == call_id)
@@ -54,7 +168,79 @@ async def list_chunks(
     if speaker_role is not None:
         query = query.filter(Chunk.speaker_role == speaker_role)
     
-    chunks = query.offset(skip).limit(limit).all()
+    if sort_by == "confidence":
+        query = query.order_by(Chunk.confidence.asc().nullslast(), Chunk.id)
+    elif sort_by == "priority":
+        query = query.order_by(Chunk.review_priority.desc(), Chunk.id)
+    elif sort_by == "start_time":
+        query = query.order_by(Chunk.call_id, Chunk.start_time)
+    
+    rows = query.offset(skip).limit(limit).all()
+    
+    if included:
+        items = [dict(row._mapping) for row in rows]
+        if "call" in included:
+            for item in items:
+                item["call"] = {name: item.pop(f"call__{name}") for name in CALL_SUMMARY_FIELDS}
+        if "reviews" in included:
+            reviews: Dict[int, List[Dict[str, Any]]] = {}
+            if items:
+                review_rows = (
+                    db.query(Review.chunk_id, *[getattr(Review, name) for name in REVIEW_SUMMARY_FIELDS])
+                    .filter(Review.chunk_id.in_([item["id"] for item in items]))
+                    .order_by(Review.chunk_id, Review.created_at)
+                    .all()
+                )
+                for review in review_rows:
+                    data = dict(review._mapping)
+                    reviews.setdefault(data.pop("chunk_id"), []).append(data)
+            for item in items:
+                item["reviews"] = reviews.get(item["id"], [])
+        rows = items
+    
+    return rows_response(rows)
+
+@router.post("/queue/next", response_model=List[ChunkResponse])
+async def lease_next_chunks(
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Lease the highest-priority pending chunks for review.
+    
+    Rows are locked with FOR UPDATE SKIP LOCKED so concurrent reviewers
+    never receive the same chunk; the lease expires after
+    REVIEW_LEASE_SECONDS if the reviewer walks away. Chunks already leased
+    by the caller are handed back to them.
+    """
+    now = datetime.utcnow()
+    chunks = (
+        db.query(Chunk)
+        .filter(Chunk.status == ChunkStatus.PENDING)
+        .filter(or_(
+            Chunk.lease_expires_at.is_(None),
+            Chunk.lease_expires_at < now,
+            Chunk.leased_by_id == current_user.id
+        ))
+        .order_by(Chunk.review_priority.desc(), Chunk.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    
+    expires_at = now + timedelta(seconds=settings.REVIEW_LEASE_SECONDS)
+    if chunks:
+        # A lease is not a content change: keeping updated_at stops leased
+        # chunks from showing up in the next incremental export
+        db.query(Chunk).filter(Chunk.id.in_([chunk.id for chunk in chunks])).update({
+            Chunk.leased_by_id: current_user.id,
+            Chunk.lease_expires_at: expires_at,
+            Chunk.updated_at: Chunk.updated_at,
+        }, synchronize_session=False)
+    
+    # Expires the loaded chunks, so they are returned with their leases
+    db.commit()
     return chunks
 
 @router.get("/{chunk_id}", response_model=ChunkResponse)
@@ -100,6 +286,11 @@ async def update_chunk(
     
     if update_data.status is not None:
         chunk.status = update_data.status
+        
+        # Reviewed chunks leave the queue, so drop any lease on them
+        if chunk.status != ChunkStatus.PENDING:
+            chunk.leased_by_id = None
+            chunk.lease_expires_at = None
     
     db.commit()
     db.refresh(chunk)
@@ -115,20 +306,34 @@ async def get_chunk_audio(
     """
     Get the audio file for a specific chunk.
     """
-    chunk = db.query(Chunk).filter(Chunk.id == chunk_id).first()
-    if not chunk or not os.path.exists(chunk.file_path):
+    file_path = db.query(Chunk.file_path).filter(Chunk.id == chunk_id).scalar()
+    if not file_path or not os.path.exists(file_path):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chunk audio not found"
         )
     
     return FileResponse(
-        chunk.file_path,
+        file_path,
         media_type="audio/wav",
         filename=f"chunk_{chunk_id}.wav"
     )
 
-# Helper function for auth (to be implemented in auth.py)
-def get_current_user():
-    # This is a placeholder - implement proper authentication
-    return User(id=1, email="admin@example.com", role="admin")
+@router.get("/{chunk_id}/timings", response_model=ChunkTimingsResponse)
+async def get_chunk_timings(
+    chunk_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get segment- and word-level timestamps with confidence for a chunk.
+    """
+    chunk = db.query(Chunk).filter(Chunk.id == chunk_id).first()
+    if not chunk or not chunk.timings_path or not os.path.exists(chunk.timings_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chunk timings not found"
+        )
+    
+    timings = load_timings(chunk.timings_path)
+    return ChunkTimingsResponse(chunk_id=chunk.id, **timings)
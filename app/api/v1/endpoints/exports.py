@@ -0,0 +1,129 @@
+import os
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Literal
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+from app.core.exports import find_parent_export, split_spec
+from app.db.base import get_db
+from app.models.models import EXPORT_FORMATS, Export, User
+from app.tasks.celery_app import celery_app
+
+router = APIRouter()
+
+# Helper function for auth (to be implemented in auth.py)
+def get_current_user():
+    # This is a placeholder - implement proper authentication
+    return User(id=1, email="admin@example.com", role="admin")
+
+class ExportCreate(BaseModel):
+    name: str
+    description: Optional[str] = None
+    format: str = Field("webdataset", pattern=f"^({'|'.join(EXPORT_FORMATS)})$")
+    train_split: int = Field(80, ge=50, le=100)  # percent of calls in train
+    split_salt: int = Field(0, ge=0, le=65535)  # change to draw a different stable split
+    incremental: bool = False  # only export chunks changed since the last export
+    features: bool = False  # also store log-mel features + tokens for training
+    n_mels: Optional[Literal[80, 128]] = None  # defaults to what WHISPER_MODEL expects
+
+class ExportResponse(BaseModel):
+    id: int
+    name: str
+    description: Optional[str]
+    file_path: str
+    file_size: Optional[int]
+    metadata: Dict[str, Any] = Field(default_factory=dict, validation_alias="metadata_")
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+@router.post("/", response_model=ExportResponse)
+async def create_export(
+    export_data: ExportCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Start a dataset export of all approved chunks.
+
+    Incremental exports extend the latest completed export of the same
+    format and keep its train/validation split: train_split and
+    split_salt default to the parent's, and other values are rejected
+    with 409.
+    """
+    train_split, split_salt = export_data.train_split, export_data.split_salt
+    if export_data.incremental:
+        parent = find_parent_export(db, export_data.format)
+        parent_split = (parent.metadata_ or {}).get("split") if parent else None
+        if parent_split:
+            requested = export_data.model_fields_set & {"train_split", "split_salt"}
+            train_split = export_data.train_split if "train_split" in requested else parent_split["train_split"]
+            split_salt = export_data.split_salt if "split_salt" in requested else parent_split["salt"]
+            if split_spec(train_split, split_salt) != parent_split:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=(
+                        f"Incremental exports keep the split of export {parent.id} "
+                        f"(train_split={parent_split['train_split']}, split_salt={parent_split['salt']})"
+                    )
+                )
+    
+    export = Export(
+        name=export_data.name,
+        description=export_data.description,
+        file_path="",
+        created_by_id=current_user.id,
+        metadata_={
+            "status": "pending",
+            "format": export_data.format,
+            "train_split": train_split,
+            "split_salt": split_salt,
+            "incremental": export_data.incremental,
+            "features": export_data.features,
+            # large-v3 is the only Whisper model trained on 128 mel bins
+            "n_mels": export_data.n_mels or (128 if "large-v3" in settings.WHISPER_MODEL else 80),
+        }
+    )
+    db.add(export)
+    db.flush()
+    
+    # Each export gets its own directory of shards plus manifest.json
+    export.file_path = os.path.join(settings.EXPORTS_DIR, f"export_{export.id:05d}")
+    db.commit()
+    db.refresh(export)
+    
+    celery_app.send_task("export_dataset_task", (export.id,))
+    
+    return export
+
+@router.get("/", response_model=List[ExportResponse])
+async def list_exports(
+    skip: int = 0,
+    limit: int = 20,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    List exports, newest first.
+    """
+    return db.query(Export).order_by(Export.id.desc()).offset(skip).limit(limit).all()
+
+@router.get("/{export_id}", response_model=ExportResponse)
+async def get_export(
+    export_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get an export with its status and shard manifest.
+    """
+    export = db.query(Export).filter(Export.id == export_id).first()
+    if not export:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not found"
+        )
+    return export
@@ -1,23 +1,37 @@
 import os
+import json
 import shutil
 import uuid
 from datetime import datetime
-from typing import List, Optional
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, status
+from typing import List, Optional, Dict, Any, AsyncIterator
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 from app.core.config import settings
-from app.db.base import get_db
+from app.core.media import AudioProbeError, probe_audio
+from app.core.progress import subscribe_progress
+from app.core.responses import rows_response
+from app.db.base import SessionLocal, get_db
 from app.models.models import Call, CallStatus, User
-from app.tasks.audio_processing import process_call_task
+from app.tasks.celery_app import celery_app, route_call
 
 router = APIRouter()
 
+# Helper function for auth (to be implemented in auth.py)
+def get_current_user():
+    # This is a placeholder - implement proper authentication
+    return User(id=1, email="admin@example.com", role="admin")
+
 class CallResponse(BaseModel):
     id: int
     original_filename: str
     status: str
+    duration: Optional[float] = None
+    chunks_ready: int = 0
+    chunks_total: Optional[int] = None
     created_at: datetime
 
 @router.post("/", response_model=CallResponse)
@@ -28,6 +42,10 @@ async def upload_file(
 ):
     """
     Upload a call audio file for processing.
+    
+    The file header is probed (no decoding) to record duration, codec,
+    sample rate and channels; unreadable files are rejected with 400
+    before any processing is queued.
     """
     # Validate file type
     allowed_extensions = {'.wav', '.mp3', '.m4a', '.ogg', '.flac'}
@@ -55,11 +73,21 @@ async def upload_file(
         # Get file size
         file_size = os.path.getsize(file_path)
         
+        try:
+            audio_info = await run_in_threadpool(probe_audio, file_path)
+        except AudioProbeError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unreadable audio file: {str(e)}"
+            )
+        
         # Create call record in database
         call = Call(
             original_filename=file.filename,
             file_path=file_path,
             file_size=file_size,
+            duration=audio_info.pop("duration") if audio_info else None,
+            metadata_={"audio": audio_info} if audio_info else {},
             uploaded_by_id=current_user.id,
             status=CallStatus.UPLOADED
         )
@@ -67,11 +95,17 @@ async def upload_file(
         db.commit()
         db.refresh(call)
         
-        # Start background task to process the call
-        process_call_task.delay(call.id)
+        # Start background task to process the call, routed by size
+        # Sent by name: importing the task module would load the audio and
+        # ASR stack into the API process
+        celery_app.send_task("process_call_task", (call.id,), **route_call(call.duration, call.file_size))
         
         return call
         
+    except HTTPException:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
     except Exception as e:
         # Clean up file if something went wrong
         if os.path.exists(file_path):
@@ -91,8 +125,13 @@ async def list_calls(
     """
     List all calls with pagination.
     """
-    calls = db.query(Call).offset(skip).limit(limit).all()
-    return calls
+    calls = (
+        db.query(*[getattr(Call, name) for name in CallResponse.model_fields])
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return rows_response(calls)
 
 @router.get("/{call_id}", response_model=CallResponse)
 async def get_call(
@@ -111,7 +150,77 @@ async def get_call(
         )
     return call
 
-# Helper function for auth (to be implemented in auth.py)
-def get_current_user():
-    # This is a placeholder - implement proper authentication
-    return User(id=1, email="admin@example.com", role="admin")
+async def call_progress_events(call_id: int, call_status: CallStatus) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """
+    Progress events for a call; calls that already finished get a single
+    terminal event instead of a subscription. None means "no news" (keepalive).
+    """
+    if call_status in (CallStatus.PROCESSED, CallStatus.FAILED):
+        yield {
+            "call_id": call_id,
+            "event": "completed" if call_status == CallStatus.PROCESSED else "failed",
+            "status": call_status.value,
+        }
+        return
+    async for event in subscribe_progress(call_id):
+        yield event
+
+@router.get("/{call_id}/events")
+async def stream_call_events(
+    call_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream processing progress for a call as server-sent events.
+    
+    Events are "stage", "chunk" (chunks_done/chunks_total/eta_seconds),
+    then "completed" or "failed", after which the stream ends.
+    """
+    call_status = db.query(Call.status).filter(Call.id == call_id).scalar()
+    # Don't hold a connection for the lifetime of the stream
+    db.close()
+    if call_status is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Call not found"
+        )
+    
+    async def event_stream():
+        async for event in call_progress_events(call_id, call_status):
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/{call_id}/ws")
+async def call_events_websocket(
+    websocket: WebSocket,
+    call_id: int,
+    current_user: User = Depends(get_current_user)
+):
+    """The same progress events as /{call_id}/events, over a WebSocket."""
+    db = SessionLocal()
+    try:
+        call_status = db.query(Call.status).filter(Call.id == call_id).scalar()
+    finally:
+        db.close()
+    
+    await websocket.accept()
+    if call_status is None:
+        await websocket.close(code=4404, reason="Call not found")
+        return
+    
+    try:
+        async for event in call_progress_events(call_id, call_status):
+            if event is not None:
+                await websocket.send_json(event)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
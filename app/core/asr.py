@@ -0,0 +1,313 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Protocol, Sequence, Tuple, Union
+
+import numpy as np
+import soundfile as sf
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# A path to an audio file, or 16 kHz mono float32 samples
+AudioInput = Union[str, np.ndarray]
+
+class ASRUnavailableError(Exception):
+    """The engine could not be reached; the work should be retried later."""
+
+class ASREngine(Protocol):
+    """
+    Speech recognition backend used by the processing pipeline.
+
+    transcribe() returns {"text", "segments"}, each segment a dict with
+    start/end, text, avg_logprob, no_speech_prob, compression_ratio and
+    words (start/end/word/probability). detect_language() returns
+    (language, probability) pairs, most likely first.
+    """
+
+    name: str
+
+    def transcribe(self, audio: AudioInput, language: Optional[str] = None) -> Dict[str, Any]:
+        ...
+
+    def transcribe_batch(
+        self, audios: Sequence[AudioInput], language: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        return [self.transcribe(audio, language=language) for audio in audios]
+
+    def detect_language(self, audio: AudioInput) -> List[Tuple[str, float]]:
+        ...
+
+def join_segments(segments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Transcription dict from segment dicts."""
+    text = " ".join(segment['text'] for segment in segments)
+    return {'text': text.strip(), 'segments': segments}
+
+class FasterWhisperEngine(ASREngine):
+    """
+    faster-whisper (CTranslate2) backend.
+
+    `model` is a size name ("large-v3", "small"), a local path or a
+    CTranslate2 model id on the Hugging Face Hub, e.g. a distilled model
+    for a fast first pass. Loaded on first use.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        device: str = "cuda",
+        compute_type: str = "float16",
+        beam_size: int = 5
+    ):
+        self.name = f"faster-whisper:{model}"
+        self.model_name = model
+        self.device = device
+        self.compute_type = compute_type
+        self.beam_size = beam_size
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from faster_whisper import WhisperModel
+                    self._model = WhisperModel(
+                        self.model_name,
+                        device=self.device,
+                        compute_type=self.compute_type
+                    )
+        return self._model
+
+    def transcribe(self, audio: AudioInput, language: Optional[str] = None) -> Dict[str, Any]:
+        segments, _ = self.model.transcribe(
+            audio,
+            language=language or settings.WHISPER_LANGUAGE,
+            beam_size=self.beam_size,
+            vad_filter=True,
+            word_timestamps=True
+        )
+        return join_segments([
+            {
+                'start': segment.start,
+                'end': segment.end,
+                'text': segment.text.strip(),
+                'avg_logprob': segment.avg_logprob,
+                'no_speech_prob': segment.no_speech_prob,
+                'compression_ratio': segment.compression_ratio,
+                'words': [
+                    {
+                        'start': word.start,
+                        'end': word.end,
+                        'word': word.word,
+                        'probability': word.probability
+                    }
+                    for word in (segment.words or [])
+                ]
+            }
+            for segment in segments
+        ])
+
+    def detect_language(self, audio: AudioInput) -> List[Tuple[str, float]]:
+        # faster-whisper 0.9 has no public detect_language; transcribe()
+        # detects eagerly and decodes lazily, so the segments are not iterated
+        _, info = self.model.transcribe(audio, language=None, vad_filter=True)
+        return getattr(info, "all_language_probs", None) or [
+            (info.language, info.language_probability)
+        ]
+
+class StubEngine(ASREngine):
+    """
+    Deterministic offline engine for tests, benchmarks and development
+    without a GPU: a 5 s segment with a word every 0.4 s for any input.
+    """
+
+    def __init__(self, language: Optional[str] = None, probability: float = 0.9):
+        self.name = "stub"
+        self.language = language or settings.WHISPER_LANGUAGE
+        self.probability = probability
+
+    def transcribe(self, audio: AudioInput, language: Optional[str] = None) -> Dict[str, Any]:
+        duration = sf.info(audio).duration if isinstance(audio, str) else len(audio) / 16000
+        segments = []
+        start = 0.0
+        index = 0
+        while start < duration:
+            end = min(start + 5.0, duration)
+            words = []
+            t = start
+            while t < end:
+                words.append({
+                    'start': t, 'end': min(t + 0.35, end), 'word': f" w{index}", 'probability': self.probability
+                })
+                t += 0.4
+                index += 1
+            segments.append({
+                'start': start,
+                'end': end,
+                'text': "".join(word['word'] for word in words).strip(),
+                'avg_logprob': -0.25,
+                'no_speech_prob': 0.02,
+                'compression_ratio': 1.4,
+                'words': words
+            })
+            start = end
+        return join_segments(segments)
+
+    def detect_language(self, audio: AudioInput) -> List[Tuple[str, float]]:
+        return [(self.language, 1.0)]
+
+def asr_jobs_key(spec: str) -> str:
+    return f"asr_jobs:{spec}"
+
+def asr_result_key(job_id: str) -> str:
+    return f"asr_result:{job_id}"
+
+class ServiceEngine(ASREngine):
+    """
+    Client of the transcription service (app.tasks.transcription_service),
+    which holds the `spec` engine in one long-lived process and
+    micro-batches chunks from all calls.
+
+    Jobs and results go through Redis lists. Audio is passed by path, so
+    the service must see the same data directory as the workers.
+    """
+
+    def __init__(self, spec: str, timeout: Optional[float] = None):
+        self.name = f"service:{spec}"
+        self.spec = spec
+        self.timeout = timeout or settings.ASR_SERVICE_TIMEOUT
+        self._redis = None
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=5)
+        return self._redis
+
+    def _send(self, kind: str, audios: Sequence[AudioInput], language: Optional[str]) -> Tuple[List[str], float]:
+        deadline = time.time() + self.timeout
+        job_ids = []
+        pipe = self.redis.pipeline()
+        for audio in audios:
+            if not isinstance(audio, str):
+                raise TypeError("The transcription service takes audio file paths")
+            job_id = uuid.uuid4().hex
+            pipe.rpush(asr_jobs_key(self.spec), json.dumps({
+                "id": job_id,
+                "kind": kind,
+                "audio": os.path.abspath(audio),
+                "language": language,
+                "deadline": deadline,
+            }))
+            job_ids.append(job_id)
+        try:
+            pipe.execute()
+        except Exception as e:
+            raise ASRUnavailableError(f"Could not queue transcription jobs: {str(e)}")
+        return job_ids, deadline
+
+    def _receive(self, job_id: str, deadline: float) -> Any:
+        try:
+            reply = self.redis.blpop(asr_result_key(job_id), timeout=max(1, int(deadline - time.time())))
+        except Exception as e:
+            raise ASRUnavailableError(f"Lost connection to the transcription service: {str(e)}")
+        if reply is None:
+            raise ASRUnavailableError(
+                f"No reply from the transcription service for {self.spec} within {self.timeout}s"
+            )
+        message = json.loads(reply[1])
+        if "error" in message:
+            raise RuntimeError(f"Transcription service: {message['error']}")
+        return message["result"]
+
+    def transcribe(self, audio: AudioInput, language: Optional[str] = None) -> Dict[str, Any]:
+        return self.transcribe_batch([audio], language=language)[0]
+
+    def transcribe_batch(
+        self, audios: Sequence[AudioInput], language: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        # Queue everything first so the service can batch it together
+        job_ids, deadline = self._send("transcribe", audios, language)
+        return [self._receive(job_id, deadline) for job_id in job_ids]
+
+    def detect_language(self, audio: AudioInput) -> List[Tuple[str, float]]:
+        job_ids, deadline = self._send("detect", [audio], None)
+        return [tuple(pair) for pair in self._receive(job_ids[0], deadline)]
+
+ENGINES = {
+    "faster-whisper": FasterWhisperEngine,
+    "stub": StubEngine,
+    "service": ServiceEngine,
+}
+
+def create_engine(
+    spec: str,
+    compute_type: Optional[str] = None,
+    beam_size: Optional[int] = None
+) -> ASREngine:
+    """
+    Build an engine from a spec "<engine>[:<model>]", e.g. "stub",
+    "faster-whisper" (WHISPER_MODEL) or "faster-whisper:small".
+    "service:<spec>" sends the work to the transcription service running
+    <spec>. compute_type and beam_size override the faster-whisper defaults.
+    """
+    kind, _, model = spec.partition(":")
+    if kind not in ENGINES:
+        raise ValueError(f"Unknown ASR engine {kind!r}; expected one of {', '.join(ENGINES)}")
+    if kind == "faster-whisper":
+        return FasterWhisperEngine(
+            model or settings.WHISPER_MODEL,
+            device=settings.WHISPER_DEVICE,
+            compute_type=compute_type or settings.WHISPER_COMPUTE_TYPE,
+            beam_size=beam_size or 5
+        )
+    if kind == "service":
+        if not model:
+            raise ValueError("The service engine needs the spec it serves, e.g. service:faster-whisper")
+        return ServiceEngine(model)
+    return ENGINES[kind]()
+
+_engines: Dict[str, ASREngine] = {}
+_engines_lock = threading.Lock()
+
+def engine_spec(queue: Optional[str] = None) -> str:
+    """The engine spec configured for a Celery queue, or the default."""
+    return settings.ASR_QUEUE_ENGINES.get(queue or "", settings.ASR_ENGINE)
+
+def get_engine(queue: Optional[str] = None) -> ASREngine:
+    """
+    The engine for a queue (see ASR_QUEUE_ENGINES), created once per
+    spec and shared by every task in the process.
+    """
+    spec = engine_spec(queue)
+    with _engines_lock:
+        if spec not in _engines:
+            logger.info(f"Using ASR engine {spec}" + (f" for queue {queue}" if queue else ""))
+            _engines[spec] = create_engine(spec)
+        return _engines[spec]
+
+def get_draft_engine() -> Optional[ASREngine]:
+    """
+    The fast first-pass engine of the transcription cascade
+    (ASR_DRAFT_ENGINE), or None when the cascade is off.
+    """
+    spec = settings.ASR_DRAFT_ENGINE
+    if not spec:
+        return None
+    key = f"draft:{spec}"
+    with _engines_lock:
+        if key not in _engines:
+            logger.info(f"Using draft ASR engine {spec}")
+            _engines[key] = create_engine(
+                spec,
+                compute_type=settings.ASR_DRAFT_COMPUTE_TYPE,
+                beam_size=settings.ASR_DRAFT_BEAM_SIZE
+            )
+        return _engines[key]
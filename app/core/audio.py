@@ -0,0 +1,77 @@
+from typing import Optional
+
+import numpy as np
+import soundfile as sf
+
+INT16_FULL_SCALE = 32768.0
+
+class AudioBuffer:
+    """
+    Mono 16-bit audio: a contiguous int16 NumPy array plus its sample rate.
+
+    Indexing with a slice returns a buffer viewing the same memory, so
+    cutting a recording into windows and chunks copies nothing until a
+    chunk is written. Positions and lengths are in samples.
+    """
+
+    __slots__ = ("samples", "sample_rate")
+
+    def __init__(self, samples: np.ndarray, sample_rate: int):
+        self.samples = samples
+        self.sample_rate = sample_rate
+
+    @classmethod
+    def from_file(cls, path: str) -> "AudioBuffer":
+        """Read a file libsndfile can decode, mixing down to mono if needed."""
+        samples, sample_rate = sf.read(path, dtype="int16", always_2d=True)
+        if samples.shape[1] == 1:
+            samples = samples[:, 0]
+        else:
+            samples = samples.mean(axis=1).astype(np.int16)
+        return cls(np.ascontiguousarray(samples), sample_rate)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def __getitem__(self, index: slice) -> "AudioBuffer":
+        return AudioBuffer(self.samples[index], self.sample_rate)
+
+    @property
+    def duration(self) -> float:
+        """Length in seconds."""
+        return len(self.samples) / self.sample_rate
+
+    def to_float32(self) -> np.ndarray:
+        """Samples scaled to [-1.0, 1.0), as Whisper models take them."""
+        return self.samples.astype(np.float32) / INT16_FULL_SCALE
+
+    def normalized(self, headroom: float = 0.1) -> "AudioBuffer":
+        """
+        Scale so the peak sits `headroom` dB below full scale (as pydub's
+        AudioSegment.normalize() does). Silent audio is returned as is.
+        """
+        gain = normalization_gain(peak_amplitude(self.samples), headroom)
+        if gain is None:
+            return self
+        return AudioBuffer(apply_gain(self.samples, gain), self.sample_rate)
+
+    def write(self, path: str):
+        """Write as 16-bit PCM WAV."""
+        sf.write(path, self.samples, self.sample_rate, subtype="PCM_16", format="WAV")
+
+def peak_amplitude(samples: np.ndarray) -> int:
+    return int(np.abs(samples, dtype=np.int32).max()) if len(samples) else 0
+
+def normalization_gain(peak: int, headroom: float = 0.1) -> Optional[np.float32]:
+    """Gain bringing `peak` to `headroom` dB below full scale, None for silence."""
+    if peak == 0:
+        return None
+    return np.float32(INT16_FULL_SCALE * 10 ** (-headroom / 20) / peak)
+
+def apply_gain(samples: np.ndarray, gain: np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """int16 samples scaled by gain with clipping, into `out` if given."""
+    scaled = np.clip(np.rint(samples * gain), -32768, 32767)
+    if out is None:
+        return scaled.astype(np.int16)
+    out[:] = scaled
+    return out
@@ -0,0 +1,116 @@
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.asr import ASREngine, AudioInput
+
+logger = logging.getLogger(__name__)
+
+class _Job:
+    __slots__ = ("kind", "audio", "language", "future")
+
+    def __init__(self, kind: str, audio: AudioInput, language: Optional[str]):
+        self.kind = kind
+        self.audio = audio
+        self.language = language
+        self.future: Future = Future()
+
+class MicroBatcher:
+    """
+    Collects transcription jobs from many callers into micro-batches for
+    one engine.
+
+    A batch is run as soon as it holds max_batch_size jobs or max_wait
+    seconds after its first job arrived, whichever comes first. Jobs are
+    grouped by language and handed to engine.transcribe_batch();
+    language detection jobs run one by one. A single thread drives the
+    engine, so the model is never used concurrently.
+    """
+
+    def __init__(self, engine: ASREngine, max_batch_size: int = 8, max_wait: float = 0.02):
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[_Job]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.jobs = 0
+
+    def _submit(self, kind: str, audio: AudioInput, language: Optional[str]) -> Future:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="asr-batcher", daemon=True)
+                self._thread.start()
+        job = _Job(kind, audio, language)
+        self._queue.put(job)
+        return job.future
+
+    def pending(self) -> int:
+        """Jobs queued and not yet taken into a batch."""
+        return self._queue.qsize()
+
+    def transcribe(self, audio: AudioInput, language: Optional[str] = None) -> Future:
+        """Queue a transcription; the future resolves to the engine's result."""
+        return self._submit("transcribe", audio, language)
+
+    def detect_language(self, audio: AudioInput) -> Future:
+        """Queue a language detection; resolves to (language, probability) pairs."""
+        return self._submit("detect", audio, None)
+
+    def _next_batch(self) -> List[_Job]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            self.batches += 1
+            self.jobs += len(batch)
+            groups: Dict[Tuple[str, Optional[str]], List[_Job]] = {}
+            for job in batch:
+                groups.setdefault((job.kind, job.language), []).append(job)
+            for (kind, language), jobs in groups.items():
+                try:
+                    self._execute(kind, language, jobs)
+                except Exception as e:
+                    # Keep the thread alive for the jobs still to come
+                    logger.exception(f"Batch of {len(jobs)} {kind} jobs failed: {str(e)}")
+                    for job in jobs:
+                        if not job.future.done():
+                            job.future.set_exception(e)
+
+    def _execute(self, kind: str, language: Optional[str], jobs: List[_Job]):
+        if kind == "detect":
+            for job in jobs:
+                try:
+                    job.future.set_result(self.engine.detect_language(job.audio))
+                except Exception as e:
+                    job.future.set_exception(e)
+            return
+
+        try:
+            results: List[Dict[str, Any]] = self.engine.transcribe_batch(
+                [job.audio for job in jobs], language=language
+            )
+            if len(results) != len(jobs):
+                raise RuntimeError(f"Engine returned {len(results)} results for {len(jobs)} inputs")
+        except Exception as e:
+            logger.error(f"Batch of {len(jobs)} transcriptions failed: {str(e)}")
+            for job in jobs:
+                job.future.set_exception(e)
+            return
+        for job, result in zip(jobs, results):
+            job.future.set_result(result)
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 import os
 from pathlib import Path
 
@@ -7,6 +7,7 @@ class Settings(BaseSettings):
     # API
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "Whisper Fine-Tuning Data Prep"
+    GRADIO_ENABLED: bool = True  # mount the review UI at /gradio; API-only replicas start faster without it
     
     # Security
     SECRET_KEY: str = "your-secret-key-here"
@@ -28,10 +29,81 @@ class Settings(BaseSettings):
     # Audio Processing
     AUDIO_SAMPLE_RATE: int = 16000
     MAX_AUDIO_DURATION: int = 30  # seconds
+    PROCESS_MAX_RETRIES: int = 3  # retries of a failed process_call_task
+    PROCESS_RETRY_BACKOFF: int = 30  # seconds, doubled on each retry
+    PROCESS_RETRY_BACKOFF_MAX: int = 10 * 60
+    SHORT_CALL_SECONDS: int = 10 * 60  # calls up to this long go to calls.short
+    LONG_CALL_SECONDS: int = 60 * 60  # longer calls go to calls.long
+    UPLOAD_BYTES_PER_SECOND: int = 16000  # duration estimate for unprobed uploads
+    PREPROCESS_WORKERS: int = 0  # processes converting/splitting calls per worker process, 0 = in the task
+    PREPROCESS_SEGMENT_SECONDS: int = 5 * 60  # long calls are decoded in parallel segments of this length
+    PREPROCESS_OVERLAP_SECONDS: float = 1.0  # decoded before each segment and dropped when stitching
+    PROCESS_POOL_START_METHOD: str = "forkserver"  # or "spawn"; preprocessing and feature pools never fork the worker
+    
+    # Retention (retention_task, run by Celery beat)
+    RETENTION_INTERVAL_MINUTES: int = 60
+    RETENTION_GRACE_HOURS: int = 6  # unreferenced files younger than this are never removed
+    RETENTION_PROCESSED_HOURS: int = 24  # converted WAVs of processed calls are kept this long
+    RETENTION_FAILED_DAYS: int = 7  # intermediates of failed calls are kept this long
+    RETENTION_COMPRESS_UPLOADS_HOURS: int = 24  # WAV uploads of processed calls become FLAC after this, 0 = never
+    RETENTION_UPLOAD_DAYS: int = 0  # uploads of processed calls are deleted after this, 0 = keep
+    
+    # Monitoring
+    WORKER_METRICS_PORT: int = 9100  # Prometheus port for Celery workers, 0 to disable
+    
+    # Response compression
+    GZIP_MINIMUM_SIZE: int = 1024  # bytes; smaller responses are sent as-is
+    GZIP_COMPRESS_LEVEL: int = 5  # 1-9; higher trades CPU for smaller pages
+
+    # Request profiling
+    PROFILING_ENABLED: bool = False  # install the profiling middleware at all
+    PROFILING_SAMPLE_RATE: float = 0.0  # fraction of requests profiled without the header
+    PROFILING_HEADER: str = "X-Profile"  # send this header to profile a single request
+    PROFILING_MAX_PROFILES: int = 50  # profiles kept in memory
+    PROFILER: str = "cprofile"  # or "pyinstrument"
+
+    # Processing progress events
+    PROGRESS_BACKEND: str = "redis"  # or "memory" (single process only)
+    PROGRESS_TTL_SECONDS: int = 24 * 60 * 60  # how long the latest event is kept
+    PROGRESS_KEEPALIVE_SECONDS: int = 15
+
+    # Review queue
+    REVIEW_LEASE_SECONDS: int = 15 * 60  # how long a pulled chunk stays reserved
+    
+    # Dataset Export
+    EXPORT_BATCH_SIZE: int = 1000  # rows fetched per server-side cursor batch
+    EXPORT_READ_WORKERS: int = 8  # parallel audio reads
+    EXPORT_SHARD_MAX_SAMPLES: int = 2000
+    EXPORT_SHARD_MAX_BYTES: int = 512 * 1024 * 1024
+    EXPORT_WRITE_BUFFER: int = 8 * 1024 * 1024
+    EXPORT_WATERMARK_LAG_SECONDS: int = 10 * 60  # incremental exports re-scan this far behind the parent's watermark
+    
+    # Log-mel feature cache
+    FEATURE_BATCH_SIZE: int = 8  # chunks per feature computation batch
+    FEATURE_WORKERS: int = 4  # processes computing features
+    FEATURE_SHARD_SIZE: int = 256  # chunks per .npy feature shard
+    FEATURE_TOKENIZER: str = "openai/whisper-large-v3"
     
     # Whisper Model
     WHISPER_MODEL: str = "large-v3"
     WHISPER_DEVICE: str = "cuda"  # or "cpu"
+    WHISPER_COMPUTE_TYPE: str = "float16"  # e.g. "int8" on CPU
+    ASR_ENGINE: str = "faster-whisper"  # "<engine>[:<model>]": "faster-whisper:small", "stub"
+    ASR_QUEUE_ENGINES: Dict[str, str] = {}  # per-queue overrides, e.g. {"calls.long": "faster-whisper:medium"}
+    ASR_DRAFT_ENGINE: str = ""  # e.g. "faster-whisper:small" to draft every chunk first; empty disables
+    ASR_DRAFT_COMPUTE_TYPE: str = "int8"
+    ASR_DRAFT_BEAM_SIZE: int = 1
+    CASCADE_MIN_AVG_LOGPROB: float = -0.6  # drafts below this are re-decoded by ASR_ENGINE
+    CASCADE_MAX_COMPRESSION_RATIO: float = 2.2  # drafts above this (repetition) are re-decoded
+    
+    # Transcription service (ASR_ENGINE="service:<spec>")
+    ASR_SERVICE_BATCH_SIZE: int = 8  # chunks per micro-batch
+    ASR_SERVICE_MAX_WAIT_MS: int = 20  # how long a batch waits to fill up
+    ASR_SERVICE_TIMEOUT: int = 10 * 60  # seconds a worker waits for a result
+    WHISPER_LANGUAGE: str = "hi"  # used when language identification is unsure
+    LANGUAGE_ID_WINDOWS: int = 3  # chunks sampled per call for language detection
+    LANGUAGE_MIN_PROBABILITY: float = 0.5  # below this, fall back to WHISPER_LANGUAGE
+    LANGUAGE_RECHECK_CONFIDENCE: float = 0.4  # re-detect chunks decoded less confidently
     
     # File Storage
     BASE_DIR: Path = Path(__file__).parent.parent.parent
@@ -39,6 +111,7 @@ class Settings(BaseSettings):
     PROCESSED_DIR: Path = BASE_DIR / "data" / "processed"
     CHUNKS_DIR: Path = BASE_DIR / "data" / "chunks"
     EXPORTS_DIR: Path = BASE_DIR / "data" / "exports"
+    FEATURES_DIR: Path = BASE_DIR / "data" / "features"
     
     class Config:
         case_sensitive = True
@@ -50,3 +123,4 @@ os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 os.makedirs(settings.PROCESSED_DIR, exist_ok=True)
 os.makedirs(settings.CHUNKS_DIR, exist_ok=True)
 os.makedirs(settings.EXPORTS_DIR, exist_ok=True)
+os.makedirs(settings.FEATURES_DIR, exist_ok=True)
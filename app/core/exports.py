@@ -0,0 +1,25 @@
+from typing import Dict, Any, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.models import Export
+
+def find_parent_export(db: Session, format: str, before_id: Optional[int] = None) -> Optional[Export]:
+    """
+    Latest completed export of `format` (created before `before_id`, if
+    given) that an incremental export can extend: one that recorded a
+    watermark (exports of an empty table have none).
+    """
+    candidates = db.query(Export)
+    if before_id is not None:
+        candidates = candidates.filter(Export.id < before_id)
+    for candidate in candidates.order_by(Export.id.desc()).limit(50):
+        meta = candidate.metadata_ or {}
+        if (meta.get("status") == "completed" and meta.get("format", "webdataset") == format
+                and (meta.get("watermark") or {}).get("updated_at")):
+            return candidate
+    return None
+
+def split_spec(train_split: int, salt: int) -> Dict[str, Any]:
+    """How an export assigns calls to train and validation."""
+    return {"method": "call_id_hash", "train_split": int(train_split), "salt": int(salt)}
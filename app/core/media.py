@@ -0,0 +1,72 @@
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class AudioProbeError(Exception):
+    """The file is not readable audio."""
+
+def _probe_soundfile(path: str) -> Dict[str, Any]:
+    import soundfile as sf
+
+    info = sf.info(path)
+    return {
+        "duration": info.duration,
+        "sample_rate": info.samplerate,
+        "channels": info.channels,
+        "format": info.format.lower(),
+        "codec": info.subtype.lower(),
+    }
+
+def _probe_ffprobe(path: str) -> Dict[str, Any]:
+    import ffmpeg
+
+    try:
+        probe = ffmpeg.probe(path)
+    except ffmpeg.Error as e:
+        stderr = e.stderr.decode(errors="replace").strip() if e.stderr else str(e)
+        raise AudioProbeError(stderr.splitlines()[-1] if stderr else "ffprobe failed")
+
+    stream = next((s for s in probe.get("streams", []) if s.get("codec_type") == "audio"), None)
+    if stream is None:
+        raise AudioProbeError("No audio stream found")
+
+    container = probe.get("format", {})
+    duration = stream.get("duration") or container.get("duration")
+    return {
+        "duration": float(duration) if duration else None,
+        "sample_rate": int(stream["sample_rate"]) if stream.get("sample_rate") else None,
+        "channels": stream.get("channels"),
+        "format": container.get("format_name"),
+        "codec": stream.get("codec_name"),
+        "bit_rate": int(container["bit_rate"]) if container.get("bit_rate") else None,
+    }
+
+def probe_audio(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read duration, codec, sample rate and channels from the file header
+    without decoding the audio.
+
+    Uses libsndfile for the formats it reads (WAV, FLAC, OGG, ...) and
+    ffprobe otherwise. Raises AudioProbeError for corrupt files, files
+    without audio and empty recordings. Returns None when the file can only
+    be read by ffprobe and ffprobe is not installed; conversion will then be
+    the first real check.
+    """
+    try:
+        info = _probe_soundfile(path)
+    except Exception as e:
+        logger.debug(f"soundfile could not read {path}, trying ffprobe: {str(e)}")
+        try:
+            info = _probe_ffprobe(path)
+        except AudioProbeError:
+            raise
+        except FileNotFoundError:
+            logger.warning("ffprobe is not installed; skipping upload probe")
+            return None
+        except Exception as e:
+            raise AudioProbeError(f"Could not probe audio: {str(e)}")
+
+    if not info["duration"] or info["duration"] <= 0:
+        raise AudioProbeError("Audio has no duration")
+    return info
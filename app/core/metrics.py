@@ -0,0 +1,171 @@
+import os
+import time
+import resource
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Iterator
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+# When PROMETHEUS_MULTIPROC_DIR is set (Celery prefork / multi-worker
+# uvicorn), metric values are shared through files in that directory and
+# must be collected with a MultiProcessCollector.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+PIPELINE_STAGE_SECONDS = Histogram(
+    "pipeline_stage_seconds",
+    "Wall time spent in an audio pipeline stage",
+    ["stage"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+PIPELINE_STAGE_CPU_SECONDS = Counter(
+    "pipeline_stage_cpu_seconds_total",
+    "Process CPU time spent in an audio pipeline stage",
+    ["stage"],
+)
+PIPELINE_AUDIO_SECONDS = Counter(
+    "pipeline_audio_seconds_total",
+    "Seconds of audio processed by an audio pipeline stage",
+    ["stage"],
+)
+PIPELINE_REAL_TIME_FACTOR = Histogram(
+    "pipeline_real_time_factor",
+    "Wall time divided by audio duration for a pipeline stage",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5),
+)
+PROCESS_PEAK_RSS_BYTES = Gauge(
+    "process_peak_rss_bytes",
+    "Peak resident set size of the process",
+    multiprocess_mode="max",
+)
+CALLS_PROCESSED = Counter(
+    "calls_processed_total",
+    "Calls finished by process_call",
+    ["status"],
+)
+PREPROCESS_FALLBACKS = Counter(
+    "preprocess_fallbacks_total",
+    "Calls converted serially after parallel preprocessing failed",
+)
+RETENTION_RECLAIMED_BYTES = Counter(
+    "retention_reclaimed_bytes_total",
+    "Disk space freed by the retention task",
+    ["category"],
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "API request latency",
+    ["method", "route", "status"],
+)
+
+def peak_rss_bytes() -> int:
+    """High-water mark of this process's resident memory."""
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class PipelineMetrics:
+    """
+    Accumulates per-stage wall time, CPU time, audio seconds and peak RSS
+    for one process_call run.
+
+    Stages entered several times (e.g. transcribe, once per chunk) are
+    summed. Every measurement is also exported to Prometheus.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+
+    @contextmanager
+    def stage(self, name: str, audio_seconds: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Time a block as pipeline stage `name`.
+
+        Yields a dict; set "audio_seconds" on it if the duration is only
+        known once the stage has run.
+        """
+        info: Dict[str, Any] = {"audio_seconds": audio_seconds}
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield info
+        finally:
+            self.record(
+                name,
+                time.perf_counter() - wall_start,
+                time.process_time() - cpu_start,
+                info.get("audio_seconds")
+            )
+
+    def record(self, name: str, wall: float, cpu: float, audio_seconds: Optional[float] = None):
+        stats = self.stages.setdefault(name, {
+            "calls": 0,
+            "wall_seconds": 0.0,
+            "cpu_seconds": 0.0,
+            "audio_seconds": 0.0,
+        })
+        stats["calls"] += 1
+        stats["wall_seconds"] += wall
+        stats["cpu_seconds"] += cpu
+        stats["peak_rss_mb"] = round(peak_rss_bytes() / (1024 * 1024), 1)
+
+        PIPELINE_STAGE_SECONDS.labels(stage=name).observe(wall)
+        PIPELINE_STAGE_CPU_SECONDS.labels(stage=name).inc(max(cpu, 0.0))
+        PROCESS_PEAK_RSS_BYTES.set(peak_rss_bytes())
+        if audio_seconds:
+            stats["audio_seconds"] += audio_seconds
+            PIPELINE_AUDIO_SECONDS.labels(stage=name).inc(audio_seconds)
+            PIPELINE_REAL_TIME_FACTOR.labels(stage=name).observe(wall / audio_seconds)
+
+    def as_dict(self, audio_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Summary suitable for Call.metadata["processing"]."""
+        stages = {}
+        for name, stats in self.stages.items():
+            stage = {key: round(value, 4) if isinstance(value, float) else value
+                     for key, value in stats.items()}
+            if stats["audio_seconds"]:
+                stage["real_time_factor"] = round(stats["wall_seconds"] / stats["audio_seconds"], 4)
+            stages[name] = stage
+
+        wall = time.perf_counter() - self._started
+        total = {
+            "wall_seconds": round(wall, 4),
+            "cpu_seconds": round(time.process_time() - self._cpu_started, 4),
+            "peak_rss_mb": round(peak_rss_bytes() / (1024 * 1024), 1),
+        }
+        if audio_seconds:
+            total["audio_seconds"] = round(audio_seconds, 4)
+            total["real_time_factor"] = round(wall / audio_seconds, 4)
+        return {"stages": stages, "total": total}
+
+def metrics_registry() -> CollectorRegistry:
+    """Registry to expose: the default one, or a multiprocess collector."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+def render_metrics() -> bytes:
+    """Prometheus text exposition of all metrics."""
+    return generate_latest(metrics_registry())
+
+def start_metrics_server(port: int):
+    """Serve /metrics on a background thread (used by Celery workers)."""
+    start_http_server(port, registry=metrics_registry())
+
+def mark_process_dead(pid: int):
+    """Drop an exited process's live gauges from the multiprocess files."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
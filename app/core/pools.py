@@ -0,0 +1,66 @@
+import logging
+from concurrent.futures import Future
+from typing import Any, Callable
+
+import billiard
+from billiard.einfo import ExceptionInfo, ExceptionWithTraceback
+from billiard.exceptions import WorkerLostError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ProcessPool", "WorkerLostError"]
+
+class ProcessPool:
+    """
+    A process pool with a concurrent.futures-style submit(), usable inside
+    Celery workers.
+
+    Celery's prefork children are daemonic, and the standard library
+    refuses to start processes from a daemonic one, so ProcessPoolExecutor
+    fails there. billiard (Celery's own multiprocessing fork) does not.
+    Workers are started with PROCESS_POOL_START_METHOD, never forked from
+    a worker with running threads. A worker that dies is replaced; the
+    future of the job it was running fails with WorkerLostError.
+    """
+
+    def __init__(self, workers: int, start_method: str = None):
+        context = billiard.get_context(start_method or settings.PROCESS_POOL_START_METHOD)
+        self.workers = workers
+        self._pool = context.Pool(processes=workers)
+
+    def submit(self, fn: Callable, *args: Any) -> Future:
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+
+        def done(result):
+            if not future.done():
+                future.set_result(result)
+
+        def failed(error):
+            # billiard reports failures as ExceptionInfo; errors raised in
+            # the pool itself (a lost worker) are still wrapped
+            if isinstance(error, ExceptionInfo):
+                error = error.exception
+            if isinstance(error, ExceptionWithTraceback):
+                error = error.exc
+            # A lost job can be reported more than once
+            if not future.done():
+                future.set_exception(error)
+
+        self._pool.apply_async(fn, args, callback=done, error_callback=failed)
+        return future
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """Stop the workers: after queued jobs finish, or at once with cancel_futures."""
+        if cancel_futures:
+            # Stop the thread that replaces exited workers first: a worker
+            # it starts while terminate() signals the others is never
+            # signalled, and joining it hangs
+            self._pool.close()
+            self._pool.terminate()
+        else:
+            self._pool.close()
+        if wait or cancel_futures:
+            self._pool.join()
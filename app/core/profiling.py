@@ -0,0 +1,200 @@
+import io
+import time
+import uuid
+import random
+import pstats
+import cProfile
+import logging
+import threading
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statements kept verbatim per profile; counts and totals cover all of them
+MAX_QUERIES_PER_PROFILE = 200
+MAX_STATEMENT_LENGTH = 1000
+
+# Profile of the request being handled in the current context. Starlette
+# copies the context into threadpool workers, so SQL run from sync
+# dependencies is attributed to the right request as well.
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+
+# cProfile/pyinstrument hook the interpreter globally, so only one request
+# is profiled at a time; concurrent sampled requests still get SQL stats
+_profiler_lock = threading.Lock()
+
+class RequestProfile:
+    """Timings, SQL statements and profiler output for one request."""
+
+    def __init__(self, method: str, path: str, query: str = ""):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.query = query
+        self.started_at = datetime.utcnow()
+        self.status_code: Optional[int] = None
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.queries: List[Dict[str, Any]] = []
+        self.profiler: Optional[str] = None
+        self.report: Optional[str] = None
+
+    def record_query(self, statement: str, duration: float):
+        self.sql_count += 1
+        self.sql_seconds += duration
+        if len(self.queries) < MAX_QUERIES_PER_PROFILE:
+            self.queries.append({
+                "statement": statement[:MAX_STATEMENT_LENGTH],
+                "duration_ms": round(duration * 1000, 3),
+            })
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "query": self.query,
+            "started_at": self.started_at,
+            "status_code": self.status_code,
+            "wall_ms": round(self.wall_seconds * 1000, 3),
+            "cpu_ms": round(self.cpu_seconds * 1000, 3),
+            "sql_count": self.sql_count,
+            "sql_ms": round(self.sql_seconds * 1000, 3),
+            "profiler": self.profiler,
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**self.summary(), "queries": self.queries, "report": self.report}
+
+class ProfileStore:
+    """The last `max_profiles` request profiles, newest first."""
+
+    def __init__(self, max_profiles: int):
+        self._profiles: deque = deque(maxlen=max_profiles)
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles.appendleft(profile)
+
+    def list(self) -> List[RequestProfile]:
+        with self._lock:
+            return list(self._profiles)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return next((p for p in self._profiles if p.id == profile_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+profile_store = ProfileStore(settings.PROFILING_MAX_PROFILES)
+
+def install_sql_hooks(engine):
+    """
+    Time every statement run on `engine` and attribute it to the request
+    being profiled, if any.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_profile.get() is not None:
+            conn.info.setdefault("profiling_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = _current_profile.get()
+        starts = conn.info.get("profiling_start")
+        if profile is not None and starts:
+            profile.record_query(statement, time.perf_counter() - starts.pop())
+
+def should_profile(request) -> bool:
+    """Profile when the request asks for it or falls in the sample."""
+    if request.headers.get(settings.PROFILING_HEADER):
+        return True
+    return settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE
+
+class _CProfileRunner:
+    name = "cprofile"
+
+    def __init__(self):
+        self._profiler = cProfile.Profile()
+
+    def start(self):
+        self._profiler.enable()
+
+    def stop(self) -> str:
+        self._profiler.disable()
+        out = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=out)
+        stats.sort_stats("cumulative").print_stats(40)
+        return out.getvalue()
+
+class _PyinstrumentRunner:
+    name = "pyinstrument"
+
+    def __init__(self):
+        from pyinstrument import Profiler
+        self._profiler = Profiler(async_mode="enabled")
+
+    def start(self):
+        self._profiler.start()
+
+    def stop(self) -> str:
+        self._profiler.stop()
+        return self._profiler.output_text(unicode=True, show_all=False)
+
+def _make_runner():
+    if settings.PROFILER == "pyinstrument":
+        try:
+            return _PyinstrumentRunner()
+        except ImportError:
+            logger.warning("pyinstrument is not installed, falling back to cProfile")
+    return _CProfileRunner()
+
+async def profile_request(request, call_next):
+    """
+    HTTP middleware: profile sampled or flagged requests and keep the result
+    in `profile_store`. The profile id is returned in the X-Profile-Id header.
+    """
+    if not should_profile(request):
+        return await call_next(request)
+
+    profile = RequestProfile(request.method, request.url.path, request.url.query)
+    token = _current_profile.set(profile)
+    locked = _profiler_lock.acquire(blocking=False)
+    runner = None
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        if locked:
+            started = _make_runner()
+            started.start()
+            runner = started
+        response = await call_next(request)
+    finally:
+        try:
+            if runner:
+                profile.report = runner.stop()
+                profile.profiler = runner.name
+        finally:
+            if locked:
+                _profiler_lock.release()
+        profile.wall_seconds = time.perf_counter() - wall_start
+        profile.cpu_seconds = time.process_time() - cpu_start
+        _current_profile.reset(token)
+
+    profile.status_code = response.status_code
+    profile_store.add(profile)
+    response.headers["X-Profile-Id"] = profile.id
+    return response
@@ -0,0 +1,216 @@
+import json
+import time
+import asyncio
+import logging
+import threading
+from typing import Dict, Any, Optional, AsyncIterator, List, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Event types after which a call's progress stream ends
+TERMINAL_EVENTS = ("completed", "failed")
+
+# How long to wait before retrying Redis after a connection failure
+REDIS_RETRY_SECONDS = 30
+
+def progress_channel(call_id: int) -> str:
+    return f"call_progress:{call_id}"
+
+def progress_last_key(call_id: int) -> str:
+    return f"call_progress:{call_id}:last"
+
+class InProcessBroker:
+    """
+    Pub/sub within a single process, used when Redis is not configured or
+    unreachable (eager Celery in development, tests, benchmarks).
+
+    publish() may be called from any thread; subscribers are asyncio
+    queues woken on their own event loop. The latest event is kept per
+    call only until the call finishes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._last: Dict[int, Dict[str, Any]] = {}
+
+    def publish(self, call_id: int, event: Dict[str, Any]):
+        with self._lock:
+            if event.get("event") in TERMINAL_EVENTS:
+                # Later subscribers learn the outcome from the call's status
+                self._last.pop(call_id, None)
+            else:
+                self._last[call_id] = event
+            subscribers = list(self._subscribers.get(call_id, []))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # Subscriber's loop has shut down
+                pass
+
+    async def subscribe(self, call_id: int, keepalive: float) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        queue: asyncio.Queue = asyncio.Queue()
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(call_id, []).append(entry)
+            last = self._last.get(call_id)
+        try:
+            if last:
+                yield last
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._subscribers[call_id].remove(entry)
+                if not self._subscribers[call_id]:
+                    del self._subscribers[call_id]
+
+_local_broker = InProcessBroker()
+_redis = None
+_async_redis = None
+_redis_failed_at = 0.0
+
+def _redis_available() -> bool:
+    return settings.PROGRESS_BACKEND == "redis" and time.monotonic() - _redis_failed_at > REDIS_RETRY_SECONDS
+
+def _redis_failed(e: Exception):
+    global _redis_failed_at
+    if time.monotonic() - _redis_failed_at > REDIS_RETRY_SECONDS:
+        logger.warning(f"Redis unavailable for progress events, using in-process fallback: {e}")
+    _redis_failed_at = time.monotonic()
+
+def get_redis():
+    """Lazily connected Redis client for publishing, or None if unavailable."""
+    global _redis
+    if not _redis_available():
+        return None
+    if _redis is None:
+        import redis
+        _redis = redis.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=1, socket_timeout=5)
+    return _redis
+
+def get_async_redis():
+    """Lazily created asyncio Redis client for subscribers, or None."""
+    global _async_redis
+    if not _redis_available():
+        return None
+    if _async_redis is None:
+        import redis.asyncio
+        _async_redis = redis.asyncio.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=1)
+    return _async_redis
+
+def publish_progress(call_id: int, event: Dict[str, Any]):
+    """
+    Publish a progress event for a call. Never raises: progress reporting
+    must not fail the processing it reports on.
+    """
+    event = {"call_id": call_id, "timestamp": time.time(), **event}
+    client = get_redis()
+    if client is not None:
+        try:
+            payload = json.dumps(event)
+            pipe = client.pipeline()
+            # Keep the latest event so late subscribers start from it
+            pipe.set(progress_last_key(call_id), payload, ex=settings.PROGRESS_TTL_SECONDS)
+            pipe.publish(progress_channel(call_id), payload)
+            pipe.execute()
+            return
+        except Exception as e:
+            _redis_failed(e)
+    _local_broker.publish(call_id, event)
+
+async def subscribe_progress(call_id: int) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """
+    Yield a call's progress events, starting with the latest one already
+    published. Yields None every PROGRESS_KEEPALIVE_SECONDS without events
+    so callers can send keepalives; stops after a terminal event.
+    """
+    keepalive = settings.PROGRESS_KEEPALIVE_SECONDS
+    client = get_async_redis()
+    if client is not None:
+        try:
+            pubsub = client.pubsub()
+            await pubsub.subscribe(progress_channel(call_id))
+        except Exception as e:
+            _redis_failed(e)
+            client = None
+
+    if client is None:
+        async for event in _local_broker.subscribe(call_id, keepalive):
+            yield event
+            if event and event.get("event") in TERMINAL_EVENTS:
+                return
+        return
+
+    try:
+        # Subscribed before reading the last event, so nothing is missed
+        last = await client.get(progress_last_key(call_id))
+        if last:
+            event = json.loads(last)
+            yield event
+            if event.get("event") in TERMINAL_EVENTS:
+                return
+        idle_since = time.monotonic()
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=keepalive)
+            if message is None:
+                # Also returned for skipped subscribe confirmations
+                if time.monotonic() - idle_since >= keepalive:
+                    idle_since = time.monotonic()
+                    yield None
+                continue
+            idle_since = time.monotonic()
+            event = json.loads(message["data"])
+            yield event
+            if event.get("event") in TERMINAL_EVENTS:
+                return
+    finally:
+        await pubsub.unsubscribe(progress_channel(call_id))
+        await pubsub.close()
+
+class CallProgress:
+    """
+    Progress events for one process_call run: stage changes, per-chunk
+    transcription progress with an ETA, and a final completed/failed event.
+    """
+
+    def __init__(self, call_id: int):
+        self.call_id = call_id
+        self.chunks_total: Optional[int] = None
+        self.audio_total: Optional[float] = None
+        self._transcribe_started: Optional[float] = None
+
+    def stage(self, stage: str, **fields):
+        publish_progress(self.call_id, {"event": "stage", "stage": stage, **fields})
+
+    def chunks_planned(self, chunks_total: int, audio_total: float):
+        self.chunks_total = chunks_total
+        self.audio_total = audio_total
+        self._transcribe_started = time.perf_counter()
+        self.stage("transcribe", chunks_done=0, chunks_total=chunks_total)
+
+    def chunk_done(self, chunks_done: int, audio_done: float):
+        """Report a transcribed chunk; ETA extrapolates the rate so far."""
+        eta = None
+        if self._transcribe_started is not None and audio_done > 0 and self.audio_total:
+            elapsed = time.perf_counter() - self._transcribe_started
+            eta = round(elapsed / audio_done * max(self.audio_total - audio_done, 0.0), 1)
+        publish_progress(self.call_id, {
+            "event": "chunk",
+            "stage": "transcribe",
+            "chunks_done": chunks_done,
+            "chunks_total": self.chunks_total,
+            "eta_seconds": eta,
+        })
+
+    def completed(self, **fields):
+        publish_progress(self.call_id, {"event": "completed", "chunks_total": self.chunks_total, **fields})
+
+    def failed(self, error: str):
+        publish_progress(self.call_id, {"event": "failed", "error": error})
@@ -0,0 +1,118 @@
+import os
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+# Per-segment and per-word numeric fields stored as packed float32 columns
+SEGMENT_FIELDS = ("start", "end", "avg_logprob", "no_speech_prob", "compression_ratio")
+WORD_FIELDS = ("start", "end", "probability")
+
+def timings_path_for(chunk_path: str) -> str:
+    """Return the side-file path holding timings for a chunk WAV."""
+    return os.path.splitext(chunk_path)[0] + ".timings.npz"
+
+def save_timings(path: str, segments: List[Dict[str, Any]]) -> None:
+    """
+    Store segment- and word-level timings as packed columnar arrays.
+
+    A chunk with a few hundred words takes a few KB instead of a large
+    JSON blob in the chunk row.
+    """
+    words = [word for segment in segments for word in segment.get("words", [])]
+    arrays = {
+        "segment_text": np.array([s.get("text", "") for s in segments], dtype=str),
+        "word_text": np.array([w.get("word", "") for w in words], dtype=str),
+        # Index of the parent segment for every word
+        "word_segment": np.array(
+            [i for i, s in enumerate(segments) for _ in s.get("words", [])],
+            dtype=np.int32
+        ),
+    }
+    for field in SEGMENT_FIELDS:
+        arrays[f"segment_{field}"] = np.array(
+            [s.get(field) or 0.0 for s in segments], dtype=np.float32
+        )
+    for field in WORD_FIELDS:
+        arrays[f"word_{field}"] = np.array(
+            [w.get(field) or 0.0 for w in words], dtype=np.float32
+        )
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+
+def load_timings(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Load a timings side file back into lists of segment and word dicts."""
+    with np.load(path, allow_pickle=False) as data:
+        segments = [
+            {"text": str(text)} for text in data["segment_text"]
+        ]
+        for field in SEGMENT_FIELDS:
+            for segment, value in zip(segments, data[f"segment_{field}"].tolist()):
+                segment[field] = round(value, 4)
+
+        words = [
+            {"word": str(text), "segment": int(index)}
+            for text, index in zip(data["word_text"], data["word_segment"])
+        ]
+        for field in WORD_FIELDS:
+            for word, value in zip(words, data[f"word_{field}"].tolist()):
+                word[field] = round(value, 4)
+
+    return {"segments": segments, "words": words}
+
+def summarize_segments(segments: List[Dict[str, Any]]) -> Dict[str, Optional[float]]:
+    """
+    Aggregate segment statistics into chunk-level confidence scores.
+
+    Log-prob, no-speech probability and compression ratio are weighted by
+    segment duration; confidence is the mean word probability.
+    """
+    summary = {
+        "confidence": None,
+        "avg_logprob": None,
+        "no_speech_prob": None,
+        "compression_ratio": None,
+    }
+    if not segments:
+        return summary
+
+    durations = np.array(
+        [max(s["end"] - s["start"], 0.0) for s in segments], dtype=np.float64
+    )
+    weights = durations if durations.sum() > 0 else np.ones(len(segments))
+    for field in ("avg_logprob", "no_speech_prob", "compression_ratio"):
+        values = np.array([s.get(field) or 0.0 for s in segments], dtype=np.float64)
+        summary[field] = float(np.average(values, weights=weights))
+
+    probabilities = [w["probability"] for s in segments for w in s.get("words", [])]
+    if probabilities:
+        summary["confidence"] = float(np.mean(probabilities))
+
+    return summary
+
+def compute_review_priority(
+    summary: Dict[str, Optional[float]],
+    text: str,
+    duration: float,
+    max_duration: float = 30.0
+) -> float:
+    """
+    Score how urgently a chunk needs human review (higher = sooner).
+
+    Combines low ASR confidence, disagreement between no_speech_prob and
+    whether any text was produced, and chunk length.
+    """
+    confidence = summary.get("confidence")
+    if confidence is None and summary.get("avg_logprob") is not None:
+        confidence = float(np.exp(summary["avg_logprob"]))
+    uncertainty = 1.0 - (confidence if confidence is not None else 0.0)
+
+    # Text where Whisper thinks there is no speech (likely hallucination),
+    # or silence where it thinks there is speech (likely dropped words)
+    no_speech_prob = summary.get("no_speech_prob") or 0.0
+    mismatch = no_speech_prob if text.strip() else 1.0 - no_speech_prob
+
+    length = min(max(duration, 0.0) / max_duration, 1.0) if max_duration > 0 else 0.0
+
+    return round(0.5 * uncertainty + 0.3 * mismatch + 0.2 * length, 6)
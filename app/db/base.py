@@ -16,11 +16,15 @@ ScopedSession = scoped_session(SessionLocal)
 Base = declarative_base()
 
 def get_db():
-    ""
+    """
     Dependency function to get DB session.
     Use this in FastAPI path operations to get a DB session.
+
+    Each request gets its own session: FastAPI runs sync dependencies on
+    pooled threads, so a thread-local scoped session would be shared by
+    concurrent requests landing on the same thread.
     """
-    db = ScopedSession()
+    db = SessionLocal()
     try:
         yield db
     finally:
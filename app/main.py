@@ -1,16 +1,22 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+import time
+from fastapi import FastAPI, Depends, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from sqlalchemy.orm import Session
 from typing import List
 import os
 import sys
 
 from app.core.config import settings
-from app.db.base import Base, engine, get_db
-from app.api.v1.endpoints import upload, chunks, auth
-from app.ui.app import create_ui_app
+from app.core.metrics import CONTENT_TYPE_LATEST, HTTP_REQUEST_SECONDS, render_metrics
+from app.core.profiling import install_sql_hooks, profile_request
+from app.core.responses import CompressionMiddleware, ORJSONResponse
+
+from app.db.base import engine, get_db
+from app.models.base import Base
+from app.models import models  # noqa: F401 - registers the tables on Base
+from app.api.v1.endpoints import upload, chunks, auth, exports, admin
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -22,7 +28,8 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    default_response_class=ORJSONResponse
 )
 
 # Set up CORS - more permissive in Colab
@@ -34,30 +41,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON pages (chunk lists run to hundreds of KB)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.GZIP_MINIMUM_SIZE,
+    compresslevel=settings.GZIP_COMPRESS_LEVEL
+)
+
+# Request latency metrics, labelled by route template to keep cardinality low
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.labels(
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=response.status_code
+    ).observe(time.perf_counter() - start)
+    return response
+
+# Opt-in request profiling; nothing is installed when disabled
+if settings.PROFILING_ENABLED:
+    install_sql_hooks(engine)
+    app.middleware("http")(profile_request)
+
 # Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+if os.path.isdir("static"):
+    app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Include API routes
 app.include_router(auth.router, prefix="/api/v1", tags=["auth"])
-app.include_router(upload.router, prefix="/api/v1", tags=["upload"])
-app.include_router(chunks.router, prefix="/api/v1", tags=["chunks"])
+app.include_router(upload.router, prefix="/api/v1/uploads", tags=["upload"])
+app.include_router(chunks.router, prefix="/api/v1/chunks", tags=["chunks"])
+app.include_router(exports.router, prefix="/api/v1/exports", tags=["exports"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["admin"])
 
-# Mount Gradio app
-gradio_app = create_ui_app()
-app.mount("/gradio", gradio_app)
+# Mount Gradio app; gradio is the largest import of the API process
+if settings.GRADIO_ENABLED:
+    import gradio as gr
+    from ui.app import create_ui
+    app = gr.mount_gradio_app(app, create_ui(), path="/gradio")
 
 # Health check
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy", "environment": "colab" if 'COLAB_JUPYTER_TOKEN' in os.environ else "local"}
 
+# Prometheus metrics
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
 # Root endpoint
 @app.get("/")
 async def root():
     return {
         "message": "Whisper Fine-Tuning API",
         "docs": "/api/docs",
-        "gradio_ui": "/gradio"
+        "gradio_ui": "/gradio" if settings.GRADIO_ENABLED else None
     }
 
 # Colab specific setup
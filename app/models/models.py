@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Enum, JSON
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Enum, JSON, Index
 from sqlalchemy.orm import relationship
 from enum import Enum as PyEnum
 from .base import Base, TimestampMixin
@@ -45,7 +45,12 @@ class Call(Base, TimestampMixin):
     duration = Column(Float)  # in seconds
     language = Column(String, default="hi")  # ISO 639-1 language code
     status = Column(Enum(CallStatus), default=CallStatus.UPLOADED)
-    metadata = Column(JSON, default=dict)
+    metadata_ = Column("metadata", JSON, default=dict)
+    
+    # Chunks are committed as they are transcribed, so reviewers can start
+    # on a call while it is still processing
+    chunks_total = Column(Integer)  # known once the audio has been split
+    chunks_ready = Column(Integer, default=0, nullable=False)
     
     # Foreign keys
     uploaded_by_id = Column(Integer, ForeignKey("users.id"))
@@ -65,14 +70,34 @@ class Chunk(Base, TimestampMixin):
     corrected_text = Column(String)  # After human review
     speaker_role = Column(Enum(SpeakerRole), default=SpeakerRole.UNKNOWN)
     status = Column(Enum(ChunkStatus), default=ChunkStatus.PENDING)
-    metadata = Column(JSON, default=dict)  # For storing diarization info, confidence scores, etc.
+    metadata_ = Column("metadata", JSON, default=dict)  # For storing diarization info, etc.
+    
+    # ASR confidence summary (aggregated over segments); word-level timings
+    # live in a packed side file at timings_path
+    confidence = Column(Float)  # mean word probability, 0-1
+    avg_logprob = Column(Float)
+    no_speech_prob = Column(Float)
+    compression_ratio = Column(Float)
+    timings_path = Column(String)
+    
+    # Review queue: higher priority is served first, leases stop two
+    # reviewers from pulling the same chunk
+    review_priority = Column(Float, default=0.0, nullable=False)
+    lease_expires_at = Column(DateTime)
     
     # Foreign keys
     call_id = Column(Integer, ForeignKey("calls.id", ondelete="CASCADE"), nullable=False)
+    leased_by_id = Column(Integer, ForeignKey("users.id"))
     
     # Relationships
     call = relationship("Call", back_populates="chunks")
     reviews = relationship("Review", back_populates="chunk", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_chunks_status_review_priority", "status", "review_priority"),
+        # Incremental exports scan only rows changed since the last watermark
+        Index("ix_chunks_updated_at", "updated_at"),
+    )
 
 class Review(Base, TimestampMixin):
     __tablename__ = "reviews"
@@ -88,6 +113,9 @@ class Review(Base, TimestampMixin):
     chunk = relationship("Chunk", back_populates="reviews")
     reviewer = relationship("User", back_populates="reviews")
 
+# Formats an export can be written in (see app.tasks.export)
+EXPORT_FORMATS = ("webdataset", "parquet")
+
 class Export(Base, TimestampMixin):
     __tablename__ = "exports"
     
@@ -95,7 +123,7 @@ class Export(Base, TimestampMixin):
     description = Column(String)
     file_path = Column(String, nullable=False)
     file_size = Column(Integer)  # in bytes
-    metadata = Column(JSON, default=dict)  # Export settings, filters, etc.
+    metadata_ = Column("metadata", JSON, default=dict)  # Export settings, filters, etc.
     
     # Foreign keys
     created_by_id = Column(Integer, ForeignKey("users.id"))
@@ -1,20 +1,27 @@
 import os
 import logging
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import subprocess
 import json
+from contextlib import nullcontext
 from datetime import datetime
 
 import ffmpeg
 import soundfile as sf
 import numpy as np
-from pydub import AudioSegment
-from faster_whisper import WhisperModel
-from pyannote.audio import Pipeline
+from celery.exceptions import MaxRetriesExceededError
+from celery.utils.time import get_exponential_backoff_interval
 from sqlalchemy.orm import Session
 
+from app.core.asr import ASREngine, ASRUnavailableError, get_draft_engine, get_engine
+from app.core.audio import AudioBuffer, INT16_FULL_SCALE
 from app.core.config import settings
+from app.core.metrics import CALLS_PROCESSED, PREPROCESS_FALLBACKS, PipelineMetrics
+from app.core.progress import CallProgress
+from app.core.transcripts import (
+    compute_review_priority, save_timings, summarize_segments, timings_path_for
+)
 from app.db.base import SessionLocal
 from app.models.models import Call, Chunk, CallStatus, ChunkStatus, SpeakerRole
 from app.tasks.celery_app import celery_app
@@ -23,23 +30,13 @@ from app.tasks.celery_app import celery_app
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize Whisper model (lazy-loaded)
-_whisper_model = None
-def get_whisper_model():
-    global _whisper_model
-    if _whisper_model is None:
-        _whisper_model = WhisperModel(
-            settings.WHISPER_MODEL,
-            device=settings.WHISPER_DEVICE,
-            compute_type="float16"
-        )
-    return _whisper_model
-
 # Initialize diarization pipeline (lazy-loaded)
 _diarization_pipeline = None
 def get_diarization_pipeline():
     global _diarization_pipeline
     if _diarization_pipeline is None:
+        # pyannote pulls in torch; only imported once diarization is used
+        from pyannote.audio import Pipeline
         _diarization_pipeline = Pipeline.from_pretrained(
             "pyannote/speaker-diarization-3.1",
             use_auth_token=None  # Add your Hugging Face token if needed
@@ -54,17 +51,23 @@ def get_db():
         db.close()
 
 def convert_audio(input_path: str, output_path: str) -> bool:
-    """Convert audio to 16kHz mono WAV format."""
+    """
+    Convert audio to 16kHz mono WAV format.
+    
+    The WAV is written under a temporary name and renamed when complete,
+    so an existing output_path is always a finished conversion.
+    """
     try:
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        partial_path = f"{os.path.splitext(output_path)[0]}.partial.wav"
         
         # Use ffmpeg to convert audio
         (
             ffmpeg
             .input(input_path)
             .output(
-                output_path,
+                partial_path,
                 ac=1,  # mono
                 ar=settings.AUDIO_SAMPLE_RATE,
                 acodec='pcm_s16le',
@@ -73,143 +76,339 @@ def convert_audio(input_path: str, output_path: str) -> bool:
             .overwrite_output()
             .run(capture_stdout=True, capture_stderr=True)
         )
+        os.replace(partial_path, output_path)
         return True
     except ffmpeg.Error as e:
         logger.error(f"FFmpeg error: {e.stderr.decode()}")
         return False
 
+def plan_chunks(
+    audio: AudioBuffer,
+    max_duration: int = 30,
+    min_silence_len: int = 500,
+    silence_thresh: int = -40,
+    metrics: Optional[PipelineMetrics] = None
+) -> List[Tuple[int, int]]:
+    """
+    [start, end) sample ranges of chunks of at most max_duration seconds,
+    cut at the first silence in the last 5 seconds of each chunk when
+    there is one. Chunks under a second are dropped.
+    """
+    rate = audio.sample_rate
+    max_samples = max_duration * rate
+    search_samples = 5 * rate
+    
+    ranges = []
+    chunk_start = 0
+    while chunk_start < len(audio):
+        # Calculate chunk end
+        chunk_end = min(chunk_start + max_samples, len(audio))
+        
+        # If this isn't the last chunk, try to split at silence
+        if chunk_end < len(audio):
+            # Find silence in the last 5 seconds of the chunk
+            search_start = max(chunk_start, chunk_end - search_samples)
+            search_segment = audio[search_start:chunk_end]
+            
+            # Split at silence if found
+            silence_stage = (
+                metrics.stage("detect_silence", audio_seconds=search_segment.duration)
+                if metrics else nullcontext()
+            )
+            with silence_stage:
+                silence_ranges = detect_silence(
+                    search_segment,
+                    min_silence_len=min_silence_len,
+                    silence_thresh=silence_thresh
+                )
+            
+            # Use the first silence gap found, unless it would leave the
+            # chunk empty (a window starting at chunk_start, in silence)
+            cuts = [search_start + start for start, _ in silence_ranges if search_start + start > chunk_start]
+            if cuts:
+                chunk_end = cuts[0]
+        
+        # Skip very short chunks
+        if chunk_end - chunk_start >= rate:  # At least 1 second
+            ranges.append((chunk_start, chunk_end))
+        chunk_start = chunk_end
+    
+    return ranges
+
+def chunk_record(path: str, start: int, end: int, sample_rate: int) -> Dict[str, Any]:
+    """A chunk plan entry for samples [start, end) written to path."""
+    return {
+        'path': path,
+        'start_time': start / sample_rate,  # Convert to seconds
+        'end_time': end / sample_rate,      # Convert to seconds
+        'duration': (end - start) / sample_rate  # in seconds
+    }
+
+def chunk_file_path(output_dir: str, chunk_num: int) -> str:
+    return os.path.join(output_dir, f"chunk_{chunk_num:04d}.wav")
+
 def split_audio(
     input_path: str,
     output_dir: str,
     max_duration: int = 30,
     min_silence_len: int = 500,
-    silence_thresh: int = -40
+    silence_thresh: int = -40,
+    metrics: Optional[PipelineMetrics] = None
 ) -> List[Dict[str, Any]]:
-    """Split audio into chunks of max_duration seconds at points of silence."""
+    """
+    Split audio into chunks of max_duration seconds at points of silence.
+    
+    The recording is read once into an AudioBuffer and normalized; search
+    windows and chunks are views of it until each chunk is written.
+    """
     try:
         # Ensure output directory exists
         os.makedirs(output_dir, exist_ok=True)
         
-        # Load audio file
-        audio = AudioSegment.from_file(input_path)
+        # Load and normalize audio
+        audio = AudioBuffer.from_file(input_path).normalized()
         
-        # Normalize audio
-        audio = audio.normalize()
-        
-        # Split on silence
         chunks = []
-        chunk_start = 0
-        chunk_num = 0
-        
-        while chunk_start < len(audio):
-            # Calculate chunk end
-            chunk_end = min(chunk_start + (max_duration * 1000), len(audio))
-            
-            # If this isn't the last chunk, try to split at silence
-            if chunk_end < len(audio):
-                # Find silence in the last 5 seconds of the chunk
-                search_start = max(chunk_start, chunk_end - 5000)
-                search_segment = audio[search_start:chunk_end]
-                
-                # Split at silence if found
-                silence_ranges = detect_silence(
-                    search_segment,
-                    min_silence_len=min_silence_len,
-                    silence_thresh=silence_thresh
-                )
-                
-                if silence_ranges:
-                    # Use the first silence gap found
-                    silence_start = silence_ranges[0][0]
-                    chunk_end = search_start + silence_start
-            
-            # Extract chunk
-            chunk = audio[chunk_start:chunk_end]
-            
-            # Skip very short chunks
-            if len(chunk) < 1000:  # Less than 1 second
-                chunk_start = chunk_end
-                continue
-            
+        ranges = plan_chunks(audio, max_duration, min_silence_len, silence_thresh, metrics=metrics)
+        for chunk_num, (start, end) in enumerate(ranges):
             # Save chunk
-            chunk_path = os.path.join(output_dir, f"chunk_{chunk_num:04d}.wav")
-            chunk.export(chunk_path, format="wav")
-            
-            chunks.append({
-                'path': chunk_path,
-                'start_time': chunk_start / 1000.0,  # Convert to seconds
-                'end_time': chunk_end / 1000.0,      # Convert to seconds
-                'duration': (chunk_end - chunk_start) / 1000.0  # in seconds
-            })
-            
-            chunk_start = chunk_end
-            chunk_num += 1
+            chunk_path = chunk_file_path(output_dir, chunk_num)
+            audio[start:end].write(chunk_path)
+            chunks.append(chunk_record(chunk_path, start, end, audio.sample_rate))
         
         return chunks
     except Exception as e:
         logger.error(f"Error splitting audio: {str(e)}")
         return []
 
-def detect_silence(audio_segment, min_silence_len=500, silence_thresh=-40):
-    """Detect silent chunks in audio segment."""
-    # Convert to numpy array if needed
-    if not isinstance(audio_segment, AudioSegment):
-        samples = np.array(audio_segment.get_array_of_samples())
-    else:
-        samples = np.array(audio_segment.get_array_of_samples())
+def chunk_plan_path(processed_dir: str) -> str:
+    return os.path.join(processed_dir, "chunks.json")
+
+def save_chunk_plan(path: str, chunks: List[Dict[str, Any]]):
+    """Record how a call was split, once every chunk file is written."""
+    partial_path = f"{path}.partial"
+    with open(partial_path, "w") as f:
+        json.dump(chunks, f)
+    os.replace(partial_path, path)
+
+def load_chunk_plan(path: str) -> Optional[List[Dict[str, Any]]]:
+    """A call's saved split, if it exists and all its chunk files are present."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            chunks = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable chunk plan {path}: {str(e)}")
+        return None
+    if not all(os.path.exists(chunk['path']) for chunk in chunks):
+        return None
+    return chunks
+
+def detect_silence(audio: AudioBuffer, min_silence_len=500, silence_thresh=-40) -> List[List[int]]:
+    """
+    Detect silent chunks in audio: [start, end) sample ranges of at least
+    min_silence_len ms in which every sample is below silence_thresh dBFS.
+    """
+    # dBFS below threshold, i.e. |x| + 1e-6 < 10^(thresh/20), in int16 units
+    limit = (10 ** (silence_thresh / 20) - 1e-6) * INT16_FULL_SCALE
+    quiet = np.abs(audio.samples, dtype=np.int32) < limit
     
-    # Normalize samples to -1.0 to 1.0
-    if audio_segment.sample_width == 2:
-        samples = samples.astype(np.float32) / 32768.0
-    elif audio_segment.sample_width == 4:
-        samples = samples.astype(np.float32) / 2147483648.0
+    # Find silent regions: boundaries of runs of quiet samples
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], quiet, [False])).view(np.int8)))
+    starts, ends = edges[0::2], edges[1::2]
+    keep = (ends - starts) >= min_silence_len * audio.sample_rate / 1000.0
     
-    # Calculate dBFS
-    dbfs = 20 * np.log10(np.abs(samples) + 1e-6)  # Add small value to avoid log(0)
+    return [[int(start), int(end)] for start, end in zip(starts[keep], ends[keep])]
+
+def transcribe_audio(
+    audio_path: str,
+    language: Optional[str] = None,
+    engine: Optional[ASREngine] = None
+) -> Dict[str, Any]:
+    """
+    Transcribe audio with the ASR engine (the default one if not given).
+
+    Returns the joined text plus per-segment timings and confidence
+    (avg_logprob, no_speech_prob, compression_ratio) with word timestamps.
+    Decodes as `language`, or WHISPER_LANGUAGE when not given.
+    """
+    try:
+        engine = engine or get_engine()
+        return engine.transcribe(audio_path, language=language or settings.WHISPER_LANGUAGE)
+    except ASRUnavailableError:
+        # Fail the call so it is retried, rather than storing empty text
+        raise
+    except Exception as e:
+        logger.error(f"Error transcribing audio: {str(e)}")
+        return {'text': "", 'segments': []}
+
+def detect_language(audio_paths: List[str], engine: Optional[ASREngine] = None) -> Optional[Dict[str, Any]]:
+    """
+    Identify the spoken language from a few audio windows.
     
-    # Find silent regions
-    silent_ranges = []
-    in_silence = False
-    silence_start = 0
+    Runs only the engine's language detection (for Whisper, one encoder
+    pass over the first 30 s of speech per window, no decoding) and
+    averages the language probabilities across windows. Returns None if
+    no window could be scored.
+    """
+    engine = engine or get_engine()
+    scores: Dict[str, float] = {}
+    windows = 0
+    for path in audio_paths:
+        try:
+            probabilities = engine.detect_language(path)
+        except ASRUnavailableError:
+            raise
+        except Exception as e:
+            logger.warning(f"Language detection failed on {path}: {str(e)}")
+            continue
+        for language, probability in probabilities:
+            scores[language] = scores.get(language, 0.0) + probability
+        windows += 1
     
-    for i, db in enumerate(dbfs):
-        if db < silence_thresh and not in_silence:
-            in_silence = True
-            silence_start = i
-        elif db >= silence_thresh and in_silence:
-            in_silence = False
-            if (i - silence_start) >= min_silence_len * audio_segment.frame_rate / 1000.0:
-                silent_ranges.append([silence_start, i])
+    if not windows:
+        return None
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "language": ranked[0][0],
+        "probability": round(ranked[0][1] / windows, 4),
+        "windows": windows,
+        "candidates": {language: round(score / windows, 4) for language, score in ranked[:3]},
+    }
+
+def language_id_windows(chunks: List[Dict[str, Any]], count: int) -> List[str]:
+    """Chunk paths spread evenly over the call, preferring chunks of 5 s or more."""
+    candidates = [chunk for chunk in chunks if chunk['duration'] >= 5.0] or chunks
+    if len(candidates) <= count:
+        return [chunk['path'] for chunk in candidates]
+    positions = np.linspace(0, len(candidates) - 1, count).round().astype(int)
+    return [candidates[i]['path'] for i in sorted(set(positions.tolist()))]
+
+def identify_call_language(
+    call: Call,
+    chunks: List[Dict[str, Any]],
+    engine: Optional[ASREngine] = None
+) -> Dict[str, Any]:
+    """
+    The call's language, detected once on sampled chunks and cached in
+    Call.metadata["language"] so resumed runs don't detect it again.
+    """
+    cached = (call.metadata_ or {}).get("language")
+    if cached:
+        return cached
     
-    # Handle case where audio ends in silence
-    if in_silence and (len(dbfs) - silence_start) >= min_silence_len * audio_segment.frame_rate / 1000.0:
-        silent_ranges.append([silence_start, len(dbfs)])
+    detected = detect_language(language_id_windows(chunks, settings.LANGUAGE_ID_WINDOWS), engine=engine)
+    if detected and detected["probability"] >= settings.LANGUAGE_MIN_PROBABILITY:
+        result = {**detected, "source": "detected"}
+    else:
+        result = {**(detected or {}), "language": settings.WHISPER_LANGUAGE, "source": "default"}
     
-    return silent_ranges
+    call.language = result["language"]
+    call.metadata_ = {**(call.metadata_ or {}), "language": result}
+    return result
 
-def transcribe_audio(audio_path: str) -> str:
-    """Transcribe audio using Whisper."""
-    try:
-        model = get_whisper_model()
-        segments, _ = model.transcribe(
-            audio_path,
-            language="hi",  # Default to Hindi, can be made configurable
-            beam_size=5,
-            vad_filter=True
-        )
-        
-        # Combine all segments into a single text
-        text = " ".join([segment.text for segment in segments])
-        return text.strip()
-    except Exception as e:
-        logger.error(f"Error transcribing audio: {str(e)}")
-        return ""
+def draft_accepted(summary: Dict[str, Optional[float]]) -> bool:
+    """Whether a draft transcription's scores are good enough to keep it."""
+    if summary['avg_logprob'] is None:
+        # Nothing recognised; let the full model confirm the chunk is empty
+        return False
+    return (
+        summary['avg_logprob'] >= settings.CASCADE_MIN_AVG_LOGPROB
+        and summary['compression_ratio'] <= settings.CASCADE_MAX_COMPRESSION_RATIO
+    )
+
+def transcribe_chunk(
+    audio_path: str,
+    language: str,
+    engine: Optional[ASREngine] = None,
+    draft_engine: Optional[ASREngine] = None
+) -> Dict[str, Any]:
+    """
+    Transcribe a chunk as the call's language, re-checking the language
+    when the decode is unconfident (e.g. an English stretch in a Hindi call).
+    
+    The chunk is decoded again only if detection disagrees with enough
+    probability, and the more confident transcription is kept.
+    
+    With a draft engine (the cascade), the chunk is transcribed by it
+    first and only re-decoded by `engine` when the draft's log-prob or
+    compression ratio fails the CASCADE_* thresholds. The result records
+    the engine that produced the text in "asr_engine" and the cascade
+    outcome ("draft" or "escalated") in "cascade".
+    """
+    engine = engine or get_engine()
+    cascade = None
+    if draft_engine is not None:
+        draft = transcribe_audio(audio_path, language=language, engine=draft_engine)
+        if draft_accepted(summarize_segments(draft['segments'])):
+            draft.update(language=language, asr_engine=draft_engine.name, cascade="draft")
+            return draft
+        cascade = "escalated"
+    
+    transcription = transcribe_audio(audio_path, language=language, engine=engine)
+    transcription.update(language=language, asr_engine=engine.name, cascade=cascade)
+    
+    confidence = summarize_segments(transcription['segments'])['confidence']
+    if confidence is None or confidence >= settings.LANGUAGE_RECHECK_CONFIDENCE:
+        return transcription
+    
+    detected = detect_language([audio_path], engine=engine)
+    if (
+        not detected
+        or detected['language'] == language
+        or detected['probability'] < settings.LANGUAGE_MIN_PROBABILITY
+    ):
+        return transcription
+    
+    retry = transcribe_audio(audio_path, language=detected['language'], engine=engine)
+    retry_confidence = summarize_segments(retry['segments'])['confidence']
+    if retry_confidence is not None and retry_confidence > confidence:
+        logger.info(f"Chunk {audio_path} re-decoded as {detected['language']} (call language {language})")
+        retry.update(language=detected['language'], asr_engine=engine.name, cascade=cascade)
+        return retry
+    return transcription
 
-def process_call(call_id: int):
-    """Process a call: split into chunks and transcribe each chunk."""
+def process_call(call_id: int, queue: Optional[str] = None, raise_errors: bool = False):
+    """
+    Process a call: split into chunks and transcribe each chunk.
+    
+    Each chunk is committed as soon as it is transcribed and counted in
+    Call.chunks_ready, so review can start before the call finishes.
+    
+    Re-running on a call is idempotent and resumes interrupted work: a
+    finished conversion and split (chunks.json) are reused, and chunks that
+    already have a row are not transcribed again.
+    
+    Chunks are transcribed with the ASR engine configured for `queue`
+    (ASR_QUEUE_ENGINES, else ASR_ENGINE), after a draft pass with
+    ASR_DRAFT_ENGINE when the cascade is enabled.
+    
+    With PREPROCESS_WORKERS set, conversion and splitting run on a process
+    pool shared by the calls this worker processes (app.tasks.preprocessing).
+    
+    Per-stage timings are stored in Call.metadata["processing"] and
+    exported as Prometheus metrics. Progress events are published as the
+    call moves through the pipeline (see app.core.progress).
+    
+    Returns True once the call is processed and False if it does not
+    exist. A failed run marks the call failed and returns False, or with
+    raise_errors re-raises and leaves the call to be retried (see
+    fail_call).
+    """
     db = next(get_db())
+    metrics = PipelineMetrics()
+    progress = CallProgress(call_id)
+    audio_seconds = None
     
     try:
+        # Imported here: app.tasks.preprocessing builds on this module
+        from app.tasks.preprocessing import PreprocessingError, get_preprocess_pool, preprocess_call
+        
+        engine = get_engine(queue)
+        draft_engine = get_draft_engine()
+        cascade_counts = {"draft": 0, "escalated": 0}
+        
         # Get call from database
         call = db.query(Call).filter(Call.id == call_id).first()
         if not call:
@@ -229,17 +428,98 @@ def process_call(call_id: int):
         base_name = os.path.splitext(os.path.basename(input_path))[0]
         wav_path = os.path.join(processed_dir, f"{base_name}.wav")
         
-        if not convert_audio(input_path, wav_path):
-            raise Exception("Failed to convert audio file")
+        chunks_dir = os.path.join(settings.CHUNKS_DIR, str(call_id))
+        plan_path = chunk_plan_path(processed_dir)
+        chunks = None
+        
+        progress.stage("convert", audio_seconds=call.duration)
+        if os.path.exists(wav_path):
+            audio_seconds = sf.info(wav_path).duration
+            logger.info(f"Reusing converted audio for call {call_id}")
+        else:
+            # Convert and split on the process pool when the duration is known
+            pool = get_preprocess_pool() if call.duration else None
+            if pool is not None:
+                try:
+                    audio_seconds, chunks = preprocess_call(
+                        pool, input_path, wav_path, chunks_dir, call.duration, metrics=metrics
+                    )
+                    if chunks:
+                        save_chunk_plan(plan_path, chunks)
+                except PreprocessingError as e:
+                    logger.warning(f"Parallel preprocessing failed for call {call_id}, converting serially: {str(e)}")
+                    PREPROCESS_FALLBACKS.inc()
+                    chunks = None
+            if chunks is None:
+                with metrics.stage("convert_audio") as stage:
+                    if not convert_audio(input_path, wav_path):
+                        raise Exception("Failed to convert audio file")
+                    audio_seconds = sf.info(wav_path).duration
+                    stage["audio_seconds"] = audio_seconds
+        
+        # Calls uploaded before probing (or unprobeable ones) learn it here
+        if not call.duration:
+            call.duration = audio_seconds
         
         # Split audio into chunks
-        chunks_dir = os.path.join(settings.CHUNKS_DIR, str(call_id))
-        chunks = split_audio(wav_path, chunks_dir)
+        if chunks is None:
+            chunks = load_chunk_plan(plan_path)
+        if chunks is None:
+            progress.stage("split", audio_seconds=audio_seconds)
+            with metrics.stage("split_audio", audio_seconds=audio_seconds):
+                chunks = split_audio(wav_path, chunks_dir, metrics=metrics)
+            if chunks:
+                save_chunk_plan(plan_path, chunks)
+        
+        # One language detection pass per call, reused for every chunk
+        language = call.language
+        if chunks:
+            progress.stage("language_id")
+            with metrics.stage("language_id"):
+                language = identify_call_language(call, chunks, engine=engine)["language"]
+            db.commit()
+        
+        # Chunks committed by an earlier, interrupted run
+        done_paths = {
+            path for (path,) in db.query(Chunk.file_path).filter(Chunk.call_id == call.id)
+        }
+        resumed_chunks = sum(1 for chunk_info in chunks if chunk_info['path'] in done_paths)
+        if resumed_chunks:
+            logger.info(f"Resuming call {call_id}: {resumed_chunks}/{len(chunks)} chunks already transcribed")
+        
+        with metrics.stage("db_write"):
+            call.chunks_total = len(chunks)
+            call.chunks_ready = resumed_chunks
+            db.commit()
+        progress.chunks_planned(
+            len(chunks),
+            sum(c['duration'] for c in chunks if c['path'] not in done_paths)
+        )
+        audio_done = 0.0
         
-        # Process each chunk
+        # Process each remaining chunk
         for chunk_info in chunks:
+            if chunk_info['path'] in done_paths:
+                continue
+            
             # Transcribe chunk
-            transcription = transcribe_audio(chunk_info['path'])
+            with metrics.stage("transcribe_audio", audio_seconds=chunk_info['duration']):
+                transcription = transcribe_chunk(
+                    chunk_info['path'], language, engine=engine, draft_engine=draft_engine
+                )
+                if transcription['cascade']:
+                    cascade_counts[transcription['cascade']] += 1
+            
+            with metrics.stage("save_timings"):
+                # Keep word timings in a packed side file, scores on the row
+                timings_path = timings_path_for(chunk_info['path'])
+                save_timings(timings_path, transcription['segments'])
+                
+                summary = summarize_segments(transcription['segments'])
+                priority = compute_review_priority(
+                    summary, transcription['text'], chunk_info['duration'],
+                    max_duration=settings.MAX_AUDIO_DURATION
+                )
             
             # Create chunk record
             chunk = Chunk(
@@ -248,27 +528,145 @@ def process_call(call_id: int):
                 start_time=chunk_info['start_time'],
                 end_time=chunk_info['end_time'],
                 duration=chunk_info['duration'],
-                original_text=transcription,
+                original_text=transcription['text'],
+                timings_path=timings_path,
                 status=ChunkStatus.PENDING,
-                speaker_role=SpeakerRole.UNKNOWN
+                speaker_role=SpeakerRole.UNKNOWN,
+                review_priority=priority,
+                metadata_={
+                    key: transcription[key]
+                    for key in ("language", "asr_engine", "cascade")
+                    if transcription[key]
+                },
+                **summary
             )
-            db.add(chunk)
+            
+            with metrics.stage("db_write"):
+                db.add(chunk)
+                
+                # Commit each chunk so it is reviewable straight away; this
+                # is also the checkpoint a retried run resumes from
+                call.chunks_ready += 1
+                db.commit()
+            
+            audio_done += chunk_info['duration']
+            progress.chunk_done(call.chunks_ready, audio_done)
         
         # Update call status
-        call.status = CallStatus.PROCESSED
+        with metrics.stage("db_write"):
+            call.status = CallStatus.PROCESSED
+            db.commit()
+        
+        call.metadata_ = {
+            **(call.metadata_ or {}),
+            "processing": {
+                **metrics.as_dict(audio_seconds),
+                "resumed_chunks": resumed_chunks,
+                "asr_engine": engine.name,
+                **({"draft_engine": draft_engine.name, "cascade": cascade_counts} if draft_engine else {})
+            }
+        }
         db.commit()
+        CALLS_PROCESSED.labels(status="processed").inc()
+        progress.completed(status=CallStatus.PROCESSED.value)
         return True
         
     except Exception as e:
         logger.error(f"Error processing call {call_id}: {str(e)}")
-        if 'call' in locals():
-            call.status = CallStatus.FAILED
+        db.rollback()
+        if 'call' in locals() and call is not None:
+            if not raise_errors:
+                call.status = CallStatus.FAILED
+            call.metadata_ = {
+                **(call.metadata_ or {}),
+                "processing": {**metrics.as_dict(audio_seconds), "error": str(e)}
+            }
             db.commit()
+        if raise_errors:
+            raise
+        CALLS_PROCESSED.labels(status="failed").inc()
+        progress.failed(str(e))
         return False
     finally:
         db.close()
 
-@celery_app.task(bind=True, name="process_call_task")
+def fail_call(call_id: int, error: str):
+    """Mark a call failed after its last attempt, as process_call does without retries."""
+    db = next(get_db())
+    try:
+        call = db.query(Call).filter(Call.id == call_id).first()
+        if call is not None:
+            call.status = CallStatus.FAILED
+            db.commit()
+    finally:
+        db.close()
+    CALLS_PROCESSED.labels(status="failed").inc()
+    CallProgress(call_id).failed(error)
+
+def count_attempt(call_id: int) -> Optional[int]:
+    """
+    Count a delivery of process_call_task in Call.metadata["attempts"].
+
+    Redeliveries after the worker was lost (OOM, a crash in a decoder)
+    are counted too; Celery's retry count only sees retries. None if the
+    call does not exist.
+    """
+    db = next(get_db())
+    try:
+        call = db.query(Call).filter(Call.id == call_id).with_for_update().first()
+        if call is None:
+            return None
+        attempts = (call.metadata_ or {}).get("attempts", 0) + 1
+        call.metadata_ = {**(call.metadata_ or {}), "attempts": attempts}
+        db.commit()
+        return attempts
+    finally:
+        db.close()
+
+@celery_app.task(
+    bind=True,
+    name="process_call_task",
+    acks_late=True,
+    reject_on_worker_lost=True,
+    max_retries=settings.PROCESS_MAX_RETRIES
+)
 def process_call_task(self, call_id: int):
-    """Celery task to process a call."""
-    return process_call(call_id)
+    """
+    Celery task to process a call.
+    
+    Acknowledged only once it finishes, so a call whose worker dies is
+    redelivered. Failed runs (including the soft time limit) are retried
+    with exponential backoff and resume from the last committed chunk;
+    the call is marked failed only once the retries run out. Deliveries
+    are counted on the call, so one that keeps killing its worker is
+    failed after as many attempts instead of being redelivered forever.
+    Calls that no longer exist are not retried. The queue the task came
+    from selects the ASR engine.
+    """
+    attempts = count_attempt(call_id)
+    if attempts is None:
+        logger.error(f"Call with ID {call_id} not found")
+        return False
+    if attempts > settings.PROCESS_MAX_RETRIES + 1:
+        logger.error(f"Giving up on call {call_id} after {attempts - 1} attempts")
+        fail_call(call_id, f"Gave up after {attempts - 1} attempts; the worker was lost while processing")
+        return False
+    
+    queue = (self.request.delivery_info or {}).get("routing_key")
+    try:
+        return process_call(call_id, queue=queue, raise_errors=True)
+    except Exception as e:
+        error = str(e)
+    
+    countdown = get_exponential_backoff_interval(
+        factor=settings.PROCESS_RETRY_BACKOFF,
+        retries=self.request.retries,
+        maximum=settings.PROCESS_RETRY_BACKOFF_MAX,
+        full_jitter=True
+    )
+    try:
+        raise self.retry(countdown=countdown)
+    except MaxRetriesExceededError:
+        logger.error(f"Giving up on call {call_id} after {self.request.retries} retries")
+        fail_call(call_id, error)
+        return False
@@ -1,11 +1,25 @@
+import os
+import math
+import logging
+from typing import Dict, Any, Optional
+
 from celery import Celery
+from celery.signals import worker_init, worker_process_shutdown
+from kombu import Queue
+
 from app.core.config import settings
+from app.core.metrics import MULTIPROCESS, mark_process_dead, start_metrics_server
+
+logger = logging.getLogger(__name__)
+
+# Call processing queues, by expected audio duration
+CALL_QUEUES = ("calls.short", "calls.medium", "calls.long")
 
 celery_app = Celery(
     "whisper_tasks",
     broker=settings.REDIS_URL,
     backend=settings.REDIS_URL,
-    include=["app.tasks.audio_processing"]
+    include=["app.tasks.audio_processing", "app.tasks.export", "app.tasks.retention"]
 )
 
 # Using the settings module
@@ -17,5 +31,94 @@ celery_app.conf.update(
     enable_utc=True,
     task_track_started=True,
     task_time_limit=60 * 60,  # 1 hour
-    task_soft_time_limit=55 * 60  # 55 minutes
+    task_soft_time_limit=55 * 60,  # 55 minutes
+    # Calls are processed from duration-based queues (see route_call) so a
+    # backfill of long recordings can't starve short calls; exports and
+    # anything unrouted stay on the default queue
+    task_queues=[Queue("celery")] + [Queue(name) for name in CALL_QUEUES],
+    task_default_queue="celery",
+    task_routes={"process_call_task": {"queue": "calls.medium"}},
+    # One task reserved per process: tasks run for minutes and are acked
+    # late, so prefetching only holds work another worker could start
+    worker_prefetch_multiplier=1,
+    # Late-acked tasks are redelivered if not acked within the visibility
+    # timeout; keep it above the hard time limit to avoid duplicate runs
+    broker_transport_options={
+        "visibility_timeout": 2 * 60 * 60,
+        # Ten priority levels per queue; with Redis 0 is served first
+        "priority_steps": list(range(10)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+    },
+    # Run by `celery beat`; the retention task reclaims disk space from
+    # processed, failed and deleted calls (see app.tasks.retention)
+    beat_schedule={
+        "retention": {
+            "task": "retention_task",
+            "schedule": settings.RETENTION_INTERVAL_MINUTES * 60,
+        },
+    },
 )
+
+
+def uses_prefork(worker) -> bool:
+    """Whether a worker runs its tasks in prefork child processes."""
+    from celery.concurrency import get_implementation
+    from celery.concurrency.prefork import TaskPool
+
+    pool_cls = get_implementation(worker.pool_cls)
+    return isinstance(pool_cls, type) and issubclass(pool_cls, TaskPool)
+
+@worker_init.connect
+def start_worker_metrics(sender=None, **kwargs):
+    """
+    Expose Prometheus metrics from the worker (0 disables).
+
+    The server runs in the worker's main process; prefork tasks run in
+    child processes, whose metrics only reach it through the files in
+    PROMETHEUS_MULTIPROC_DIR. Without it the server would only ever show
+    an empty registry, so it is not started.
+    """
+    if not settings.WORKER_METRICS_PORT:
+        return
+    if not MULTIPROCESS and sender is not None and uses_prefork(sender):
+        logger.error(
+            "Not serving worker metrics: the prefork pool needs PROMETHEUS_MULTIPROC_DIR "
+            "set to an empty, writable directory to collect metrics from its processes"
+        )
+        return
+    start_metrics_server(settings.WORKER_METRICS_PORT)
+
+@worker_process_shutdown.connect
+def mark_worker_process_dead(pid=None, **kwargs):
+    """Forget a prefork child's live gauges once it exits."""
+    mark_process_dead(pid or os.getpid())
+
+def estimate_call_duration(duration: Optional[float], file_size: Optional[int]) -> Optional[float]:
+    """Known duration, or a rough one from the file size when not probed."""
+    if duration:
+        return duration
+    if file_size:
+        return file_size / settings.UPLOAD_BYTES_PER_SECOND
+    return None
+
+def route_call(duration: Optional[float] = None, file_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Queue and priority for processing a call, shortest job first.
+    
+    Calls go to calls.short/medium/long by duration; within a queue the
+    priority grows by one step per doubling of duration above a minute,
+    so shorter calls are picked up first.
+    """
+    seconds = estimate_call_duration(duration, file_size)
+    if seconds is None:
+        return {"queue": "calls.medium", "priority": 5}
+    
+    if seconds <= settings.SHORT_CALL_SECONDS:
+        queue = "calls.short"
+    elif seconds <= settings.LONG_CALL_SECONDS:
+        queue = "calls.medium"
+    else:
+        queue = "calls.long"
+    priority = min(9, max(0, int(math.log2(max(seconds, 60.0) / 60.0))))
+    return {"queue": queue, "priority": priority}
@@ -0,0 +1,686 @@
+import os
+import io
+import json
+import shutil
+import logging
+import tarfile
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Iterator, Iterable, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.exports import find_parent_export, split_spec
+from app.db.base import SessionLocal
+from app.models.models import EXPORT_FORMATS, Chunk, ChunkStatus, Export
+from app.tasks.celery_app import celery_app
+from app.tasks.features import (
+    FeatureCache, FeatureExportBuilder, get_feature_tokenizer, merge_feature_index
+)
+
+logger = logging.getLogger(__name__)
+
+# Columns needed to build a training sample; full ORM rows are never loaded
+EXPORT_COLUMNS = (
+    Chunk.id,
+    Chunk.call_id,
+    Chunk.file_path,
+    Chunk.start_time,
+    Chunk.end_time,
+    Chunk.duration,
+    Chunk.original_text,
+    Chunk.corrected_text,
+    Chunk.speaker_role,
+)
+
+def iter_approved_chunks(
+    db: Session,
+    batch_size: int = 1000,
+    until: Optional[datetime] = None,
+    split_salt: int = 0
+) -> Iterator[Any]:
+    """
+    Stream approved chunk rows in id order.
+
+    yield_per keeps a server-side cursor open so only one batch of rows is
+    held in memory regardless of how many chunks are approved. Each row
+    carries its split_bucket, computed by the database.
+    """
+    query = (
+        db.query(
+            *EXPORT_COLUMNS,
+            split_bucket_expr(Chunk.call_id, split_salt).label("split_bucket")
+        )
+        .filter(Chunk.status == ChunkStatus.APPROVED)
+    )
+    if until is not None:
+        query = query.filter(Chunk.updated_at <= until)
+    for row in query.order_by(Chunk.id).yield_per(batch_size):
+        yield row
+
+def iter_changed_chunks(
+    db: Session,
+    since: datetime,
+    until: datetime,
+    batch_size: int = 1000,
+    split_salt: int = 0
+) -> Iterator[Any]:
+    """
+    Stream chunks of any status updated in (since, until], in id order.
+
+    Served by the updated_at index, so the cost follows the number of
+    changed rows rather than the corpus size.
+    """
+    query = (
+        db.query(
+            *EXPORT_COLUMNS,
+            Chunk.status,
+            split_bucket_expr(Chunk.call_id, split_salt).label("split_bucket")
+        )
+        .filter(Chunk.updated_at > since, Chunk.updated_at <= until)
+        .order_by(Chunk.id)
+        .yield_per(batch_size)
+    )
+    for row in query:
+        yield row
+
+def _divert_unapproved(rows: Iterable[Any], removed: List[int]) -> Iterator[Any]:
+    """Pass approved rows through and collect ids of the rest as removals."""
+    for row in rows:
+        if row.status == ChunkStatus.APPROVED:
+            yield row
+        else:
+            removed.append(row.id)
+
+def find_deleted_chunks(db: Session, chunk_ids: np.ndarray, batch_size: int = 1000) -> List[int]:
+    """
+    Ids in chunk_ids that no longer exist.
+
+    A deleted chunk leaves no row for iter_changed_chunks to find, so the
+    ids of the manifest being extended are looked up by primary key.
+    """
+    deleted: List[int] = []
+    for start in range(0, len(chunk_ids), batch_size):
+        batch = chunk_ids[start:start + batch_size]
+        existing = np.fromiter(
+            (chunk_id for (chunk_id,) in db.query(Chunk.id).filter(Chunk.id.in_(batch.tolist()))),
+            dtype=np.int64
+        )
+        deleted.extend(batch[~np.isin(batch, existing)].tolist())
+    return deleted
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+def iter_with_audio(
+    rows: Iterable[Any],
+    max_workers: int = 8
+) -> Iterator[Tuple[Any, bytes]]:
+    """
+    Read chunk audio on a thread pool while preserving row order.
+
+    At most max_workers * 4 reads are in flight, so memory stays bounded
+    while the disk queue is kept full.
+    """
+    window = max_workers * 4
+    pending = deque()
+
+    def drain_one():
+        row, future = pending.popleft()
+        try:
+            return row, future.result()
+        except OSError as e:
+            logger.warning(f"Skipping chunk {row.id}: cannot read audio ({e})")
+            return row, None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for row in rows:
+            pending.append((row, pool.submit(_read_file, row.file_path)))
+            if len(pending) >= window:
+                row, audio = drain_one()
+                if audio is not None:
+                    yield row, audio
+
+        while pending:
+            row, audio = drain_one()
+            if audio is not None:
+                yield row, audio
+
+# Fibonacci hashing of call_id into 100 buckets. Integer-only arithmetic so
+# the expression gives identical buckets in PostgreSQL and SQLite.
+SPLIT_HASH_MULTIPLIER = 2654435761
+SPLIT_HASH_MODULUS = 2 ** 32
+
+def split_bucket_expr(call_id_column, salt: int = 0):
+    """SQL expression mapping a call id to a stable bucket in [0, 100)."""
+    hashed = ((call_id_column + salt) * SPLIT_HASH_MULTIPLIER) % SPLIT_HASH_MODULUS
+    return (hashed * 100) // SPLIT_HASH_MODULUS
+
+def assign_split(bucket: int, train_split: int) -> str:
+    """
+    Assign a split from a call's hash bucket.
+
+    All chunks of a call share a bucket, so a call never straddles train
+    and validation, and membership does not change as new data arrives.
+    """
+    return "train" if bucket < train_split else "validation"
+
+def sample_key(row: Any) -> str:
+    """WebDataset-safe sample key (no dots) for a chunk row."""
+    return f"chunk_{row.id:010d}"
+
+def sample_record(row: Any) -> Dict[str, Any]:
+    """Metadata stored next to the audio for each exported sample."""
+    return {
+        "chunk_id": row.id,
+        "call_id": row.call_id,
+        "text": row.corrected_text or row.original_text or "",
+        "speaker_role": getattr(row.speaker_role, "value", row.speaker_role),
+        "start_time": row.start_time,
+        "end_time": row.end_time,
+        "duration": row.duration,
+    }
+
+class WebDatasetShardWriter:
+    """Writes samples as `<key>.wav` + `<key>.json` members of a tar shard."""
+
+    extension = "tar"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "wb", buffering=settings.EXPORT_WRITE_BUFFER)
+        self._tar = tarfile.open(fileobj=self._file, mode="w")
+
+    def _add(self, name: str, data: bytes):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def write(self, key: str, audio: bytes, record: Dict[str, Any]):
+        self._add(f"{key}.wav", audio)
+        self._add(f"{key}.json", json.dumps(record, ensure_ascii=False).encode("utf-8"))
+
+    def close(self):
+        self._tar.close()
+        self._file.close()
+
+class ParquetShardWriter:
+    """
+    Writes samples as Parquet rows with the audio bytes inlined.
+
+    The audio column uses the {bytes, path} struct that Hugging Face
+    `datasets` decodes as an Audio feature.
+    """
+
+    extension = "parquet"
+
+    def __init__(self, path: str, row_group_size: int = 500):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self.path = path
+        self.row_group_size = row_group_size
+        self.schema = pa.schema([
+            ("key", pa.string()),
+            ("audio", pa.struct([("bytes", pa.binary()), ("path", pa.string())])),
+            ("text", pa.string()),
+            ("chunk_id", pa.int64()),
+            ("call_id", pa.int64()),
+            ("speaker_role", pa.string()),
+            ("start_time", pa.float64()),
+            ("end_time", pa.float64()),
+            ("duration", pa.float64()),
+        ])
+        self._writer = pq.ParquetWriter(path, self.schema)
+        self._rows: List[Dict[str, Any]] = []
+
+    def _flush(self):
+        if self._rows:
+            table = self._pa.Table.from_pylist(self._rows, schema=self.schema)
+            self._writer.write_table(table)
+            self._rows = []
+
+    def write(self, key: str, audio: bytes, record: Dict[str, Any]):
+        self._rows.append({
+            "key": key,
+            "audio": {"bytes": audio, "path": f"{key}.wav"},
+            **record,
+        })
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+SHARD_WRITERS = {
+    "webdataset": WebDatasetShardWriter,
+    "parquet": ParquetShardWriter,
+}
+
+class ShardedDatasetWriter:
+    """
+    Routes samples to per-split shard writers, rolling over to a new shard
+    once the sample count or byte budget of the current one is reached.
+
+    Shard paths are recorded relative to path_root (the exports directory)
+    so manifests can reference shards written by earlier exports. The
+    chunk id -> shard mapping is kept in compact arrays for the index.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        format: str = "webdataset",
+        max_samples: int = 2000,
+        max_bytes: int = 512 * 1024 * 1024,
+        path_root: Optional[str] = None
+    ):
+        if format not in SHARD_WRITERS:
+            raise ValueError(f"Unknown export format: {format}")
+        self.output_dir = output_dir
+        self.path_root = path_root or os.path.dirname(output_dir)
+        self.writer_class = SHARD_WRITERS[format]
+        self.max_samples = max_samples
+        self.max_bytes = max_bytes
+        self.shards: List[Dict[str, Any]] = []
+        self.chunk_ids = array("q")
+        self.shard_numbers = array("i")
+        self.durations = array("f")
+        self._open: Dict[str, Dict[str, Any]] = {}
+        self._counts: Dict[str, int] = {}
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _start_shard(self, split: str) -> Dict[str, Any]:
+        index = self._counts.get(split, 0)
+        self._counts[split] = index + 1
+        name = f"{split}-{index:05d}.{self.writer_class.extension}"
+        path = os.path.join(self.output_dir, name)
+        info = {
+            "path": os.path.relpath(path, self.path_root),
+            "split": split,
+            "num_samples": 0,
+            "audio_bytes": 0,
+            "duration": 0.0,
+            "first_chunk_id": None,
+            "last_chunk_id": None,
+        }
+        shard = {
+            "writer": self.writer_class(path),
+            "number": len(self.shards),
+            "info": info,
+        }
+        self.shards.append(info)
+        self._open[split] = shard
+        return shard
+
+    def _finish_shard(self, split: str):
+        shard = self._open.pop(split)
+        shard["writer"].close()
+        info = shard["info"]
+        info["size_bytes"] = os.path.getsize(os.path.join(self.path_root, info["path"]))
+
+    def write(self, split: str, key: str, audio: bytes, record: Dict[str, Any]):
+        shard = self._open.get(split) or self._start_shard(split)
+        info = shard["info"]
+        if info["num_samples"] >= self.max_samples or info["audio_bytes"] >= self.max_bytes:
+            self._finish_shard(split)
+            shard = self._start_shard(split)
+            info = shard["info"]
+
+        shard["writer"].write(key, audio, record)
+        info["num_samples"] += 1
+        info["audio_bytes"] += len(audio)
+        info["duration"] += record.get("duration") or 0.0
+        if info["first_chunk_id"] is None:
+            info["first_chunk_id"] = record["chunk_id"]
+        info["last_chunk_id"] = record["chunk_id"]
+
+        self.chunk_ids.append(record["chunk_id"])
+        self.shard_numbers.append(shard["number"])
+        self.durations.append(record.get("duration") or 0.0)
+
+    def close(self) -> List[Dict[str, Any]]:
+        for split in list(self._open):
+            self._finish_shard(split)
+        return self.shards
+
+    def abort(self):
+        """Close open shards of a failed export and delete its output directory."""
+        for shard in self._open.values():
+            try:
+                shard["writer"].close()
+            except Exception as e:
+                logger.warning(f"Could not close shard {shard['info']['path']}: {str(e)}")
+        self._open.clear()
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def index(self) -> Dict[str, np.ndarray]:
+        """Arrays mapping every written chunk id to its shard number."""
+        return {
+            "chunk_id": np.frombuffer(self.chunk_ids, dtype=np.int64),
+            "shard": np.frombuffer(self.shard_numbers, dtype=np.int32),
+            "duration": np.frombuffer(self.durations, dtype=np.float32),
+        }
+
+def save_index(path: str, index: Dict[str, np.ndarray]):
+    """Store the chunk id -> shard index next to the manifest."""
+    with open(path, "wb") as f:
+        np.savez(f, **index)
+
+def load_index(path: str) -> Dict[str, np.ndarray]:
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
+
+def compact_manifest(
+    base_shards: List[Dict[str, Any]],
+    base_index: Dict[str, np.ndarray],
+    delta_shards: List[Dict[str, Any]],
+    delta_index: Dict[str, np.ndarray],
+    removed_ids: Iterable[int]
+) -> Tuple[List[Dict[str, Any]], Dict[str, np.ndarray]]:
+    """
+    Merge a delta export into the previous compacted manifest.
+
+    Samples from the base that were re-exported in the delta or are in
+    removed_ids (no longer approved, or deleted) are dropped from the
+    index; a later copy of a chunk always wins. Shards left with no live
+    samples are removed and the rest renumbered.
+    """
+    stale = np.concatenate([
+        delta_index["chunk_id"],
+        np.fromiter(removed_ids, dtype=np.int64),
+    ])
+    keep = ~np.isin(base_index["chunk_id"], stale)
+
+    shards = list(base_shards) + list(delta_shards)
+    merged = {
+        "chunk_id": np.concatenate([base_index["chunk_id"][keep], delta_index["chunk_id"]]),
+        "shard": np.concatenate([
+            base_index["shard"][keep],
+            delta_index["shard"] + len(base_shards),
+        ]).astype(np.int32),
+        "duration": np.concatenate([base_index["duration"][keep], delta_index["duration"]]),
+    }
+
+    live = np.bincount(merged["shard"], minlength=len(shards))
+    used = np.flatnonzero(live)
+    remap = np.full(len(shards), -1, dtype=np.int32)
+    remap[used] = np.arange(len(used), dtype=np.int32)
+    merged["shard"] = remap[merged["shard"]]
+
+    compacted = [{**shards[i], "live_samples": int(live[i])} for i in used]
+    return compacted, merged
+
+def summarize_splits(
+    shards: List[Dict[str, Any]],
+    index: Dict[str, np.ndarray]
+) -> Dict[str, Dict[str, Any]]:
+    """Live sample count and duration per split from a compacted index."""
+    counts = np.bincount(index["shard"], minlength=len(shards))
+    durations = np.bincount(index["shard"], weights=index["duration"], minlength=len(shards))
+    splits: Dict[str, Dict[str, Any]] = {}
+    for shard, count, duration in zip(shards, counts.tolist(), durations.tolist()):
+        split = splits.setdefault(shard["split"], {"num_samples": 0, "duration": 0.0})
+        split["num_samples"] += count
+        split["duration"] += duration
+    return splits
+
+def write_manifest(output_dir: str, manifest: Dict[str, Any]) -> str:
+    """Write manifest.json describing an export's shards."""
+    path = os.path.join(output_dir, "manifest.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, default=str)
+    return path
+
+def build_feature_index(
+    builder: FeatureExportBuilder,
+    output_dir: str,
+    parent: Optional[Export],
+    delta_index: Dict[str, np.ndarray],
+    removed: List[int]
+) -> Dict[str, Any]:
+    """
+    Finish feature computation and write features.npz for an export.
+
+    For incremental exports the parent's feature index is merged in, so
+    features.npz always covers every live sample of the manifest.
+    """
+    index, shard_names = builder.finish()
+    n_mels = builder.cache.n_mels
+    complete = parent is None
+
+    if parent is not None:
+        parent_features = (parent.metadata_ or {}).get("features") or {}
+        parent_path = os.path.join(parent.file_path, "features.npz")
+        if (parent_features.get("n_mels") == n_mels and parent_features.get("complete")
+                and os.path.exists(parent_path)):
+            stale = np.concatenate([
+                delta_index["chunk_id"],
+                np.array(removed, dtype=np.int64),
+            ])
+            index, shard_names = merge_feature_index(
+                load_index(parent_path), parent_features["shards"],
+                index, shard_names, stale
+            )
+            complete = True
+        else:
+            logger.warning(
+                f"Parent export {parent.id} has no {n_mels}-bin feature index; "
+                f"features cover only the delta"
+            )
+
+    save_index(os.path.join(output_dir, "features.npz"), index)
+    return {
+        "n_mels": n_mels,
+        "cache_dir": builder.cache.directory,
+        "shards": shard_names,
+        "index": "features.npz",
+        "tokenizer": settings.FEATURE_TOKENIZER if builder.tokenizer is not None else None,
+        "complete": complete,
+        "computed": builder.computed,
+        "reused": len(builder.keys) - builder.computed,
+    }
+
+def export_dataset(export_id: int) -> bool:
+    """
+    Stream approved chunks into sharded dataset files for an Export.
+
+    Incremental exports only write chunks changed since the parent
+    export's watermark and merge them into the parent's compacted
+    manifest; chunks that were un-approved or deleted since are dropped
+    from it.
+
+    updated_at is set at transaction start, so a review committed just
+    after the parent read its watermark can carry an older timestamp.
+    The delta therefore re-scans EXPORT_WATERMARK_LAG_SECONDS behind the
+    watermark; chunks exported twice this way replace their earlier copy
+    when the manifests are merged, as compact_manifest keys on chunk id.
+    """
+    db = SessionLocal()
+    # Separate session for the streaming read so committing export status
+    # does not close the server-side cursor
+    read_db = SessionLocal()
+
+    try:
+        export = db.query(Export).filter(Export.id == export_id).first()
+        if not export:
+            logger.error(f"Export with ID {export_id} not found")
+            return False
+
+        options = dict(export.metadata_ or {})
+        export_format = options.get("format", "webdataset")
+        output_dir = export.file_path
+        path_root = os.path.dirname(output_dir)
+
+        parent = (
+            find_parent_export(db, export_format, before_id=export.id)
+            if options.get("incremental") else None
+        )
+        split = split_spec(options.get("train_split", 80), options.get("split_salt", 0))
+        if parent is not None and parent.metadata_.get("split", split) != split:
+            # Split membership must match the manifest being extended; the
+            # API resolves this when the export is requested, so only an
+            # export completed in between gets here
+            raise ValueError(
+                f"Split {split} differs from {parent.metadata_['split']} of parent export {parent.id}"
+            )
+        options["split"] = split
+        train_split = split["train_split"]
+        split_salt = split["salt"]
+
+        # Upper bound of this export; later edits go into the next delta
+        watermark = db.query(func.max(Chunk.updated_at)).scalar()
+        max_chunk_id = db.query(func.max(Chunk.id)).scalar()
+
+        export.metadata_ = {
+            **options,
+            "status": "running",
+            "parent_export_id": parent.id if parent else None,
+        }
+        db.commit()
+
+        writer = ShardedDatasetWriter(
+            output_dir,
+            format=export_format,
+            max_samples=settings.EXPORT_SHARD_MAX_SAMPLES,
+            max_bytes=settings.EXPORT_SHARD_MAX_BYTES,
+            path_root=path_root
+        )
+        feature_builder = None
+        if options.get("features"):
+            feature_builder = FeatureExportBuilder(
+                FeatureCache(
+                    settings.FEATURES_DIR,
+                    n_mels=int(options.get("n_mels", 80)),
+                    shard_size=settings.FEATURE_SHARD_SIZE,
+                    prefix=f"export{export.id:05d}"
+                ),
+                tokenizer=get_feature_tokenizer(),
+                batch_size=settings.FEATURE_BATCH_SIZE,
+                workers=settings.FEATURE_WORKERS
+            )
+
+        removed: List[int] = []
+        if parent is not None and watermark is not None:
+            since = (
+                datetime.fromisoformat(parent.metadata_["watermark"]["updated_at"])
+                - timedelta(seconds=settings.EXPORT_WATERMARK_LAG_SECONDS)
+            )
+            changed = iter_changed_chunks(
+                read_db, since, watermark,
+                batch_size=settings.EXPORT_BATCH_SIZE,
+                split_salt=split_salt
+            )
+            rows = _divert_unapproved(changed, removed)
+        else:
+            rows = iter_approved_chunks(
+                read_db,
+                batch_size=settings.EXPORT_BATCH_SIZE,
+                until=watermark,
+                split_salt=split_salt
+            )
+
+        for row, audio in iter_with_audio(rows, max_workers=settings.EXPORT_READ_WORKERS):
+            record = sample_record(row)
+            writer.write(
+                assign_split(row.split_bucket, train_split),
+                sample_key(row),
+                audio,
+                record
+            )
+            if feature_builder is not None:
+                feature_builder.add(row.id, audio, record["text"])
+        delta_shards = writer.close()
+
+        if parent is not None:
+            parent_dir = parent.file_path
+            with open(os.path.join(parent_dir, "manifest.json"), encoding="utf-8") as f:
+                parent_manifest = json.load(f)
+            parent_index = load_index(os.path.join(parent_dir, "index.npz"))
+            removed.extend(find_deleted_chunks(
+                read_db, parent_index["chunk_id"], batch_size=settings.EXPORT_BATCH_SIZE
+            ))
+            shards, index = compact_manifest(
+                parent_manifest["shards"],
+                parent_index,
+                delta_shards,
+                writer.index(),
+                removed
+            )
+        else:
+            shards = [{**shard, "live_samples": shard["num_samples"]} for shard in delta_shards]
+            index = writer.index()
+
+        features_info = None
+        if feature_builder is not None:
+            features_info = build_feature_index(
+                feature_builder, output_dir, parent, writer.index(), removed
+            )
+
+        splits = summarize_splits(shards, index)
+        watermark_info = {
+            "updated_at": watermark.isoformat() if watermark else None,
+            "max_chunk_id": max_chunk_id,
+        }
+
+        save_index(os.path.join(output_dir, "index.npz"), index)
+        write_manifest(output_dir, {
+            "export_id": export.id,
+            "name": export.name,
+            "format": export_format,
+            "train_split": train_split,
+            "split": split,
+            "parent_export_id": parent.id if parent else None,
+            "watermark": watermark_info,
+            "splits": splits,
+            "shards": shards,
+            "features": features_info,
+        })
+
+        export.file_size = sum(shard["size_bytes"] for shard in delta_shards)
+        export.metadata_ = {
+            **options,
+            "status": "completed",
+            "parent_export_id": parent.id if parent else None,
+            "watermark": watermark_info,
+            "num_samples": int(len(index["chunk_id"])),
+            "splits": splits,
+            "delta": {
+                "num_samples": sum(shard["num_samples"] for shard in delta_shards),
+                "removed": len(removed),
+            },
+            "shards": delta_shards,
+            "features": features_info,
+            "manifest": os.path.relpath(os.path.join(output_dir, "manifest.json"), path_root),
+        }
+        db.commit()
+        return True
+
+    except Exception as e:
+        logger.error(f"Error exporting dataset {export_id}: {str(e)}")
+        db.rollback()
+        # No manifest references a failed export's shards
+        if 'writer' in locals():
+            writer.abort()
+        if 'feature_builder' in locals() and feature_builder is not None:
+            feature_builder.close()
+        if 'export' in locals() and export is not None:
+            export.metadata_ = {**(export.metadata_ or {}), "status": "failed", "error": str(e)}
+            db.commit()
+        return False
+    finally:
+        read_db.close()
+        db.close()
+
+@celery_app.task(bind=True, name="export_dataset_task")
+def export_dataset_task(self, export_id: int):
+    """Celery task to build a dataset export."""
+    return export_dataset(export_id)
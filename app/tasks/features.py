@@ -0,0 +1,385 @@
+import os
+import io
+import glob
+import hashlib
+import logging
+from array import array
+from collections import deque
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.pools import ProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Whisper front-end constants: 30 s windows at 16 kHz, 25 ms / 10 ms STFT
+SAMPLE_RATE = 16000
+N_FFT = 400
+HOP_LENGTH = 160
+CHUNK_LENGTH = 30
+N_SAMPLES = CHUNK_LENGTH * SAMPLE_RATE
+N_FRAMES = N_SAMPLES // HOP_LENGTH
+
+# Merged audio hash -> (shard, row) lookup of a cache directory
+KEY_INDEX_FILE = "keys-index.npz"
+
+@lru_cache(maxsize=None)
+def mel_filters(n_mels: int) -> np.ndarray:
+    """Slaney-normalized mel filterbank, matching librosa.filters.mel as used by Whisper."""
+    f_sp = 200.0 / 3
+    min_log_hz = 1000.0
+    min_log_mel = min_log_hz / f_sp
+    logstep = np.log(6.4) / 27.0
+
+    def hz_to_mel(freqs):
+        freqs = np.asarray(freqs, dtype=np.float64)
+        mels = freqs / f_sp
+        log_region = freqs >= min_log_hz
+        return np.where(
+            log_region,
+            min_log_mel + np.log(np.maximum(freqs, min_log_hz) / min_log_hz) / logstep,
+            mels
+        )
+
+    def mel_to_hz(mels):
+        freqs = f_sp * mels
+        log_region = mels >= min_log_mel
+        return np.where(log_region, min_log_hz * np.exp(logstep * (mels - min_log_mel)), freqs)
+
+    fft_freqs = np.linspace(0, SAMPLE_RATE / 2, N_FFT // 2 + 1)
+    mel_freqs = mel_to_hz(np.linspace(hz_to_mel(0.0), hz_to_mel(SAMPLE_RATE / 2), n_mels + 2))
+
+    fdiff = np.diff(mel_freqs)
+    ramps = mel_freqs[:, None] - fft_freqs[None, :]
+    lower = -ramps[:-2] / fdiff[:-1, None]
+    upper = ramps[2:] / fdiff[1:, None]
+    weights = np.maximum(0.0, np.minimum(lower, upper))
+    weights *= (2.0 / (mel_freqs[2:n_mels + 2] - mel_freqs[:n_mels]))[:, None]
+    return weights.astype(np.float32)
+
+def pad_or_trim(audio: np.ndarray, length: int = N_SAMPLES) -> np.ndarray:
+    """Zero-pad or cut audio to exactly `length` samples."""
+    if len(audio) >= length:
+        return audio[:length]
+    return np.pad(audio, (0, length - len(audio)))
+
+def log_mel_spectrogram(audio: np.ndarray, n_mels: int = 80) -> np.ndarray:
+    """
+    Whisper log-mel features for a batch of 30 s windows.
+
+    audio is (batch, N_SAMPLES) float32; returns (batch, n_mels, N_FRAMES).
+    Framing uses strided views, so the whole batch goes through a single
+    rfft and a single matmul.
+    """
+    audio = np.atleast_2d(audio).astype(np.float32, copy=False)
+    padded = np.pad(audio, ((0, 0), (N_FFT // 2, N_FFT // 2)), mode="reflect")
+    frames = np.lib.stride_tricks.sliding_window_view(padded, N_FFT, axis=-1)[:, ::HOP_LENGTH]
+
+    window = np.hanning(N_FFT + 1)[:-1].astype(np.float32)  # periodic Hann
+    spectrum = np.fft.rfft(frames * window, axis=-1)
+    magnitudes = (np.abs(spectrum[:, :-1]) ** 2).astype(np.float32)
+
+    mel = magnitudes @ mel_filters(n_mels).T
+    log_spec = np.log10(np.maximum(mel, 1e-10))
+    log_spec = np.maximum(log_spec, log_spec.max(axis=(1, 2), keepdims=True) - 8.0)
+    return ((log_spec + 4.0) / 4.0).transpose(0, 2, 1)
+
+def decode_wav(data: bytes) -> np.ndarray:
+    """Decode 16 kHz mono WAV bytes to float32 samples."""
+    import soundfile as sf
+
+    audio, sample_rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    if sample_rate != SAMPLE_RATE:
+        raise ValueError(f"Expected {SAMPLE_RATE} Hz audio, got {sample_rate} Hz")
+    return audio.mean(axis=1)
+
+def compute_features(blobs: List[bytes], n_mels: int = 80) -> np.ndarray:
+    """Decode a batch of WAV blobs and compute float16 log-mel features (runs in worker processes)."""
+    batch = np.stack([pad_or_trim(decode_wav(blob)) for blob in blobs])
+    return log_mel_spectrogram(batch, n_mels).astype(np.float16)
+
+def audio_hash(data: bytes) -> str:
+    """Content key for cached features."""
+    return hashlib.sha1(data).hexdigest()
+
+class FeatureCache:
+    """
+    Content-addressed store of log-mel features in .npy shards.
+
+    Each shard `<name>.npy` holds (rows, n_mels, N_FRAMES) float16 features
+    and `<name>.keys.npy` the audio hashes of its rows. The keys file is
+    written last, so a shard without one is incomplete and ignored.
+    Training loaders can np.load(..., mmap_mode="r") shards directly.
+
+    The lookup over all shards is persisted in keys-index.npz, so opening
+    the cache only reads the keys files of shards written since.
+    """
+
+    def __init__(self, root: str, n_mels: int = 80, shard_size: int = 256, prefix: str = "shard"):
+        self.directory = os.path.join(root, f"mel{n_mels}")
+        self.n_mels = n_mels
+        self.shard_size = shard_size
+        self.prefix = prefix
+        self.shard_names: List[str] = []
+        self._lookup: Dict[str, Tuple[int, int]] = {}
+        self._pending_keys: List[str] = []
+        self._pending_features: List[np.ndarray] = []
+        self._pending_rows = 0
+        self._written = 0
+        self._index_stale = False
+        os.makedirs(self.directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        present = {
+            os.path.basename(path)[:-len(".keys.npy")]: path
+            for path in glob.glob(os.path.join(self.directory, "*.keys.npy"))
+        }
+        indexed = set()
+        index_path = os.path.join(self.directory, KEY_INDEX_FILE)
+        if os.path.exists(index_path):
+            with np.load(index_path, allow_pickle=False) as index:
+                names = index["names"].tolist()
+                # An index naming removed shards is rebuilt from the keys files
+                if set(names) <= set(present):
+                    for name in names:
+                        self._shard_number(name)
+                    for key, shard, row in zip(
+                        index["keys"].tolist(), index["shard"].tolist(), index["row"].tolist()
+                    ):
+                        self._lookup[key.decode("ascii")] = (shard, row)
+                    indexed = set(names)
+
+        # Shards written since the index was saved (e.g. by another export)
+        for name in sorted(set(present) - indexed):
+            self._index_stale = True
+            shard = self._shard_number(name)
+            for row, key in enumerate(np.load(present[name]).tolist()):
+                self._lookup.setdefault(key.decode("ascii"), (shard, row))
+
+        # Continue numbering after shards from an earlier attempt
+        self._written = sum(1 for name in self.shard_names if name.startswith(f"{self.prefix}-"))
+        if not present:
+            self._index_stale = False
+
+    def _shard_number(self, name: str) -> int:
+        self.shard_names.append(name)
+        return len(self.shard_names) - 1
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._lookup
+
+    def lookup(self, key: str) -> Optional[Tuple[int, int]]:
+        """(shard number, row) of cached features for an audio hash."""
+        return self._lookup.get(key)
+
+    def add(self, keys: List[str], features: np.ndarray):
+        self._pending_keys.extend(keys)
+        self._pending_features.append(features)
+        self._pending_rows += len(keys)
+        if self._pending_rows >= self.shard_size:
+            self.flush()
+
+    def flush(self):
+        """Write buffered features out as a new shard."""
+        if not self._pending_keys:
+            return
+        name = f"{self.prefix}-{self._written:05d}"
+        self._written += 1
+        data_path = os.path.join(self.directory, f"{name}.npy")
+        keys_path = os.path.join(self.directory, f"{name}.keys.npy")
+
+        np.save(data_path, np.concatenate(self._pending_features))
+        keys = np.array(self._pending_keys, dtype="S40")
+        with open(keys_path + ".tmp", "wb") as f:
+            np.save(f, keys)
+        os.replace(keys_path + ".tmp", keys_path)
+
+        shard = self._shard_number(name)
+        for row, key in enumerate(self._pending_keys):
+            self._lookup.setdefault(key, (shard, row))
+        self._pending_keys = []
+        self._pending_features = []
+        self._pending_rows = 0
+        self._index_stale = True
+
+    def save_index(self):
+        """Persist the merged lookup if shards were added since it was loaded."""
+        if not self._index_stale:
+            return
+        locations = np.array(list(self._lookup.values()), dtype=np.int32).reshape(-1, 2)
+        index_path = os.path.join(self.directory, KEY_INDEX_FILE)
+        # Concurrent exports each write their own temp file; the last
+        # replace wins and the other's shards are picked up on next load
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                keys=np.array(list(self._lookup), dtype="S40"),
+                shard=locations[:, 0],
+                row=locations[:, 1],
+                names=np.array(self.shard_names, dtype=str),
+            )
+        os.replace(tmp_path, index_path)
+        self._index_stale = False
+
+_feature_tokenizer = None
+def get_feature_tokenizer():
+    """
+    Whisper tokenizer for corrected_text, or None if transformers is
+    unavailable or the tokenizer cannot be loaded (e.g. no hub access).
+    """
+    global _feature_tokenizer
+    if _feature_tokenizer is None:
+        try:
+            from transformers import WhisperTokenizerFast
+        except ImportError:
+            logger.warning("transformers not installed; exporting features without tokens")
+            return None
+        try:
+            _feature_tokenizer = WhisperTokenizerFast.from_pretrained(settings.FEATURE_TOKENIZER)
+        except Exception as e:
+            logger.warning(f"Could not load tokenizer {settings.FEATURE_TOKENIZER}; exporting features without tokens: {str(e)}")
+            return None
+    return _feature_tokenizer
+
+class FeatureExportBuilder:
+    """
+    Collects log-mel features and token ids for the samples of an export.
+
+    Audio already in the cache is reused by hash; new audio is batched and
+    computed on a process pool (app.core.pools, which works inside Celery's
+    daemonic prefork children) with a bounded number of batches in flight.
+    The pool is shut down by finish(), or by close() when the export
+    fails, so no worker processes outlive the export.
+    """
+
+    def __init__(
+        self,
+        cache: FeatureCache,
+        tokenizer=None,
+        batch_size: int = 8,
+        workers: int = 4
+    ):
+        self.cache = cache
+        self.tokenizer = tokenizer
+        self.batch_size = batch_size
+        self.max_in_flight = workers * 2
+        self.chunk_ids = array("q")
+        self.keys: List[str] = []
+        self.tokens = array("i")
+        self.token_offsets = array("q", [0])
+        self._batch_keys: List[str] = []
+        self._batch_blobs: List[bytes] = []
+        self._queued = set()
+        self._in_flight = deque()
+        self._pool = ProcessPool(workers)
+        self.computed = 0
+
+    def close(self):
+        """Stop the worker processes, dropping work not yet collected."""
+        self._pool.shutdown(cancel_futures=True)
+
+    def add(self, chunk_id: int, audio: bytes, text: str):
+        key = audio_hash(audio)
+        self.chunk_ids.append(chunk_id)
+        self.keys.append(key)
+
+        if self.tokenizer is not None:
+            self.tokens.extend(self.tokenizer.encode(text, add_special_tokens=False))
+        self.token_offsets.append(len(self.tokens))
+
+        if key in self.cache or key in self._queued:
+            return
+        self._queued.add(key)
+        self._batch_keys.append(key)
+        self._batch_blobs.append(audio)
+        if len(self._batch_keys) >= self.batch_size:
+            self._submit()
+
+    def _submit(self):
+        if not self._batch_keys:
+            return
+        future = self._pool.submit(compute_features, self._batch_blobs, self.cache.n_mels)
+        self._in_flight.append((self._batch_keys, future))
+        self._batch_keys, self._batch_blobs = [], []
+        while len(self._in_flight) >= self.max_in_flight:
+            self._collect_one()
+
+    def _collect_one(self):
+        keys, future = self._in_flight.popleft()
+        self.cache.add(keys, future.result())
+        self.computed += len(keys)
+
+    def finish(self) -> Tuple[Dict[str, np.ndarray], List[str]]:
+        """
+        Flush outstanding work and return the feature index for the export.
+
+        The index maps each chunk id to a (shard, row) in the cache plus
+        its token ids as a flat array with offsets.
+        """
+        try:
+            self._submit()
+            while self._in_flight:
+                self._collect_one()
+            self.cache.flush()
+            self.cache.save_index()
+        finally:
+            self._pool.shutdown()
+
+        locations = np.array([self.cache.lookup(key) for key in self.keys], dtype=np.int32)
+        locations = locations.reshape(-1, 2)
+
+        # Only list the cache shards this export actually references
+        used, shard = np.unique(locations[:, 0], return_inverse=True)
+        index = {
+            "chunk_id": np.frombuffer(self.chunk_ids, dtype=np.int64).copy(),
+            "shard": shard.astype(np.int32),
+            "row": locations[:, 1],
+            "tokens": np.frombuffer(self.tokens, dtype=np.int32).copy(),
+            "token_offsets": np.frombuffer(self.token_offsets, dtype=np.int64).copy(),
+        }
+        return index, [self.cache.shard_names[i] for i in used.tolist()]
+
+def _gather_tokens(tokens: np.ndarray, offsets: np.ndarray, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Select the token runs of rows in mask from a flat tokens/offsets pair."""
+    lengths = np.diff(offsets)[mask]
+    starts = offsets[:-1][mask]
+    new_offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    positions = np.repeat(starts - new_offsets[:-1], lengths) + np.arange(new_offsets[-1])
+    return tokens[positions], new_offsets
+
+def merge_feature_index(
+    base: Dict[str, np.ndarray],
+    base_shards: List[str],
+    delta: Dict[str, np.ndarray],
+    delta_shards: List[str],
+    stale_ids: np.ndarray
+) -> Tuple[Dict[str, np.ndarray], List[str]]:
+    """Merge a delta export's feature index into its parent's, dropping stale chunks."""
+    keep = ~np.isin(base["chunk_id"], stale_ids)
+    base_tokens, base_offsets = _gather_tokens(base["tokens"], base["token_offsets"], keep)
+
+    shard_names = list(base_shards)
+    positions = {name: i for i, name in enumerate(shard_names)}
+    for name in delta_shards:
+        if name not in positions:
+            positions[name] = len(shard_names)
+            shard_names.append(name)
+    remap = np.array([positions[name] for name in delta_shards], dtype=np.int32)
+    delta_shard = remap[delta["shard"]] if len(delta["shard"]) else delta["shard"]
+
+    merged = {
+        "chunk_id": np.concatenate([base["chunk_id"][keep], delta["chunk_id"]]),
+        "shard": np.concatenate([base["shard"][keep], delta_shard]).astype(np.int32),
+        "row": np.concatenate([base["row"][keep], delta["row"]]).astype(np.int32),
+        "tokens": np.concatenate([base_tokens, delta["tokens"]]).astype(np.int32),
+        "token_offsets": np.concatenate([
+            base_offsets,
+            delta["token_offsets"][1:] + base_offsets[-1],
+        ]).astype(np.int64),
+    }
+    return merged, shard_names
@@ -0,0 +1,208 @@
+import os
+import math
+import logging
+import threading
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+
+import ffmpeg
+import numpy as np
+
+from app.core.audio import AudioBuffer, apply_gain, normalization_gain, peak_amplitude
+from app.core.config import settings
+from app.core.metrics import PipelineMetrics
+from app.core.pools import ProcessPool, WorkerLostError
+from app.tasks.audio_processing import chunk_file_path, chunk_record, plan_chunks
+
+logger = logging.getLogger(__name__)
+
+# Process pool shared by every call preprocessed in this worker process
+_pool = None
+_pool_lock = threading.Lock()
+
+class PreprocessingError(Exception):
+    """A parallel conversion failed in a way converting serially may not."""
+
+def get_preprocess_pool() -> Optional[ProcessPool]:
+    """
+    The preprocessing pool, or None when PREPROCESS_WORKERS is 0.
+
+    A billiard pool (app.core.pools), so it also runs inside Celery's
+    prefork children; processes that die are replaced by the pool.
+    """
+    global _pool
+    if settings.PREPROCESS_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPool(settings.PREPROCESS_WORKERS)
+        return _pool
+
+@contextmanager
+def attach(name: str, length: int) -> Iterator[np.ndarray]:
+    """An int16 array over an existing shared memory block."""
+    block = shared_memory.SharedMemory(name=name)
+    # Attaching registers the block with this process's resource tracker,
+    # which would unlink it when the pool process exits; only its creator
+    # in preprocess_call cleans it up
+    resource_tracker.unregister(block._name, "shared_memory")
+    try:
+        yield np.ndarray((length,), dtype=np.int16, buffer=block.buf)
+    finally:
+        block.close()
+
+def _decode_segment(
+    input_path: str,
+    name: str,
+    length: int,
+    start: int,
+    end: Optional[int],
+    overlap: int,
+    sample_rate: int
+) -> Tuple[int, int]:
+    """
+    Decode samples [start, end) of a recording (to the end if end is None)
+    into the shared buffer.
+
+    Decoding starts `overlap` samples early and runs `overlap` samples
+    past the end, and both margins are dropped, so decoder and resampler
+    start-up and flush never land in the stitched audio.
+    Returns the end of the samples written and their peak amplitude.
+    """
+    seek = max(start - overlap, 0)
+    # No -ss for the first segment: seeking to 0 changes how ffmpeg trims
+    # the encoder delay of formats like MP3
+    options = {"ss": seek / sample_rate} if seek else {}
+    if end is not None:
+        options["t"] = (end + overlap - seek) / sample_rate
+    try:
+        out, _ = (
+            ffmpeg
+            .input(input_path, **options)
+            .output('pipe:', format='s16le', ac=1, ar=sample_rate, acodec='pcm_s16le', loglevel='error')
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+    except ffmpeg.Error as e:
+        # ffmpeg.Error does not survive pickling back to the caller
+        raise PreprocessingError(f"FFmpeg error: {e.stderr.decode(errors='replace').strip()}")
+    samples = np.frombuffer(out, dtype=np.int16)[start - seek:]
+    if end is not None:
+        samples = samples[:end - start]
+    if start + len(samples) > length:
+        raise PreprocessingError("Decoded audio is longer than its probed duration")
+    with attach(name, length) as audio:
+        audio[start:start + len(samples)] = samples
+    return start + len(samples), peak_amplitude(samples)
+
+def _normalize_segment(name: str, length: int, start: int, end: int, gain: np.float32):
+    with attach(name, length) as audio:
+        apply_gain(audio[start:end], gain, out=audio[start:end])
+
+def _write_chunks(name: str, length: int, sample_rate: int, jobs: List[Tuple[str, int, int]]):
+    with attach(name, length) as audio:
+        buffer = AudioBuffer(audio, sample_rate)
+        for path, start, end in jobs:
+            buffer[start:end].write(path)
+
+def segment_bounds(total: int, segment: int, align: int = 1) -> List[Tuple[int, int]]:
+    """
+    [start, end) ranges of about `segment` samples covering total, starting
+    at multiples of `align`.
+    """
+    count = max(1, math.ceil(total / segment))
+    step = math.ceil(total / count / align) * align
+    count = max(1, math.ceil(total / step)) if total else 1
+    return [(i * step, min((i + 1) * step, total)) for i in range(count)]
+
+def preprocess_call(
+    pool: ProcessPool,
+    input_path: str,
+    wav_path: str,
+    chunks_dir: str,
+    duration: float,
+    metrics: Optional[PipelineMetrics] = None
+) -> Tuple[float, List[Dict[str, Any]]]:
+    """
+    Convert and split a call on the process pool; same outputs as
+    convert_audio + split_audio.
+
+    The recording is decoded in PREPROCESS_SEGMENT_SECONDS time segments
+    in parallel into one shared-memory buffer, which is written as the
+    converted WAV, normalized in place segment by segment, and cut into
+    chunks written in parallel. Cut points are planned over the whole
+    buffer, so chunks are the same as when splitting serially.
+    Returns the audio duration and the chunk plan.
+
+    Raises PreprocessingError when a segment cannot be decoded, decodes
+    longer than probed, or its pool process dies; the caller can then
+    convert serially.
+    """
+    metrics = metrics or PipelineMetrics()
+    rate = settings.AUDIO_SAMPLE_RATE
+    # Room for probes that round the duration down
+    capacity = int(math.ceil(duration * rate)) + rate
+    # Whole-second boundaries fall on the source's sample grid, so the
+    # resampler output of neighbouring segments lines up
+    segments = segment_bounds(int(duration * rate), settings.PREPROCESS_SEGMENT_SECONDS * rate, align=rate)
+    overlap = int(settings.PREPROCESS_OVERLAP_SECONDS * rate)
+
+    block = shared_memory.SharedMemory(create=True, size=capacity * 2)
+    try:
+        with metrics.stage("convert_audio", audio_seconds=duration) as stage:
+            futures = [
+                pool.submit(
+                    _decode_segment, input_path, block.name, capacity, start,
+                    # The last segment runs to the end of the file
+                    end if i < len(segments) - 1 else None,
+                    overlap, rate
+                )
+                for i, (start, end) in enumerate(segments)
+            ]
+            results = [future.result() for future in futures]
+            peak = max(result[1] for result in results)
+            # Audio ends early if a segment came back short (duration overestimated)
+            length = results[-1][0]
+            for (written, _), (_, end) in zip(results[:-1], segments[:-1]):
+                if written < end:
+                    length = written
+                    break
+
+            audio = AudioBuffer(np.ndarray((capacity,), dtype=np.int16, buffer=block.buf), rate)[:length]
+            os.makedirs(os.path.dirname(wav_path), exist_ok=True)
+            partial_path = f"{os.path.splitext(wav_path)[0]}.partial.wav"
+            audio.write(partial_path)
+            os.replace(partial_path, wav_path)
+            stage["audio_seconds"] = audio.duration
+
+        with metrics.stage("split_audio", audio_seconds=audio.duration):
+            gain = normalization_gain(peak)
+            if gain is not None:
+                for future in [
+                    pool.submit(_normalize_segment, block.name, capacity, start, min(end, length), gain)
+                    for start, end in segment_bounds(length, settings.PREPROCESS_SEGMENT_SECONDS * rate)
+                ]:
+                    future.result()
+
+            ranges = plan_chunks(audio, metrics=metrics)
+            os.makedirs(chunks_dir, exist_ok=True)
+            jobs = [(chunk_file_path(chunks_dir, i), start, end) for i, (start, end) in enumerate(ranges)]
+            batch = max(1, math.ceil(len(jobs) / pool.workers))
+            for future in [
+                pool.submit(_write_chunks, block.name, capacity, rate, jobs[i:i + batch])
+                for i in range(0, len(jobs), batch)
+            ]:
+                future.result()
+
+        # Drop views of the block before releasing it
+        del audio
+        return length / rate, [chunk_record(path, start, end, rate) for path, start, end in jobs]
+    except WorkerLostError as e:
+        raise PreprocessingError(f"Preprocessing process died: {str(e)}") from e
+    finally:
+        try:
+            block.close()
+        except BufferError:
+            # Still viewed from a failed run's frame; freed with it
+            pass
+        block.unlink()
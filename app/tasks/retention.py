@@ -0,0 +1,347 @@
+import os
+import json
+import time
+import shutil
+import logging
+import argparse
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+import soundfile as sf
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import RETENTION_RECLAIMED_BYTES
+from app.db.base import SessionLocal
+from app.models.models import Call, CallStatus, Chunk
+from app.tasks.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+# Call ids looked up per query when matching directories to rows
+ID_BATCH_SIZE = 500
+# WAV sample formats FLAC stores losslessly
+FLAC_SUBTYPES = ("PCM_16", "PCM_24")
+# Frames re-encoded at a time when compressing an upload
+FLAC_BLOCK_FRAMES = 1 << 16
+# Report category of expired processed/<call_id> directories, by call status
+PROCESSED_CATEGORIES = {
+    CallStatus.PROCESSED: "converted_audio",
+    CallStatus.FAILED: "failed_intermediates",
+}
+
+class RetentionReport:
+    """Files and bytes reclaimed per category (or that would be, in a dry run)."""
+
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+        self.categories: Dict[str, Dict[str, int]] = {}
+
+    def record(self, category: str, files: int, reclaimed: int):
+        entry = self.categories.setdefault(category, {"files": 0, "bytes": 0})
+        entry["files"] += files
+        entry["bytes"] += reclaimed
+        if not self.dry_run and reclaimed > 0:
+            RETENTION_RECLAIMED_BYTES.labels(category=category).inc(reclaimed)
+
+    def remove(self, category: str, path: str, size: Optional[int] = None):
+        try:
+            if size is None:
+                size = os.path.getsize(path)
+            if not self.dry_run:
+                os.remove(path)
+        except FileNotFoundError:
+            return
+        self.record(category, 1, size)
+
+    def remove_tree(self, category: str, path: str):
+        files, size = tree_usage(path)
+        if not self.dry_run:
+            shutil.rmtree(path, ignore_errors=True)
+        self.record(category, files, size)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "dry_run": self.dry_run,
+            "files": sum(entry["files"] for entry in self.categories.values()),
+            "bytes": sum(entry["bytes"] for entry in self.categories.values()),
+            "categories": self.categories,
+        }
+
+def tree_usage(path: str) -> Tuple[int, int]:
+    """Number of files under a directory and their total size."""
+    files = size = 0
+    try:
+        entries = list(os.scandir(path))
+    except FileNotFoundError:
+        return 0, 0
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            sub_files, sub_size = tree_usage(entry.path)
+            files += sub_files
+            size += sub_size
+        else:
+            files += 1
+            size += entry.stat(follow_symlinks=False).st_size
+    return files, size
+
+def call_dirs(root: str) -> Dict[int, str]:
+    """Per-call directories under root, by call id."""
+    return {
+        int(entry.name): entry.path
+        for entry in os.scandir(root)
+        if entry.is_dir(follow_symlinks=False) and entry.name.isdigit()
+    }
+
+def _batches(ids: List[int]) -> List[List[int]]:
+    ids = sorted(ids)
+    return [ids[i:i + ID_BATCH_SIZE] for i in range(0, len(ids), ID_BATCH_SIZE)]
+
+def _calls(db: Session, ids: List[int]) -> Dict[int, Tuple[CallStatus, datetime]]:
+    rows = db.query(Call.id, Call.status, Call.updated_at).filter(Call.id.in_(ids)).all()
+    return {row.id: (row.status, row.updated_at) for row in rows}
+
+def _chunk_files(db: Session, call_ids: List[int]) -> Set[str]:
+    """Absolute paths of the audio and timings files referenced by chunk rows."""
+    paths = set()
+    if not call_ids:
+        return paths
+    rows = db.query(Chunk.file_path, Chunk.timings_path).filter(Chunk.call_id.in_(call_ids))
+    for file_path, timings_path in rows:
+        paths.add(os.path.abspath(file_path))
+        if timings_path:
+            paths.add(os.path.abspath(timings_path))
+    return paths
+
+def _expired(status: CallStatus, updated_at: datetime, cutoffs: Dict[CallStatus, datetime]) -> bool:
+    return status in cutoffs and updated_at < cutoffs[status]
+
+def clean_processed(db: Session, report: RetentionReport, cutoffs: Dict[CallStatus, datetime], max_call_id: int):
+    """
+    Remove processed/<call_id> (converted WAV, chunk plan, partial writes)
+    of calls processed or failed long enough ago, and of deleted calls.
+    """
+    dirs = call_dirs(settings.PROCESSED_DIR)
+    for batch in _batches(list(dirs)):
+        calls = _calls(db, batch)
+        for call_id in batch:
+            if call_id not in calls:
+                if call_id <= max_call_id:
+                    report.remove_tree("orphan_processed", dirs[call_id])
+            elif _expired(*calls[call_id], cutoffs):
+                report.remove_tree(PROCESSED_CATEGORIES[calls[call_id][0]], dirs[call_id])
+
+def clean_chunks(
+    db: Session,
+    report: RetentionReport,
+    cutoffs: Dict[CallStatus, datetime],
+    max_call_id: int,
+    grace_cutoff: float
+):
+    """
+    Remove chunk files no chunk row references: whole chunks/<call_id>
+    directories of deleted calls, and the set difference between each
+    directory listing and the call's chunk rows for calls that are done
+    with them. Files younger than the grace period are kept, so a call
+    being retried is never cleaned under its worker.
+    """
+    dirs = call_dirs(settings.CHUNKS_DIR)
+    for batch in _batches(list(dirs)):
+        calls = _calls(db, batch)
+        done = [
+            call_id for call_id, (status, updated_at) in calls.items()
+            if status == CallStatus.PROCESSED or _expired(status, updated_at, cutoffs)
+        ]
+        referenced = _chunk_files(db, done)
+        for call_id in batch:
+            path = dirs[call_id]
+            if call_id not in calls:
+                if call_id <= max_call_id:
+                    report.remove_tree("orphan_chunks", path)
+                continue
+            if call_id not in done:
+                continue
+            remaining = 0
+            for entry in os.scandir(path):
+                if entry.is_dir(follow_symlinks=False):
+                    remaining += 1
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                if os.path.abspath(entry.path) in referenced or stat.st_mtime >= grace_cutoff:
+                    remaining += 1
+                    continue
+                report.remove("orphan_chunks", entry.path, size=stat.st_size)
+            if not remaining and not report.dry_run:
+                try:
+                    os.rmdir(path)
+                except OSError:
+                    pass
+
+def clean_uploads(db: Session, report: RetentionReport, grace_cutoff: float):
+    """Remove uploads no call references (failed or interrupted uploads)."""
+    referenced = {os.path.abspath(path) for (path,) in db.query(Call.file_path)}
+    for entry in os.scandir(settings.UPLOAD_DIR):
+        if not entry.is_file(follow_symlinks=False):
+            continue
+        stat = entry.stat(follow_symlinks=False)
+        if os.path.abspath(entry.path) not in referenced and stat.st_mtime < grace_cutoff:
+            report.remove("orphan_uploads", entry.path, size=stat.st_size)
+
+def _update_call(db: Session, call_id: int, values: Dict[Any, Any]):
+    # Housekeeping keeps updated_at, which the retention periods are measured from
+    values[Call.updated_at] = Call.updated_at
+    db.query(Call).filter(Call.id == call_id).update(values, synchronize_session=False)
+    db.commit()
+
+def _retention_metadata(db: Session, call_id: int, **entries) -> Dict[str, Any]:
+    metadata = dict(db.query(Call.metadata_).filter(Call.id == call_id).scalar() or {})
+    metadata["retention"] = {**metadata.get("retention", {}), **entries}
+    return metadata
+
+def delete_uploads(db: Session, report: RetentionReport, cutoff: datetime):
+    """Delete the original uploads of calls processed before cutoff."""
+    rows = (
+        db.query(Call.id, Call.file_path)
+        .filter(Call.status == CallStatus.PROCESSED, Call.updated_at < cutoff)
+        .all()
+    )
+    for call_id, file_path in rows:
+        if not os.path.exists(file_path):
+            continue
+        report.remove("uploads", file_path)
+        if not report.dry_run:
+            _update_call(db, call_id, {
+                Call.metadata_: _retention_metadata(db, call_id, upload_deleted_at=datetime.utcnow().isoformat())
+            })
+
+def compress_to_flac(path: str) -> Optional[str]:
+    """
+    Losslessly re-encode a PCM WAV file as FLAC next to it. Returns the
+    FLAC path, or None when the file is not a WAV FLAC can hold exactly.
+    The WAV itself is left in place.
+    """
+    info = sf.info(path)
+    if info.format != "WAV" or info.subtype not in FLAC_SUBTYPES:
+        return None
+    base = os.path.splitext(path)[0]
+    flac_path = f"{base}.flac"
+    partial_path = f"{base}.partial.flac"
+    with sf.SoundFile(path) as source, sf.SoundFile(
+        partial_path, "w",
+        samplerate=source.samplerate,
+        channels=source.channels,
+        format="FLAC",
+        subtype=source.subtype
+    ) as target:
+        for block in source.blocks(blocksize=FLAC_BLOCK_FRAMES, dtype="int32"):
+            target.write(block)
+    os.replace(partial_path, flac_path)
+    return flac_path
+
+def compress_uploads(db: Session, report: RetentionReport, cutoff: datetime):
+    """Replace the WAV uploads of calls processed before cutoff with FLAC."""
+    rows = (
+        db.query(Call.id, Call.file_path)
+        .filter(
+            Call.status == CallStatus.PROCESSED,
+            Call.updated_at < cutoff,
+            func.lower(Call.file_path).like("%.wav")
+        )
+        .all()
+    )
+    for call_id, file_path in rows:
+        if not os.path.exists(file_path):
+            continue
+        if report.dry_run:
+            report.record("compressed_uploads", 1, 0)
+            continue
+        try:
+            flac_path = compress_to_flac(file_path)
+        except Exception as e:
+            logger.warning(f"Could not compress upload of call {call_id}: {str(e)}")
+            continue
+        if flac_path is None:
+            continue
+
+        size = os.path.getsize(file_path)
+        flac_size = os.path.getsize(flac_path)
+        metadata = _retention_metadata(db, call_id, compressed_from=os.path.basename(file_path))
+        if "audio" in metadata:
+            metadata["audio"] = {**metadata["audio"], "format": "flac"}
+        try:
+            _update_call(db, call_id, {
+                Call.file_path: flac_path,
+                Call.file_size: flac_size,
+                Call.metadata_: metadata,
+            })
+        except Exception:
+            db.rollback()
+            os.remove(flac_path)
+            raise
+        os.remove(file_path)
+        report.record("compressed_uploads", 1, size - flac_size)
+
+def run_retention(dry_run: bool = False) -> Dict[str, Any]:
+    """
+    One pass of the retention policy over the data directories:
+
+    - processed/<call_id> of calls processed RETENTION_PROCESSED_HOURS ago
+      or failed RETENTION_FAILED_DAYS ago
+    - chunk files no chunk row references, once a call is done with them
+    - per-call directories of deleted calls and unreferenced uploads
+    - uploads of processed calls deleted after RETENTION_UPLOAD_DAYS (if
+      set), WAV uploads re-encoded as FLAC after
+      RETENTION_COMPRESS_UPLOADS_HOURS (if set)
+
+    Chunk WAVs of processed calls stay: reviews and exports read them.
+    Returns the reclaimed files and bytes per category.
+    """
+    started = time.perf_counter()
+    report = RetentionReport(dry_run=dry_run)
+    now = datetime.utcnow()
+    cutoffs = {
+        CallStatus.PROCESSED: now - timedelta(hours=settings.RETENTION_PROCESSED_HOURS),
+        CallStatus.FAILED: now - timedelta(days=settings.RETENTION_FAILED_DAYS),
+    }
+    grace_cutoff = time.time() - settings.RETENTION_GRACE_HOURS * 3600
+
+    db = SessionLocal()
+    try:
+        # Directories of ids above the newest call belong to another (or a
+        # reset) database and are left alone
+        max_call_id = db.query(func.max(Call.id)).scalar() or 0
+        clean_processed(db, report, cutoffs, max_call_id)
+        clean_chunks(db, report, cutoffs, max_call_id, grace_cutoff)
+        clean_uploads(db, report, grace_cutoff)
+        if settings.RETENTION_UPLOAD_DAYS:
+            delete_uploads(db, report, now - timedelta(days=settings.RETENTION_UPLOAD_DAYS))
+        if settings.RETENTION_COMPRESS_UPLOADS_HOURS:
+            compress_uploads(db, report, now - timedelta(hours=settings.RETENTION_COMPRESS_UPLOADS_HOURS))
+    finally:
+        db.close()
+
+    result = report.as_dict()
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    logger.info(
+        f"Retention {'dry run' if dry_run else 'pass'}: {result['files']} files, "
+        f"{result['bytes'] / 1e6:.1f} MB in {result['seconds']}s"
+        + "".join(f", {name}={entry['bytes']}" for name, entry in result["categories"].items())
+    )
+    return result
+
+@celery_app.task(name="retention_task")
+def retention_task(dry_run: bool = False):
+    """Celery task applying the retention policy (scheduled by beat)."""
+    return run_retention(dry_run=dry_run)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Apply the audio retention policy once")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be reclaimed without deleting")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(run_retention(dry_run=args.dry_run), indent=2))
+
+if __name__ == "__main__":
+    main()
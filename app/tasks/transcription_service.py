@@ -0,0 +1,87 @@
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional
+
+from app.core.asr import asr_jobs_key, asr_result_key, create_engine
+from app.core.batching import MicroBatcher
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds a reply is kept after the requesting worker's deadline
+RESULT_GRACE_SECONDS = 60
+
+def reply(client, job: Dict[str, Any], future: Future):
+    """Push a finished job's result (or error) to the worker waiting on it."""
+    try:
+        message = {"result": future.result()}
+    except Exception as e:
+        logger.error(f"Job {job['id']} on {job['audio']} failed: {str(e)}")
+        message = {"error": str(e)}
+    key = asr_result_key(job["id"])
+    pipe = client.pipeline()
+    pipe.rpush(key, json.dumps(message))
+    pipe.expire(key, max(int(job["deadline"] - time.time()), 0) + RESULT_GRACE_SECONDS)
+    pipe.execute()
+
+def serve(
+    spec: str,
+    max_batch_size: int,
+    max_wait: float,
+    compute_type: Optional[str] = None,
+    beam_size: Optional[int] = None,
+    client=None
+):
+    """
+    Hold one `spec` engine and transcribe jobs from all workers using
+    "service:<spec>", in micro-batches.
+
+    Jobs are only taken from Redis while fewer than two batches are
+    waiting, so a backlog stays in Redis rather than in this process.
+    """
+    if client is None:
+        import redis
+        client = redis.Redis.from_url(settings.REDIS_URL)
+    engine = create_engine(spec, compute_type=compute_type, beam_size=beam_size)
+    batcher = MicroBatcher(engine, max_batch_size=max_batch_size, max_wait=max_wait)
+    jobs_key = asr_jobs_key(spec)
+    logger.info(f"Transcription service for {spec} on {jobs_key} (batches of {max_batch_size}, {max_wait * 1000:.0f}ms wait)")
+
+    while True:
+        if batcher.pending() >= 2 * max_batch_size:
+            time.sleep(max_wait)
+            continue
+        item = client.blpop(jobs_key, timeout=5)
+        if item is None:
+            continue
+        job = json.loads(item[1])
+        if job["deadline"] < time.time():
+            logger.warning(f"Dropping job {job['id']}: its worker stopped waiting")
+            continue
+        if job["kind"] == "detect":
+            future = batcher.detect_language(job["audio"])
+        else:
+            future = batcher.transcribe(job["audio"], language=job["language"])
+        future.add_done_callback(lambda f, job=job: reply(client, job, f))
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Long-lived transcription service batching chunks across calls"
+    )
+    parser.add_argument("--engine", default=settings.ASR_ENGINE, help="engine spec to serve (default: ASR_ENGINE)")
+    parser.add_argument("--batch-size", type=int, default=settings.ASR_SERVICE_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=int, default=settings.ASR_SERVICE_MAX_WAIT_MS)
+    parser.add_argument("--compute-type", help="override WHISPER_COMPUTE_TYPE")
+    parser.add_argument("--beam-size", type=int)
+    args = parser.parse_args(argv)
+
+    # Workers configured with ASR_ENGINE=service:<spec> share this default
+    spec = args.engine[len("service:"):] if args.engine.startswith("service:") else args.engine
+    logging.basicConfig(level=logging.INFO)
+    serve(spec, args.batch_size, args.max_wait_ms / 1000, args.compute_type, args.beam_size)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import tempfile
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from benchmarks.pipeline import configure_environment, git_revision
+
+# Default request mix, mirroring the Gradio review tab: load a call's
+# chunk list, then play and save most chunks, occasionally re-fetching one
+DEFAULT_MIX = {"list": 1, "get": 1, "audio": 4, "update": 4}
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """Parse "list=1,audio=4,..." into request weights."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown request type: {name}")
+        mix[name] = int(weight)
+    return mix
+
+def seed_database(num_calls: int, chunks_per_call: int, chunk_seconds: float, chunks_dir: str) -> Dict[int, List[int]]:
+    """
+    Insert calls and chunks in bulk and write a WAV file for every chunk.
+
+    Returns chunk ids grouped by call id.
+    """
+    from sqlalchemy import insert
+    from app.db.base import SessionLocal, engine
+    from app.models.base import Base
+    from app.models.models import Call, CallStatus, Chunk, ChunkStatus, SpeakerRole, User
+
+    Base.metadata.create_all(bind=engine)
+
+    rng = np.random.default_rng(0)
+    samples = (rng.standard_normal(int(chunk_seconds * 16000)) * 0.1).astype(np.float32)
+    template = os.path.join(chunks_dir, "template.wav")
+    os.makedirs(chunks_dir, exist_ok=True)
+    sf.write(template, samples, 16000, subtype="PCM_16")
+    with open(template, "rb") as f:
+        wav_bytes = f.read()
+
+    db = SessionLocal()
+    try:
+        if not db.query(User).filter(User.id == 1).first():
+            db.add(User(id=1, email="admin@example.com", hashed_password="!", role="admin"))
+            db.commit()
+
+        db.execute(insert(Call), [
+            {
+                "original_filename": f"call_{i:05d}.wav",
+                "file_path": f"/nonexistent/call_{i:05d}.wav",
+                "duration": chunks_per_call * chunk_seconds,
+                "status": CallStatus.PROCESSED,
+                "uploaded_by_id": 1,
+            }
+            for i in range(num_calls)
+        ])
+        call_ids = [row[0] for row in db.query(Call.id).order_by(Call.id).all()[-num_calls:]]
+
+        text = "नमस्ते मैं आपकी कैसे मदद कर सकता हूँ " * 4
+        for call_id in call_ids:
+            call_dir = os.path.join(chunks_dir, str(call_id))
+            os.makedirs(call_dir, exist_ok=True)
+            rows = []
+            for index in range(chunks_per_call):
+                path = os.path.join(call_dir, f"chunk_{index:04d}.wav")
+                with open(path, "wb") as f:
+                    f.write(wav_bytes)
+                rows.append({
+                    "call_id": call_id,
+                    "file_path": path,
+                    "start_time": index * chunk_seconds,
+                    "end_time": (index + 1) * chunk_seconds,
+                    "duration": chunk_seconds,
+                    "original_text": text,
+                    "speaker_role": SpeakerRole.UNKNOWN,
+                    "status": ChunkStatus.PENDING,
+                    "confidence": float(rng.uniform(0.3, 1.0)),
+                    "review_priority": float(rng.uniform(0.0, 1.0)),
+                    "metadata_": {},
+                })
+            db.execute(insert(Chunk), rows)
+        db.commit()
+
+        chunks: Dict[int, List[int]] = {}
+        for chunk_id, call_id in db.query(Chunk.id, Chunk.call_id).order_by(Chunk.id):
+            chunks.setdefault(call_id, []).append(chunk_id)
+        return chunks
+    finally:
+        db.close()
+
+async def reviewer(
+    client,
+    chunks: Dict[int, List[int]],
+    mix: Dict[str, int],
+    deadline: float,
+    results: Dict[str, List[Tuple[float, int]]],
+    seed: int
+):
+    """One simulated reviewer issuing requests back to back until the deadline."""
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    call_ids = list(chunks)
+    call_id = rng.choice(call_ids)
+
+    while time.perf_counter() < deadline:
+        kind = rng.choices(names, weights)[0]
+        chunk_id = rng.choice(chunks[call_id])
+
+        start = time.perf_counter()
+        if kind == "list":
+            call_id = rng.choice(call_ids)
+            response = await client.get("/api/v1/chunks/", params={"call_id": call_id, "limit": 100})
+        elif kind == "get":
+            response = await client.get(f"/api/v1/chunks/{chunk_id}")
+        elif kind == "audio":
+            response = await client.get(f"/api/v1/chunks/{chunk_id}/audio")
+        else:
+            response = await client.patch(f"/api/v1/chunks/{chunk_id}", json={
+                "corrected_text": f"corrected {chunk_id} {rng.random():.6f}",
+                "speaker_role": rng.choice(["agent", "customer"]),
+                "status": "reviewed",
+            })
+        await response.aread()
+        results.setdefault(kind, []).append((time.perf_counter() - start, response.status_code))
+
+def summarize(samples: List[Tuple[float, int]], elapsed: float) -> Dict[str, Any]:
+    latencies = np.array([latency for latency, _ in samples]) * 1000.0
+    errors = sum(1 for _, code in samples if code >= 400)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        "max_ms": round(float(latencies.max()), 2),
+    }
+
+async def drive(app, chunks, mix, concurrency: int, duration: float, warmup: float) -> Dict[str, Any]:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        if warmup > 0:
+            await asyncio.gather(*[
+                reviewer(client, chunks, mix, time.perf_counter() + warmup, {}, seed=1000 + i)
+                for i in range(concurrency)
+            ])
+
+        results: Dict[str, List[Tuple[float, int]]] = {}
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            reviewer(client, chunks, mix, started + duration, results, seed=i)
+            for i in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+    endpoints = {kind: summarize(samples, elapsed) for kind, samples in sorted(results.items())}
+    everything = [sample for samples in results.values() for sample in samples]
+    return {"elapsed": round(elapsed, 3), "endpoints": endpoints, "total": summarize(everything, elapsed)}
+
+def run(args, workdir: str) -> Dict[str, Any]:
+    configure_environment(workdir)
+    # httpx logs every request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    # No Redis: any task dispatched by the API runs inline
+    from app.tasks.celery_app import celery_app
+    celery_app.conf.update(task_always_eager=True, broker_url="memory://", result_backend="cache+memory://")
+
+    chunks = seed_database(args.calls, args.chunks, args.chunk_seconds, os.environ["CHUNKS_DIR"])
+    print(f"Seeded {len(chunks)} calls x {args.chunks} chunks", file=sys.stderr)
+
+    from app.main import app
+
+    results = asyncio.run(drive(app, chunks, args.mix, args.concurrency, args.duration, args.warmup))
+    for kind, stats in results["endpoints"].items():
+        print(
+            f"  {kind:<8} {stats['rps']:>8} rps  p50 {stats['p50_ms']:>8}ms  "
+            f"p95 {stats['p95_ms']:>8}ms  p99 {stats['p99_ms']:>8}ms  errors {stats['errors']}",
+            file=sys.stderr
+        )
+
+    return {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+        "params": {
+            "calls": args.calls,
+            "chunks_per_call": args.chunks,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "mix": args.mix,
+        },
+        **results,
+    }
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Load-test the chunk review API in-process with seeded data"
+    )
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--chunks", type=int, default=100, help="chunks per call")
+    parser.add_argument("--chunk-seconds", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=20, help="simulated reviewers")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--mix", type=parse_mix, default=dict(DEFAULT_MIX),
+                        help="request weights, e.g. list=1,get=1,audio=4,update=4")
+    parser.add_argument("--database-url", help="e.g. a scratch PostgreSQL database (default: SQLite)")
+    parser.add_argument("--output", help="write results JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="whisper-load-") as workdir:
+        results = run(args, workdir)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+from typing import List, Dict, Any, Callable, Optional
+
+
+from benchmarks.synthetic import write_call
+
+def configure_environment(workdir: str):
+    """Point settings at a throwaway SQLite database and data directories."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    for name in ("UPLOAD_DIR", "PROCESSED_DIR", "CHUNKS_DIR", "EXPORTS_DIR", "FEATURES_DIR"):
+        os.environ[name] = os.path.join(workdir, name.lower())
+    os.environ["WHISPER_DEVICE"] = "cpu"
+    # Measure the pipeline around the model without downloading weights
+    os.environ["ASR_ENGINE"] = "stub"
+    os.environ["WORKER_METRICS_PORT"] = "0"
+
+def peak_rss_mb() -> float:
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def measure(
+    name: str,
+    fn: Callable[[], Any],
+    audio_seconds: float,
+    repeat: int = 3
+) -> Dict[str, Any]:
+    """
+    Time fn() `repeat` times, then run it once more under tracemalloc.
+
+    The traced run is kept separate because tracing slows Python-heavy
+    stages and would skew the timings.
+    """
+    walls = []
+    cpus = []
+    for _ in range(repeat):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        fn()
+        walls.append(time.perf_counter() - wall_start)
+        cpus.append(time.process_time() - cpu_start)
+
+    tracemalloc.start()
+    fn()
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    wall = statistics.median(walls)
+    result = {
+        "stage": name,
+        "repeat": repeat,
+        "wall_seconds": round(wall, 4),
+        "wall_seconds_min": round(min(walls), 4),
+        "cpu_seconds": round(statistics.median(cpus), 4),
+        "audio_seconds": round(audio_seconds, 3),
+        "real_time_factor": round(wall / audio_seconds, 5) if audio_seconds else None,
+        "x_realtime": round(audio_seconds / wall, 1) if wall else None,
+        "python_alloc_peak_mb": round(traced_peak / (1024 * 1024), 1),
+        "process_peak_rss_mb": peak_rss_mb(),
+    }
+    print(f"  {name:<18} {wall:8.3f}s  {result['x_realtime'] or 0:>8}x realtime", file=sys.stderr)
+    return result
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(
+    duration: float,
+    sample_rate: int,
+    repeat: int,
+    seed: int,
+    workdir: str,
+    preprocess_workers: int = 0
+) -> Dict[str, Any]:
+    configure_environment(workdir)
+    os.environ["PREPROCESS_WORKERS"] = str(preprocess_workers)
+
+    # Imported after configure_environment so settings pick up the overrides
+    from app.core.audio import AudioBuffer
+    from app.db.base import SessionLocal, engine
+    from app.models.base import Base
+    from app.models.models import Call, CallStatus, Chunk
+    from app.tasks.audio_processing import (
+        convert_audio, detect_silence, process_call, split_audio, transcribe_audio
+    )
+
+    Base.metadata.create_all(bind=engine)
+
+    upload_path = os.path.join(os.environ["UPLOAD_DIR"], "synthetic.wav")
+    os.makedirs(os.path.dirname(upload_path), exist_ok=True)
+    call_info = write_call(upload_path, duration, sample_rate=sample_rate, seed=seed)
+    audio_seconds = call_info["duration"]
+    print(f"Benchmarking {audio_seconds:.0f}s synthetic call ({sample_rate} Hz)", file=sys.stderr)
+
+    wav_path = os.path.join(workdir, "converted.wav")
+    chunks_dir = os.path.join(workdir, "bench_chunks")
+    stages: List[Dict[str, Any]] = []
+
+    stages.append(measure(
+        "convert_audio", lambda: convert_audio(upload_path, wav_path), audio_seconds, repeat
+    ))
+    stages.append(measure(
+        "split_audio", lambda: split_audio(wav_path, chunks_dir), audio_seconds, repeat
+    ))
+
+    if preprocess_workers:
+        # convert_audio + split_audio on the process pool
+        from app.tasks.preprocessing import get_preprocess_pool, preprocess_call
+        pool = get_preprocess_pool()
+        stages.append(measure(
+            "preprocess_call",
+            lambda: preprocess_call(
+                pool, upload_path, os.path.join(workdir, "preprocessed.wav"),
+                os.path.join(workdir, "preprocessed_chunks"), audio_seconds
+            ),
+            audio_seconds,
+            repeat
+        ))
+
+    # detect_silence on the 5 s windows split_audio searches for cut points
+    audio = AudioBuffer.from_file(wav_path)
+    rate = audio.sample_rate
+    windows = [audio[start:start + 5 * rate] for start in range(25 * rate, len(audio), 30 * rate)]
+    stages.append(measure(
+        "detect_silence",
+        lambda: [detect_silence(window) for window in windows],
+        len(windows) * 5.0,
+        repeat
+    ))
+
+    chunks = split_audio(wav_path, chunks_dir)
+    stages.append(measure(
+        "transcribe_audio",
+        lambda: [transcribe_audio(chunk["path"]) for chunk in chunks],
+        sum(chunk["duration"] for chunk in chunks),
+        repeat
+    ))
+
+    processing_runs = []
+
+    def end_to_end():
+        db = SessionLocal()
+        try:
+            call = Call(
+                original_filename="synthetic.wav",
+                file_path=upload_path,
+                file_size=os.path.getsize(upload_path),
+                status=CallStatus.UPLOADED
+            )
+            db.add(call)
+            db.commit()
+            call_id = call.id
+        finally:
+            db.close()
+
+        if not process_call(call_id):
+            raise RuntimeError(f"process_call failed for benchmark call {call_id}")
+
+        db = SessionLocal()
+        try:
+            call = db.query(Call).filter(Call.id == call_id).first()
+            processing_runs.append({
+                "chunks": db.query(Chunk).filter(Chunk.call_id == call_id).count(),
+                **(call.metadata_ or {}).get("processing", {}),
+            })
+        finally:
+            db.close()
+
+    stages.append(measure("process_call", end_to_end, audio_seconds, repeat))
+
+    return {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "params": {
+            "duration": duration,
+            "sample_rate": sample_rate,
+            "repeat": repeat,
+            "seed": seed,
+            "preprocess_workers": preprocess_workers,
+            "chunks": len(chunks),
+        },
+        "stages": {stage["stage"]: stage for stage in stages},
+        # Breakdown from the last timed run; the tracemalloc run is slower
+        "process_call_breakdown": processing_runs[repeat - 1] if processing_runs else None,
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]):
+    """Print per-stage speedups of current over baseline."""
+    print(f"{'stage':<18} {'baseline':>10} {'current':>10} {'speedup':>8}")
+    for name, stage in current["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if not before:
+            continue
+        speedup = before["wall_seconds"] / stage["wall_seconds"] if stage["wall_seconds"] else float("inf")
+        print(f"{name:<18} {before['wall_seconds']:>10.3f} {stage['wall_seconds']:>10.3f} {speedup:>7.2f}x")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the audio pipeline on synthetic calls with a stubbed Whisper model"
+    )
+    parser.add_argument("--duration", type=float, default=300.0, help="seconds of synthetic audio")
+    parser.add_argument("--sample-rate", type=int, default=8000, help="sample rate of the synthetic upload")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results JSON here instead of stdout")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--workdir", help="keep benchmark files here (default: temp dir)")
+    parser.add_argument(
+        "--preprocess-workers", type=int, default=0,
+        help="also time conversion and splitting on a process pool of this size"
+    )
+    args = parser.parse_args(argv)
+
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        results = run(
+            args.duration, args.sample_rate, args.repeat, args.seed, args.workdir, args.preprocess_workers
+        )
+    else:
+        with tempfile.TemporaryDirectory(prefix="whisper-bench-") as workdir:
+            results = run(
+                args.duration, args.sample_rate, args.repeat, args.seed, workdir, args.preprocess_workers
+            )
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+if __name__ == "__main__":
+    main()
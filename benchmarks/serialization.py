@@ -0,0 +1,127 @@
+import os
+import sys
+import gzip
+import json
+import time
+import argparse
+import tempfile
+import statistics
+from typing import List, Dict, Any, Callable, Optional
+
+from benchmarks.pipeline import configure_environment, git_revision
+
+def timeit(name: str, fn: Callable[[], bytes], repeat: int) -> Dict[str, Any]:
+    """Median wall time of fn() and the size of what it returns."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn()
+        times.append(time.perf_counter() - start)
+    result = {
+        "path": name,
+        "ms": round(statistics.median(times) * 1000, 2),
+        "ms_min": round(min(times) * 1000, 2),
+        "bytes": len(body),
+    }
+    print(f"  {name:<28} {result['ms']:>8.2f}ms  {result['bytes']:>9} bytes", file=sys.stderr)
+    return result
+
+def run(page_size: int, repeat: int, compress_level: int, workdir: str) -> Dict[str, Any]:
+    configure_environment(workdir)
+
+    import orjson
+    from typing import List as ListType
+    from pydantic import TypeAdapter
+    from app.core.responses import rows_response
+    from app.db.base import SessionLocal
+    from app.models.models import Chunk
+    from app.api.v1.endpoints.chunks import ChunkResponse, CHUNK_FIELDS
+    from benchmarks.load import seed_database
+
+    seed_database(1, page_size, 10.0, os.environ["CHUNKS_DIR"])
+    print(f"Serializing {page_size}-chunk pages", file=sys.stderr)
+
+    response_adapter = TypeAdapter(ListType[ChunkResponse])
+    columns = [getattr(Chunk, name) for name in CHUNK_FIELDS]
+
+    db = SessionLocal()
+    try:
+        # Fetch cost, ORM objects vs. projected Row tuples
+        def fetch_orm() -> List[Any]:
+            db.expunge_all()
+            return db.query(Chunk).limit(page_size).all()
+
+        def fetch_rows() -> List[Any]:
+            return db.query(*columns).limit(page_size).all()
+
+        fetches = [
+            timeit("fetch_orm", fetch_orm, repeat),
+            timeit("fetch_projected", fetch_rows, repeat),
+        ]
+        chunks = fetch_orm()
+        rows = fetch_rows()
+    finally:
+        db.close()
+
+    def fastapi_default() -> bytes:
+        # What FastAPI does for response_model=List[ChunkResponse]: validate,
+        # convert to JSON-able Python, then json.dumps in JSONResponse
+        content = response_adapter.dump_python(
+            response_adapter.validate_python(chunks, from_attributes=True), mode="json"
+        )
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def orjson_response() -> bytes:
+        # Same, with ORJSONResponse as the response class
+        content = response_adapter.dump_python(
+            response_adapter.validate_python(chunks, from_attributes=True), mode="json"
+        )
+        return orjson.dumps(content)
+
+    def projected() -> bytes:
+        # list_chunks: projected Row tuples encoded straight to bytes
+        return rows_response(rows).body
+
+    def projected_gzip() -> bytes:
+        return gzip.compress(projected(), compresslevel=compress_level)
+
+    results = [
+        timeit("fastapi_default", fastapi_default, repeat),
+        timeit("orjson_response", orjson_response, repeat),
+        timeit("rows_response", projected, repeat),
+        timeit(f"rows_response+gzip{compress_level}", projected_gzip, repeat),
+    ]
+    baseline = results[0]["ms"]
+    for result in results:
+        result["speedup"] = round(baseline / result["ms"], 2) if result["ms"] else None
+
+    return {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "params": {"page_size": page_size, "repeat": repeat, "compress_level": compress_level},
+        "fetch": {result["path"]: result for result in fetches},
+        "encode": {result["path"]: result for result in results},
+    }
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Compare chunk list serialization paths on a seeded page"
+    )
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--compress-level", type=int, default=5)
+    parser.add_argument("--output", help="write results JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="whisper-serialize-") as workdir:
+        results = run(args.page_size, args.repeat, args.compress_level, workdir)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
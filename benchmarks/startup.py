@@ -0,0 +1,174 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from typing import List, Dict, Any, Optional, Tuple
+
+from benchmarks.pipeline import configure_environment, git_revision
+
+# Modules the API process must not load: model runtimes and worker-only code
+HEAVY_MODULES = (
+    "torch",
+    "pyannote",
+    "faster_whisper",
+    "ctranslate2",
+    "transformers",
+    "app.core.asr",
+    "app.tasks.audio_processing",
+    "app.tasks.export",
+    "app.tasks.features",
+)
+
+# Run in a fresh interpreter per measurement so nothing is already imported
+CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": seconds,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": sorted(sys.modules),
+}}))
+"""
+
+# What is imported for each target, and its environment overrides
+TARGETS = {
+    "api": ("app.main", {"GRADIO_ENABLED": "false"}),
+    "api_ui": ("app.main", {"GRADIO_ENABLED": "true"}),
+}
+
+def run_child(module: str, env: Dict[str, str], importtime: bool = False) -> Tuple[Dict[str, Any], str]:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", CHILD.format(module=module)]
+    process = subprocess.run(command, env={**os.environ, **env}, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{process.stderr}")
+    return json.loads(process.stdout.strip().splitlines()[-1]), process.stderr
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Entries of `python -X importtime` output: module, depth, self and cumulative µs."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # header line
+        stripped = name.lstrip(" ")
+        entries.append({
+            "module": stripped,
+            "depth": (len(name) - len(stripped) - 1) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return entries
+
+def measure(name: str, module: str, env: Dict[str, str], repeat: int, top: int) -> Dict[str, Any]:
+    runs = [run_child(module, env)[0] for _ in range(repeat)]
+    seconds = [run["seconds"] for run in runs]
+
+    # Breakdown from a separate run: -X importtime slows imports down
+    _, stderr = run_child(module, env, importtime=True)
+    entries = parse_importtime(stderr)
+    # Packages the target pulls in directly or one level down, heaviest first
+    heaviest = sorted(
+        (entry for entry in entries if entry["depth"] <= 2 and "." not in entry["module"]),
+        key=lambda entry: entry["cumulative_us"],
+        reverse=True
+    )[:top]
+
+    modules = runs[-1]["modules"]
+    result = {
+        "target": name,
+        "module": module,
+        "env": env,
+        "repeat": repeat,
+        "import_seconds": round(statistics.median(seconds), 4),
+        "import_seconds_min": round(min(seconds), 4),
+        "peak_rss_mb": round(statistics.median(run["peak_rss_mb"] for run in runs), 1),
+        "modules_loaded": len(modules),
+        "heavy_modules": [
+            heavy for heavy in HEAVY_MODULES
+            if any(loaded == heavy or loaded.startswith(f"{heavy}.") for loaded in modules)
+        ],
+        "heaviest_imports": [
+            {"module": entry["module"], "cumulative_ms": round(entry["cumulative_us"] / 1000, 1)}
+            for entry in heaviest
+        ],
+    }
+    print(
+        f"  {name:<8} {result['import_seconds']:8.3f}s  {result['peak_rss_mb']:8.1f} MB"
+        + (f"  heavy: {', '.join(result['heavy_modules'])}" if result["heavy_modules"] else ""),
+        file=sys.stderr
+    )
+    return result
+
+def run(repeat: int, top: int, workdir: str, targets: List[str]) -> Dict[str, Any]:
+    configure_environment(workdir)
+    return {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "params": {"repeat": repeat, "top": top},
+        "targets": {
+            name: measure(name, TARGETS[name][0], TARGETS[name][1], repeat, top)
+            for name in targets
+        },
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]):
+    """Print per-target import time and memory against baseline."""
+    print(f"{'target':<8} {'baseline':>10} {'current':>10} {'speedup':>8} {'rss_mb':>16}")
+    for name, target in current["targets"].items():
+        before = baseline.get("targets", {}).get(name)
+        if not before:
+            continue
+        speedup = before["import_seconds"] / target["import_seconds"] if target["import_seconds"] else float("inf")
+        print(
+            f"{name:<8} {before['import_seconds']:>10.3f} {target['import_seconds']:>10.3f} {speedup:>7.2f}x"
+            f" {before['peak_rss_mb']:>7.1f}->{target['peak_rss_mb']:<7.1f}"
+        )
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark API import time and memory in fresh interpreters (python -X importtime)"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="heaviest imports to report")
+    parser.add_argument("--target", action="append", choices=sorted(TARGETS), help="default: all")
+    parser.add_argument("--output", help="write results JSON here instead of stdout")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--check", action="store_true", help="exit non-zero if a target loads a heavy module")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="whisper-startup-") as workdir:
+        results = run(args.repeat, args.top, workdir, args.target or list(TARGETS))
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+    if args.check:
+        loaded = {name: target["heavy_modules"] for name, target in results["targets"].items() if target["heavy_modules"]}
+        if loaded:
+            print(f"Heavy modules imported: {loaded}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
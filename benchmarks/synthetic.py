@@ -0,0 +1,102 @@
+import argparse
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+import soundfile as sf
+
+def _speech_burst(rng: np.random.Generator, seconds: float, sample_rate: int) -> np.ndarray:
+    """Band-limited noise with a ~4 Hz syllable envelope, roughly speech-shaped."""
+    n = int(seconds * sample_rate)
+    noise = rng.standard_normal(n).astype(np.float32)
+
+    # Crude voice-band shaping: emphasise low frequencies, roll off above ~3.4 kHz
+    spectrum = np.fft.rfft(noise)
+    freqs = np.fft.rfftfreq(n, d=1.0 / sample_rate)
+    shape = 1.0 / np.sqrt(1.0 + (freqs / 500.0) ** 2)
+    shape[(freqs < 100) | (freqs > 3400)] = 0.0
+    voiced = np.fft.irfft(spectrum * shape, n=n).astype(np.float32)
+
+    t = np.arange(n) / sample_rate
+    syllable_rate = rng.uniform(3.0, 5.5)
+    envelope = 0.5 * (1.0 - np.cos(2 * np.pi * syllable_rate * t + rng.uniform(0, np.pi)))
+    envelope *= rng.uniform(0.4, 1.0)
+    voiced *= envelope.astype(np.float32)
+    return voiced / (np.abs(voiced).max() + 1e-9) * rng.uniform(0.3, 0.8)
+
+def _silence(rng: np.random.Generator, seconds: float, sample_rate: int) -> np.ndarray:
+    """Line noise around -60 dBFS."""
+    return (rng.standard_normal(int(seconds * sample_rate)) * 0.001).astype(np.float32)
+
+def _hold_tone(rng: np.random.Generator, seconds: float, sample_rate: int) -> np.ndarray:
+    """Dual-tone hold/ringback signal (440 + 480 Hz), 2 s on / 4 s off."""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    tone = 0.15 * (np.sin(2 * np.pi * 440 * t) + np.sin(2 * np.pi * 480 * t))
+    gate = (t % 6.0) < 2.0
+    return (tone * gate).astype(np.float32) + _silence(rng, seconds, sample_rate)[:len(t)]
+
+def synthesize_call(
+    duration: float,
+    sample_rate: int = 8000,
+    seed: int = 0,
+    hold_probability: float = 0.05
+) -> Dict[str, Any]:
+    """
+    Build a synthetic two-party call of `duration` seconds.
+
+    Alternates speech bursts (0.5-6 s) with pauses (0.2-2.5 s) and
+    occasionally inserts hold tones, like agent/customer turn-taking.
+    Returns the samples plus the list of generated segments.
+    """
+    rng = np.random.default_rng(seed)
+    pieces: List[np.ndarray] = []
+    segments: List[Dict[str, Any]] = []
+    position = 0.0
+    speaker = 0
+
+    while position < duration:
+        roll = rng.random()
+        if roll < hold_probability:
+            kind, seconds = "hold", rng.uniform(3.0, 12.0)
+            piece = _hold_tone(rng, seconds, sample_rate)
+        elif roll < hold_probability + 0.35:
+            kind, seconds = "silence", rng.uniform(0.2, 2.5)
+            piece = _silence(rng, seconds, sample_rate)
+        else:
+            kind, seconds = f"speech_{'agent' if speaker == 0 else 'customer'}", rng.uniform(0.5, 6.0)
+            piece = _speech_burst(rng, seconds, sample_rate)
+            speaker = 1 - speaker
+
+        seconds = min(seconds, duration - position)
+        piece = piece[:int(seconds * sample_rate)]
+        pieces.append(piece)
+        segments.append({"kind": kind, "start": round(position, 3), "end": round(position + seconds, 3)})
+        position += seconds
+
+    samples = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+    return {"samples": samples, "sample_rate": sample_rate, "segments": segments}
+
+def write_call(
+    path: str,
+    duration: float,
+    sample_rate: int = 8000,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """Synthesize a call and write it as 16-bit PCM WAV."""
+    call = synthesize_call(duration, sample_rate=sample_rate, seed=seed)
+    sf.write(path, call["samples"], sample_rate, subtype="PCM_16")
+    return {"path": path, "duration": len(call["samples"]) / sample_rate,
+            "sample_rate": sample_rate, "segments": call["segments"]}
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Write a synthetic call recording")
+    parser.add_argument("output", help="WAV file to write")
+    parser.add_argument("--duration", type=float, default=300.0, help="seconds of audio")
+    parser.add_argument("--sample-rate", type=int, default=8000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    info = write_call(args.output, args.duration, sample_rate=args.sample_rate, seed=args.seed)
+    print(f"Wrote {info['duration']:.1f}s call with {len(info['segments'])} segments to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read when app modules are imported: point them at a
+# throwaway SQLite database and data directories first
+_workdir = tempfile.mkdtemp(prefix="whisper-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+for _name in ("UPLOAD_DIR", "PROCESSED_DIR", "CHUNKS_DIR", "EXPORTS_DIR", "FEATURES_DIR"):
+    os.environ[_name] = os.path.join(_workdir, _name.lower())
+os.environ["ASR_ENGINE"] = "stub"
+os.environ["WHISPER_DEVICE"] = "cpu"
+os.environ["WORKER_METRICS_PORT"] = "0"
+os.environ["PROGRESS_BACKEND"] = "memory"
+os.environ["GRADIO_ENABLED"] = "false"
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables."""
+    from app.db.base import SessionLocal, engine
+    from app.models import models  # noqa: F401 (registers the tables)
+    from app.models.base import Base
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,170 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.core.audio import AudioBuffer
+from app.tasks.audio_processing import detect_silence, plan_chunks
+
+RATE = 16000
+
+def reference_detect_silence(audio: AudioBuffer, min_silence_len=500, silence_thresh=-40):
+    """The per-sample loop detect_silence replaced, on pydub-style normalized samples."""
+    samples = audio.samples.astype(np.float32) / 32768.0
+    dbfs = 20 * np.log10(np.abs(samples) + 1e-6)
+
+    silent_ranges = []
+    in_silence = False
+    silence_start = 0
+    for i, db in enumerate(dbfs):
+        if db < silence_thresh and not in_silence:
+            in_silence = True
+            silence_start = i
+        elif db >= silence_thresh and in_silence:
+            in_silence = False
+            if (i - silence_start) >= min_silence_len * audio.sample_rate / 1000.0:
+                silent_ranges.append([silence_start, i])
+    if in_silence and (len(dbfs) - silence_start) >= min_silence_len * audio.sample_rate / 1000.0:
+        silent_ranges.append([silence_start, len(dbfs)])
+    return silent_ranges
+
+def speech(seconds: float, rng: np.random.Generator) -> np.ndarray:
+    """Loud noise, well above -40 dBFS except for the odd sample."""
+    return rng.integers(-20000, 20000, int(seconds * RATE), dtype=np.int16)
+
+def silence(seconds: float, rng: np.random.Generator, amplitude: int = 100) -> np.ndarray:
+    return rng.integers(-amplitude, amplitude, int(seconds * RATE), dtype=np.int16)
+
+def buffer(*parts: np.ndarray) -> AudioBuffer:
+    return AudioBuffer(np.ascontiguousarray(np.concatenate(parts)), RATE)
+
+def synthetic_buffers():
+    rng = np.random.default_rng(0)
+    return {
+        "leading_silence": buffer(silence(1.0, rng), speech(2.0, rng)),
+        "trailing_silence": buffer(speech(2.0, rng), silence(1.0, rng)),
+        "leading_and_trailing": buffer(silence(0.7, rng), speech(1.0, rng), silence(0.6, rng)),
+        "short_gaps": buffer(speech(1.0, rng), silence(0.3, rng), speech(1.0, rng), silence(0.49, rng), speech(0.5, rng)),
+        "long_and_short_gaps": buffer(speech(1.0, rng), silence(0.5, rng), speech(0.2, rng), silence(1.2, rng), speech(1.0, rng)),
+        "all_silent": buffer(silence(2.0, rng)),
+        "all_speech": buffer(speech(2.0, rng)),
+        "digital_silence": buffer(np.zeros(RATE, dtype=np.int16), speech(1.0, rng)),
+        # Samples either side of the -40 dBFS threshold (~327.65)
+        "threshold": buffer(
+            np.full(RATE, 327, dtype=np.int16), np.full(RATE, -328, dtype=np.int16),
+            np.full(RATE, -327, dtype=np.int16), np.full(RATE, 328, dtype=np.int16)
+        ),
+        "extremes": buffer(np.full(RATE, -32768, dtype=np.int16), silence(1.0, rng), np.full(10, 32767, dtype=np.int16)),
+        "empty": AudioBuffer(np.zeros(0, dtype=np.int16), RATE),
+    }
+
+@pytest.mark.parametrize("name", sorted(synthetic_buffers()))
+@pytest.mark.parametrize("min_silence_len,silence_thresh", [(500, -40), (100, -40), (500, -20), (1000, -50)])
+def test_detect_silence_matches_reference(name, min_silence_len, silence_thresh):
+    audio = synthetic_buffers()[name]
+    assert detect_silence(audio, min_silence_len, silence_thresh) == reference_detect_silence(
+        audio, min_silence_len, silence_thresh
+    )
+
+def test_detect_silence_finds_leading_and_trailing_silence():
+    audio = synthetic_buffers()["leading_and_trailing"]
+    ranges = detect_silence(audio)
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == len(audio)
+
+def test_detect_silence_matches_reference_on_random_buffers():
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        parts = [
+            speech(rng.uniform(0.05, 1.5), rng) if i % 2 else silence(rng.uniform(0.05, 1.5), rng, amplitude=300)
+            for i in range(rng.integers(1, 8))
+        ]
+        audio = buffer(*parts)
+        assert detect_silence(audio) == reference_detect_silence(audio)
+
+@pytest.mark.parametrize("max_duration", [1, 5, 30])
+def test_plan_chunks_never_exceeds_max_duration(max_duration):
+    rng = np.random.default_rng(2)
+    for _ in range(10):
+        parts = [
+            speech(rng.uniform(0.1, 40), rng) if i % 2 else silence(rng.uniform(0.1, 2), rng)
+            for i in range(rng.integers(1, 10))
+        ]
+        audio = buffer(*parts)
+        ranges = plan_chunks(audio, max_duration=max_duration)
+        for start, end in ranges:
+            assert 0 <= start < end <= len(audio)
+            assert end - start <= max_duration * RATE
+            assert end - start >= RATE
+        # In order and not overlapping
+        assert all(previous[1] <= start for previous, (start, _) in zip(ranges, ranges[1:]))
+
+def test_plan_chunks_cuts_at_silence():
+    rng = np.random.default_rng(3)
+    audio = buffer(speech(27.0, rng), silence(1.0, rng), speech(10.0, rng))
+    ranges = plan_chunks(audio, max_duration=30)
+    assert ranges[0] == (0, 27 * RATE)
+    assert ranges[-1][1] == len(audio)
+
+@pytest.fixture
+def progress_events(monkeypatch):
+    from app.core import progress
+
+    events = []
+    monkeypatch.setattr(progress._local_broker, "publish", lambda call_id, event: events.append(event["event"]))
+    return events
+
+def add_call(db, file_path: str, **fields) -> int:
+    from app.models.models import Call, CallStatus
+
+    call = Call(original_filename=os.path.basename(file_path), file_path=file_path, status=CallStatus.UPLOADED, **fields)
+    db.add(call)
+    db.commit()
+    return call.id
+
+def test_failed_call_is_marked_failed_once_retries_run_out(db, tmp_path, progress_events):
+    from app.core.config import settings
+    from app.models.models import Call, CallStatus
+    from app.tasks import audio_processing
+
+    call_id = add_call(db, str(tmp_path / "missing.wav"))
+    statuses = []
+    process_call = audio_processing.process_call
+
+    def recording_process_call(*args, **kwargs):
+        statuses.append(db.query(Call.status).filter(Call.id == call_id).scalar())
+        return process_call(*args, **kwargs)
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(audio_processing, "process_call", recording_process_call)
+        assert audio_processing.process_call_task.apply(args=[call_id]).result is False
+
+    attempts = settings.PROCESS_MAX_RETRIES + 1
+    assert len(statuses) == attempts
+    # Not failed between attempts, only after the last one
+    assert CallStatus.FAILED not in statuses
+    db.expire_all()
+    call = db.get(Call, call_id)
+    assert call.status == CallStatus.FAILED
+    assert call.metadata_["attempts"] == attempts
+    assert progress_events.count("failed") == 1
+
+def test_redelivered_call_is_failed_past_the_attempt_limit(db, tmp_path, monkeypatch, progress_events):
+    from app.core.config import settings
+    from app.models.models import Call, CallStatus
+    from app.tasks import audio_processing
+
+    # Every earlier delivery lost its worker before retrying or failing
+    call_id = add_call(db, str(tmp_path / "call.wav"), metadata_={"attempts": settings.PROCESS_MAX_RETRIES + 1})
+    monkeypatch.setattr(audio_processing, "process_call", lambda *args, **kwargs: pytest.fail("processed again"))
+
+    assert audio_processing.process_call_task.apply(args=[call_id]).result is False
+    db.expire_all()
+    assert db.get(Call, call_id).status == CallStatus.FAILED
+    assert progress_events == ["failed"]
+
+def test_missing_call_is_not_retried(db, monkeypatch):
+    from app.tasks import audio_processing
+
+    monkeypatch.setattr(audio_processing, "process_call", lambda *args, **kwargs: pytest.fail("processed"))
+    assert audio_processing.process_call_task.apply(args=[12345]).result is False
@@ -0,0 +1,81 @@
+import time
+from typing import Optional
+
+import pytest
+
+from app.core.asr import ASREngine
+from app.core.batching import MicroBatcher
+
+class RecordingEngine(ASREngine):
+    """Transcribes to the input itself and records the batches it ran."""
+
+    name = "recording"
+
+    def __init__(self, error: Optional[Exception] = None):
+        self.batches = []
+        self.error = error
+
+    def transcribe(self, audio, language=None):
+        return {"text": f"{audio}:{language}", "segments": []}
+
+    def transcribe_batch(self, audios, language=None):
+        self.batches.append((list(audios), language))
+        if self.error is not None:
+            raise self.error
+        return [self.transcribe(audio, language=language) for audio in audios]
+
+    def detect_language(self, audio):
+        if audio == "noise":
+            raise ValueError("no speech")
+        return [("hi", 0.9)]
+
+def test_full_batch_runs_without_waiting():
+    engine = RecordingEngine()
+    batcher = MicroBatcher(engine, max_batch_size=4, max_wait=30)
+    started = time.monotonic()
+    futures = [batcher.transcribe(f"a{i}") for i in range(4)]
+    assert [future.result(timeout=5)["text"] for future in futures] == [f"a{i}:None" for i in range(4)]
+    assert time.monotonic() - started < 5
+    assert engine.batches == [(["a0", "a1", "a2", "a3"], None)]
+
+def test_partial_batch_runs_after_max_wait():
+    engine = RecordingEngine()
+    batcher = MicroBatcher(engine, max_batch_size=8, max_wait=0.2)
+    futures = [batcher.transcribe(f"a{i}") for i in range(3)]
+    assert [future.result(timeout=5)["text"] for future in futures] == ["a0:None", "a1:None", "a2:None"]
+    assert engine.batches == [(["a0", "a1", "a2"], None)]
+    assert batcher.batches == 1 and batcher.jobs == 3
+    assert batcher.pending() == 0
+
+def test_batches_are_split_by_language():
+    engine = RecordingEngine()
+    batcher = MicroBatcher(engine, max_batch_size=3, max_wait=30)
+    futures = [batcher.transcribe("a", "en"), batcher.transcribe("b", "hi"), batcher.transcribe("c", "en")]
+    assert [future.result(timeout=5)["text"] for future in futures] == ["a:en", "b:hi", "c:en"]
+    assert sorted(engine.batches) == [(["a", "c"], "en"), (["b"], "hi")]
+
+def test_engine_errors_fail_every_job_of_the_batch():
+    engine = RecordingEngine(error=RuntimeError("out of memory"))
+    batcher = MicroBatcher(engine, max_batch_size=2, max_wait=0.5)
+    futures = [batcher.transcribe("a"), batcher.transcribe("b")]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="out of memory"):
+            future.result(timeout=5)
+
+    # The batcher keeps serving later jobs
+    engine.error = None
+    assert batcher.transcribe("c").result(timeout=5)["text"] == "c:None"
+
+def test_wrong_number_of_results_fails_the_batch():
+    engine = RecordingEngine()
+    engine.transcribe_batch = lambda audios, language=None: []
+    batcher = MicroBatcher(engine, max_batch_size=1, max_wait=0)
+    with pytest.raises(RuntimeError, match="0 results for 1 inputs"):
+        batcher.transcribe("a").result(timeout=5)
+
+def test_language_detection_errors_fail_only_their_job():
+    batcher = MicroBatcher(RecordingEngine(), max_batch_size=2, max_wait=30)
+    failing, passing = batcher.detect_language("noise"), batcher.detect_language("speech")
+    with pytest.raises(ValueError, match="no speech"):
+        failing.result(timeout=5)
+    assert passing.result(timeout=5) == [("hi", 0.9)]
@@ -0,0 +1,74 @@
+import types
+
+import pytest
+
+from app.core.config import settings
+from app.tasks import celery_app as celery_app_module
+from app.tasks.celery_app import route_call, start_worker_metrics, uses_prefork
+
+def worker(pool_cls):
+    return types.SimpleNamespace(pool_cls=pool_cls)
+
+@pytest.fixture
+def metrics_servers(monkeypatch):
+    started = []
+    monkeypatch.setattr(settings, "WORKER_METRICS_PORT", 9100)
+    monkeypatch.setattr(celery_app_module, "start_metrics_server", started.append)
+    return started
+
+def test_uses_prefork():
+    assert uses_prefork(worker("prefork"))
+    assert not uses_prefork(worker("solo"))
+    assert not uses_prefork(worker("threads"))
+
+def test_worker_metrics_need_multiproc_dir_under_prefork(monkeypatch, metrics_servers, caplog):
+    monkeypatch.setattr(celery_app_module, "MULTIPROCESS", False)
+    start_worker_metrics(sender=worker("prefork"))
+    assert metrics_servers == []
+    assert "PROMETHEUS_MULTIPROC_DIR" in caplog.text
+
+def test_worker_metrics_served_with_multiproc_dir(monkeypatch, metrics_servers):
+    monkeypatch.setattr(celery_app_module, "MULTIPROCESS", True)
+    start_worker_metrics(sender=worker("prefork"))
+    assert metrics_servers == [9100]
+
+def test_worker_metrics_served_without_child_processes(monkeypatch, metrics_servers):
+    monkeypatch.setattr(celery_app_module, "MULTIPROCESS", False)
+    start_worker_metrics(sender=worker("solo"))
+    assert metrics_servers == [9100]
+
+def test_worker_metrics_disabled(monkeypatch, metrics_servers):
+    monkeypatch.setattr(settings, "WORKER_METRICS_PORT", 0)
+    start_worker_metrics(sender=worker("solo"))
+    assert metrics_servers == []
+
+@pytest.mark.parametrize("seconds,queue", [
+    (1, "calls.short"),
+    (settings.SHORT_CALL_SECONDS, "calls.short"),
+    (settings.SHORT_CALL_SECONDS + 1, "calls.medium"),
+    (settings.LONG_CALL_SECONDS, "calls.medium"),
+    (settings.LONG_CALL_SECONDS + 1, "calls.long"),
+    (24 * 3600, "calls.long"),
+])
+def test_route_call_queue_thresholds(seconds, queue):
+    assert route_call(duration=seconds)["queue"] == queue
+
+@pytest.mark.parametrize("seconds,priority", [
+    (5, 0), (60, 0), (119, 0), (120, 1), (239, 1), (240, 2), (3600, 5), (10 ** 6, 9),
+])
+def test_route_call_priority_steps_per_doubling(seconds, priority):
+    assert route_call(duration=seconds)["priority"] == priority
+
+def test_route_call_priority_grows_with_duration():
+    priorities = [route_call(duration=seconds)["priority"] for seconds in range(1, 200000, 97)]
+    assert priorities == sorted(priorities)
+
+def test_route_call_estimates_from_file_size():
+    size = (settings.SHORT_CALL_SECONDS + 1) * settings.UPLOAD_BYTES_PER_SECOND
+    assert route_call(file_size=size)["queue"] == "calls.medium"
+    # A probed duration wins over the estimate
+    assert route_call(duration=30, file_size=size) == {"queue": "calls.short", "priority": 0}
+
+def test_route_call_unknown_duration():
+    assert route_call() == {"queue": "calls.medium", "priority": 5}
+    assert route_call(duration=0, file_size=0) == {"queue": "calls.medium", "priority": 5}
@@ -0,0 +1,99 @@
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import chunks
+from app.api.v1.endpoints.chunks import CHUNK_FIELDS, ChunkResponse, parse_list_param
+from app.core.responses import rows_response
+from app.db.base import get_db
+from app.models.models import Call, Chunk, ChunkStatus, Review, SpeakerRole, User
+
+CREATED = datetime(2026, 1, 2, 3, 4, 5, 678901)
+
+def test_parse_list_param_keeps_canonical_order():
+    assert parse_list_param(" status , id,,start_time,status", CHUNK_FIELDS, "fields") == ("id", "start_time", "status")
+
+def test_parse_list_param_empty():
+    assert parse_list_param(None, CHUNK_FIELDS, "fields") == ()
+    assert parse_list_param("", CHUNK_FIELDS, "fields") == ()
+    assert parse_list_param(" , ", CHUNK_FIELDS, "fields") == ()
+
+def test_parse_list_param_rejects_unknown_entries():
+    with pytest.raises(HTTPException) as excinfo:
+        parse_list_param("id,file_path,secret", CHUNK_FIELDS, "fields")
+    assert excinfo.value.status_code == 400
+    assert excinfo.value.detail.startswith("Unknown fields: file_path, secret (allowed: id, call_id,")
+
+def test_rows_response_encodes_like_pydantic():
+    row = {
+        "id": 1, "call_id": 2, "start_time": 0.0, "end_time": 1.5, "duration": 1.5,
+        "original_text": "नमस्ते", "corrected_text": None,
+        "speaker_role": SpeakerRole.AGENT, "status": ChunkStatus.APPROVED,
+        "confidence": 0.25, "avg_logprob": None, "no_speech_prob": None, "compression_ratio": None,
+        "review_priority": 1.0, "lease_expires_at": None, "created_at": CREATED, "updated_at": CREATED,
+    }
+    expected = ChunkResponse.model_validate(row).model_dump(mode="json")
+    response = rows_response([row])
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == [expected]
+
+@pytest.fixture
+def client(db):
+    reviewer = User(email="reviewer@example.com", hashed_password="x")
+    call = Call(original_filename="call.wav", file_path="/data/call.wav", duration=12.5, language="hi")
+    db.add_all([reviewer, call])
+    db.flush()
+    for i in range(3):
+        db.add(Chunk(
+            call_id=call.id, file_path=f"/data/{i}.wav", start_time=i * 5.0, end_time=i * 5.0 + 5,
+            duration=5.0, original_text=f"text {i}", status=ChunkStatus.PENDING,
+            speaker_role=SpeakerRole.UNKNOWN, confidence=1.0 - i / 10,
+            created_at=CREATED, updated_at=CREATED
+        ))
+    db.flush()
+    first = db.query(Chunk).order_by(Chunk.id).first()
+    db.add_all([
+        Review(chunk_id=first.id, reviewer_id=reviewer.id, notes="second", created_at=datetime(2026, 1, 4)),
+        Review(chunk_id=first.id, reviewer_id=reviewer.id, notes="first", created_at=datetime(2026, 1, 3)),
+    ])
+    db.commit()
+
+    app = FastAPI()
+    app.include_router(chunks.router, prefix="/chunks")
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+def test_list_chunks_returns_the_response_model(client):
+    items = client.get("/chunks/", params={"sort_by": "start_time"}).json()
+    assert len(items) == 3
+    for item in items:
+        assert item == ChunkResponse.model_validate(item).model_dump(mode="json")
+        assert list(item) == list(CHUNK_FIELDS)
+    assert items[0]["created_at"] == CREATED.isoformat()
+    assert items[0]["status"] == "pending"
+
+def test_list_chunks_projects_fields(client):
+    items = client.get("/chunks/", params={"fields": "status,start_time", "sort_by": "confidence"}).json()
+    assert items == [
+        {"id": items[i]["id"], "start_time": start, "status": "pending"}
+        for i, start in enumerate([10.0, 5.0, 0.0])
+    ]
+
+def test_list_chunks_embeds_call_and_reviews(client):
+    items = client.get("/chunks/", params={"fields": "id", "include": "reviews,call", "sort_by": "start_time"}).json()
+    call = {
+        "id": items[0]["call"]["id"], "original_filename": "call.wav", "duration": 12.5,
+        "language": "hi", "status": "uploaded",
+    }
+    assert all(item["call"] == call for item in items)
+    assert [review["notes"] for review in items[0]["reviews"]] == ["first", "second"]
+    assert items[1]["reviews"] == []
+    assert set(items[0]["reviews"][0]) == {"id", "reviewer_id", "notes", "changes", "created_at"}
+
+def test_list_chunks_rejects_unknown_fields(client):
+    response = client.get("/chunks/", params={"fields": "file_path"})
+    assert response.status_code == 400
+    assert "file_path" in response.json()["detail"]
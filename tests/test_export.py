@@ -0,0 +1,201 @@
+import json
+import os
+import tarfile
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.tasks.export import (
+    SPLIT_HASH_MODULUS, SPLIT_HASH_MULTIPLIER, assign_split, compact_manifest, load_index,
+    split_bucket_expr, summarize_splits
+)
+
+T0 = datetime(2026, 1, 1)
+
+def shard(split: str, num_samples: int) -> dict:
+    return {"path": f"{split}.tar", "split": split, "num_samples": num_samples}
+
+def index(chunk_ids, shards, durations=None) -> dict:
+    return {
+        "chunk_id": np.array(chunk_ids, dtype=np.int64),
+        "shard": np.array(shards, dtype=np.int32),
+        "duration": np.array(durations or [1.0] * len(chunk_ids), dtype=np.float32),
+    }
+
+def reference_bucket(call_id: int, salt: int) -> int:
+    return ((call_id + salt) * SPLIT_HASH_MULTIPLIER % SPLIT_HASH_MODULUS) * 100 // SPLIT_HASH_MODULUS
+
+SPLIT_CASES = [
+    (call_id, salt)
+    for call_id in [1, 2, 3, 99, 1000, 65537, 10 ** 6 + 3, 2 ** 31 - 1]
+    for salt in [0, 1, 7, 12345]
+]
+
+def test_split_bucket_matches_reference_in_sqlite(db):
+    from sqlalchemy import Integer, literal, select
+
+    for call_id, salt in SPLIT_CASES:
+        bucket = db.execute(select(split_bucket_expr(literal(call_id, Integer), salt))).scalar()
+        assert bucket == reference_bucket(call_id, salt)
+        assert 0 <= bucket < 100
+
+def test_split_bucket_is_the_same_integer_expression_in_postgres():
+    from sqlalchemy.dialects import postgresql, sqlite
+
+    from app.models.models import Chunk
+
+    expr = split_bucket_expr(Chunk.call_id, 7)
+    literal_binds = {"literal_binds": True}
+    postgres = str(expr.compile(dialect=postgresql.dialect(), compile_kwargs=literal_binds))
+    assert postgres.replace("%%", "%") == str(expr.compile(dialect=sqlite.dialect(), compile_kwargs=literal_binds))
+    # Integer operands throughout: PostgreSQL's / and % on non-negative
+    # integers are Python's // and %
+    python = postgres.replace("%%", "%").replace("/", "//")
+    for call_id in {call_id for call_id, _ in SPLIT_CASES}:
+        assert eval(python.replace("chunks.call_id", str(call_id))) == reference_bucket(call_id, 7)
+
+def test_compact_manifest_later_delta_wins():
+    base_shards = [shard("train", 2), shard("validation", 1)]
+    base_index = index([1, 2, 3], [0, 0, 1], [1.0, 2.0, 3.0])
+    delta_shards = [shard("train", 1)]
+    delta_index = index([2], [0], [5.0])
+
+    shards, merged = compact_manifest(base_shards, base_index, delta_shards, delta_index, [])
+
+    assert merged["chunk_id"].tolist() == [1, 3, 2]
+    assert [shards[i]["path"] for i in merged["shard"]] == ["train.tar", "validation.tar", "train.tar"]
+    assert merged["shard"].tolist() == [0, 1, 2]
+    assert merged["duration"].tolist() == [1.0, 3.0, 5.0]
+    assert [s["live_samples"] for s in shards] == [1, 1, 1]
+
+def test_compact_manifest_drops_removed_chunks_and_empty_shards():
+    base_shards = [shard("train", 2), shard("validation", 1)]
+    base_index = index([1, 2, 3], [0, 0, 1])
+    delta_shards = [shard("train", 1)]
+    delta_index = index([4], [0])
+
+    shards, merged = compact_manifest(base_shards, base_index, delta_shards, delta_index, [3])
+
+    assert merged["chunk_id"].tolist() == [1, 2, 4]
+    # The validation shard has no live samples left and the delta shard moves up
+    assert [s["split"] for s in shards] == ["train", "train"]
+    assert merged["shard"].tolist() == [0, 0, 1]
+    assert summarize_splits(shards, merged) == {"train": {"num_samples": 3, "duration": 3.0}}
+
+def test_compact_manifest_empty_delta():
+    base_shards = [shard("train", 1)]
+    base_index = index([1], [0])
+    shards, merged = compact_manifest(base_shards, base_index, [], index([], []), [])
+    assert merged["chunk_id"].tolist() == [1]
+    assert summarize_splits(shards, merged)["train"]["num_samples"] == 1
+
+@pytest.fixture
+def corpus(db, tmp_path, monkeypatch):
+    """Adds approved chunks whose audio exists on disk, to one call unless given another."""
+    from app.models.models import Call, Chunk, ChunkStatus
+
+    monkeypatch.setattr(settings, "EXPORTS_DIR", str(tmp_path / "exports"))
+    call = Call(original_filename="call.wav", file_path=str(tmp_path / "call.wav"))
+    db.add(call)
+    db.flush()
+
+    def add_chunk(
+        updated_at: datetime, status=ChunkStatus.APPROVED, text: str = "text", call_id: int = call.id
+    ) -> Chunk:
+        path = tmp_path / f"chunk-{os.urandom(4).hex()}.wav"
+        path.write_bytes(b"RIFF" + os.urandom(64))
+        chunk = Chunk(
+            call_id=call_id, file_path=str(path), start_time=0.0, end_time=1.0, duration=1.0,
+            original_text=text, status=status, created_at=updated_at, updated_at=updated_at
+        )
+        db.add(chunk)
+        db.commit()
+        return chunk
+
+    return add_chunk
+
+def run_export(db, incremental: bool) -> dict:
+    from app.models.models import Export
+    from app.tasks.export import export_dataset
+
+    export = Export(name="test", file_path="", metadata_={"format": "webdataset", "incremental": incremental})
+    db.add(export)
+    db.flush()
+    export.file_path = os.path.join(settings.EXPORTS_DIR, f"export_{export.id:05d}")
+    db.commit()
+
+    assert export_dataset(export.id)
+    with open(os.path.join(export.file_path, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    manifest["index"] = load_index(os.path.join(export.file_path, "index.npz"))
+    return manifest
+
+def sample_texts(manifest: dict) -> dict:
+    """chunk id -> exported text, read from the shard each live sample points at."""
+    texts = {}
+    for chunk_id, number in zip(manifest["index"]["chunk_id"].tolist(), manifest["index"]["shard"].tolist()):
+        with tarfile.open(os.path.join(settings.EXPORTS_DIR, manifest["shards"][number]["path"])) as tar:
+            member = tar.extractfile(f"chunk_{chunk_id:010d}.json")
+            texts[chunk_id] = json.load(member)["text"]
+    return texts
+
+def test_incremental_export_merges_changes(db, corpus):
+    from app.models.models import ChunkStatus
+
+    edited = corpus(T0 - timedelta(minutes=60), text="first")
+    unapproved = corpus(T0 - timedelta(minutes=50), text="unapproved")
+    deleted = corpus(T0 - timedelta(minutes=40), text="deleted")
+    # Within the watermark lag: re-scanned by the delta but unchanged
+    recent = corpus(T0 - timedelta(minutes=5), text="recent")
+    corpus(T0, status=ChunkStatus.PENDING)
+
+    base = run_export(db, incremental=False)
+    assert sample_texts(base) == {
+        edited.id: "first", unapproved.id: "unapproved", deleted.id: "deleted", recent.id: "recent"
+    }
+    assert base["watermark"]["updated_at"] == T0.isoformat()
+
+    edited.corrected_text = "second"
+    edited.updated_at = T0 + timedelta(minutes=10)
+    unapproved.status = ChunkStatus.REVIEWED
+    unapproved.updated_at = T0 + timedelta(minutes=11)
+    db.delete(deleted)
+    db.commit()
+    # Committed after the base export read its watermark, stamped before it
+    late = corpus(T0 - timedelta(minutes=1), text="late")
+    new = corpus(T0 + timedelta(minutes=12), text="new")
+
+    delta = run_export(db, incremental=True)
+    assert delta["parent_export_id"] == base["export_id"]
+    assert sample_texts(delta) == {edited.id: "second", recent.id: "recent", late.id: "late", new.id: "new"}
+    assert sorted(delta["index"]["chunk_id"].tolist()) == sorted([edited.id, recent.id, late.id, new.id])
+    assert sum(split["num_samples"] for split in delta["splits"].values()) == 4
+    assert sum(shard["live_samples"] for shard in delta["shards"]) == 4
+
+def split_of(manifest: dict, chunk_id: int) -> str:
+    position = manifest["index"]["chunk_id"].tolist().index(chunk_id)
+    return manifest["shards"][int(manifest["index"]["shard"][position])]["split"]
+
+def test_calls_keep_their_split_across_exports(db, corpus, tmp_path):
+    from app.models.models import Call
+
+    calls = [Call(original_filename=f"{i}.wav", file_path=str(tmp_path / f"{i}.wav")) for i in range(40)]
+    db.add_all(calls)
+    db.commit()
+    first = {call.id: corpus(T0 - timedelta(hours=2), call_id=call.id) for call in calls}
+
+    base = run_export(db, incremental=False)
+    later = {call.id: corpus(T0 + timedelta(minutes=5), call_id=call.id) for call in calls}
+    delta = run_export(db, incremental=True)
+    full = run_export(db, incremental=False)
+
+    train_split = base["train_split"]
+    for call in calls:
+        split = assign_split(reference_bucket(call.id, 0), train_split)
+        assert split_of(base, first[call.id].id) == split
+        for manifest in (delta, full):
+            assert split_of(manifest, first[call.id].id) == split
+            assert split_of(manifest, later[call.id].id) == split
+    assert {split_of(full, chunk.id) for chunk in first.values()} == {"train", "validation"}
@@ -0,0 +1,158 @@
+import io
+import sys
+import types
+import traceback
+
+import billiard
+import numpy as np
+import soundfile as sf
+
+from app.tasks.features import (
+    FeatureCache,
+    FeatureExportBuilder,
+    SAMPLE_RATE,
+    audio_hash,
+    compute_features,
+    merge_feature_index,
+)
+
+def wav_blob(seed: int, seconds: float = 1.0) -> bytes:
+    samples = np.random.default_rng(seed).integers(-8000, 8000, int(seconds * SAMPLE_RATE)).astype(np.int16)
+    out = io.BytesIO()
+    sf.write(out, samples, SAMPLE_RATE, subtype="PCM_16", format="WAV")
+    return out.getvalue()
+
+def build(root: str, blobs, workers: int = 2):
+    builder = FeatureExportBuilder(FeatureCache(root, shard_size=4), batch_size=2, workers=workers)
+    try:
+        for chunk_id, blob in enumerate(blobs):
+            builder.add(chunk_id, blob, "")
+        return builder.finish()
+    except BaseException:
+        builder.close()
+        raise
+
+def _build_in_child(root: str, blobs, results):
+    try:
+        index, shard_names = build(root, blobs)
+        results.put(("ok", index["chunk_id"].tolist(), shard_names))
+    except BaseException:
+        results.put(("error", traceback.format_exc(), None))
+
+def test_builder_runs_in_daemonic_process(tmp_path):
+    """Celery prefork children are daemonic billiard processes started by fork."""
+    context = billiard.get_context("fork")
+    results = context.Queue()
+    blobs = [wav_blob(seed) for seed in range(5)]
+    child = context.Process(target=_build_in_child, args=(str(tmp_path), blobs, results), daemon=True)
+    child.start()
+    try:
+        status, value, shard_names = results.get(timeout=120)
+    finally:
+        child.join(timeout=30)
+    assert status == "ok", value
+    assert value == list(range(5))
+
+    cache = FeatureCache(str(tmp_path), shard_size=4)
+    shard, row = cache.lookup(audio_hash(blobs[3]))
+    features = np.load(tmp_path / "mel80" / f"{cache.shard_names[shard]}.npy")[row]
+    np.testing.assert_array_equal(features, compute_features([blobs[3]])[0])
+
+def features(rows: int, value: float = 0.0) -> np.ndarray:
+    return np.full((rows, 80, 4), value, dtype=np.float16)
+
+def test_feature_cache_index_round_trip(tmp_path):
+    cache = FeatureCache(str(tmp_path), shard_size=2)
+    cache.add(["a", "b"], features(2, 1))
+    cache.add(["c"], features(1, 2))
+    cache.flush()
+    cache.save_index()
+    assert (tmp_path / "mel80" / "keys-index.npz").exists()
+
+    reopened = FeatureCache(str(tmp_path), shard_size=2)
+    assert reopened.shard_names == cache.shard_names
+    assert {key: reopened.lookup(key) for key in "abc"} == {key: cache.lookup(key) for key in "abc"}
+    assert reopened.lookup("d") is None
+    # Nothing new since the index was written
+    assert not reopened._index_stale
+    # New shards continue the numbering
+    reopened.add(["d"], features(1, 3))
+    reopened.flush()
+    assert reopened.shard_names[-1] == "shard-00002"
+
+def test_feature_cache_reads_shards_written_after_the_index(tmp_path):
+    cache = FeatureCache(str(tmp_path))
+    cache.add(["a"], features(1))
+    cache.flush()
+    cache.save_index()
+    # Another export writing to the same cache without saving the index
+    other = FeatureCache(str(tmp_path), prefix="other")
+    other.add(["b"], features(1))
+    other.flush()
+
+    reopened = FeatureCache(str(tmp_path))
+    assert reopened.lookup("a") == (0, 0)
+    assert reopened.lookup("b") == (1, 0)
+    assert reopened._index_stale
+    reopened.save_index()
+    assert FeatureCache(str(tmp_path)).lookup("b") == (1, 0)
+
+def test_feature_cache_rebuilds_index_naming_removed_shards(tmp_path):
+    cache = FeatureCache(str(tmp_path))
+    cache.add(["a"], features(1))
+    cache.flush()
+    cache.add(["b"], features(1))
+    cache.flush()
+    cache.save_index()
+    (tmp_path / "mel80" / "shard-00000.keys.npy").unlink()
+
+    reopened = FeatureCache(str(tmp_path))
+    assert reopened.lookup("a") is None
+    assert reopened.lookup("b") == (0, 0)
+    assert reopened.shard_names == ["shard-00001"]
+
+def index(chunk_ids, shards, rows, token_runs):
+    return {
+        "chunk_id": np.array(chunk_ids, dtype=np.int64),
+        "shard": np.array(shards, dtype=np.int32),
+        "row": np.array(rows, dtype=np.int32),
+        "tokens": np.array([token for run in token_runs for token in run], dtype=np.int32),
+        "token_offsets": np.concatenate([[0], np.cumsum([len(run) for run in token_runs])]).astype(np.int64),
+    }
+
+def token_runs(merged):
+    offsets = merged["token_offsets"]
+    return [merged["tokens"][start:end].tolist() for start, end in zip(offsets[:-1], offsets[1:])]
+
+def test_merge_feature_index():
+    base = index([1, 2, 3], [0, 1, 0], [0, 0, 1], [[10, 11], [20], [30, 31, 32]])
+    # Chunk 2 changed since the base export and is in the delta again
+    delta = index([2, 4], [0, 1], [5, 6], [[21, 22], []])
+    merged, shard_names = merge_feature_index(
+        base, ["s0", "s1"], delta, ["s1", "s2"], stale_ids=np.array([2])
+    )
+    assert shard_names == ["s0", "s1", "s2"]
+    assert merged["chunk_id"].tolist() == [1, 3, 2, 4]
+    assert [shard_names[shard] for shard in merged["shard"]] == ["s0", "s0", "s1", "s2"]
+    assert merged["row"].tolist() == [0, 1, 5, 6]
+    assert token_runs(merged) == [[10, 11], [30, 31, 32], [21, 22], []]
+
+def test_merge_feature_index_with_empty_delta():
+    base = index([1], [0], [0], [[7]])
+    delta = index([], [], [], [])
+    merged, shard_names = merge_feature_index(base, ["s0"], delta, [], stale_ids=np.array([], dtype=np.int64))
+    assert shard_names == ["s0"]
+    assert merged["chunk_id"].tolist() == [1]
+    assert token_runs(merged) == [[7]]
+
+def test_tokenizer_load_failure_falls_back(monkeypatch):
+    from app.tasks import features as features_module
+
+    class Tokenizer:
+        @classmethod
+        def from_pretrained(cls, name):
+            raise OSError(f"Can't load tokenizer for '{name}'")
+
+    monkeypatch.setitem(sys.modules, "transformers", types.SimpleNamespace(WhisperTokenizerFast=Tokenizer))
+    monkeypatch.setattr(features_module, "_feature_tokenizer", None)
+    assert features_module.get_feature_tokenizer() is None
@@ -0,0 +1,122 @@
+import os
+import math
+import traceback
+
+import billiard
+import numpy as np
+import pytest
+import soundfile as sf
+
+from app.core.config import settings
+from app.core.pools import ProcessPool
+from app.tasks.audio_processing import convert_audio, split_audio
+from app.tasks.preprocessing import PreprocessingError, preprocess_call, segment_bounds
+
+def test_segment_bounds_empty():
+    assert segment_bounds(0, 100) == [(0, 0)]
+    assert segment_bounds(0, 100, align=16) == [(0, 0)]
+
+def test_segment_bounds_shorter_than_a_segment():
+    assert segment_bounds(50, 100) == [(0, 50)]
+    assert segment_bounds(50, 100, align=16) == [(0, 50)]
+    assert segment_bounds(100, 100) == [(0, 100)]
+
+def test_segment_bounds_alignment():
+    assert segment_bounds(10, 3, align=4) == [(0, 4), (4, 8), (8, 10)]
+    assert segment_bounds(48000, 16000, align=16000) == [(0, 16000), (16000, 32000), (32000, 48000)]
+
+@pytest.mark.parametrize("total", [1, 7, 99, 100, 101, 1000, 16001, 123457])
+@pytest.mark.parametrize("segment,align", [(1, 1), (10, 1), (100, 1), (100, 16), (300, 160), (1000, 1000)])
+def test_segment_bounds_cover_total(total, segment, align):
+    bounds = segment_bounds(total, segment, align)
+    assert bounds[0][0] == 0
+    assert bounds[-1][1] == total
+    assert all(end == next_start for (_, end), (next_start, _) in zip(bounds, bounds[1:]))
+    assert all(start % align == 0 and start < end for start, end in bounds)
+    assert all(end - start <= math.ceil(segment / align) * align for start, end in bounds)
+
+def write_call(path: str, seconds: int, sample_rate: int = 44100):
+    """Stereo 44.1 kHz speech-like noise with a pause every few seconds."""
+    rng = np.random.default_rng(0)
+    samples = rng.integers(-12000, 12000, (seconds * sample_rate, 2)).astype(np.int16)
+    for start in range(4, seconds, 7):
+        samples[start * sample_rate:int((start + 0.8) * sample_rate)] //= 200
+    sf.write(path, samples, sample_rate, subtype="PCM_16")
+
+@pytest.fixture
+def pool():
+    pool = ProcessPool(2)
+    yield pool
+    pool.shutdown(cancel_futures=True)
+
+@pytest.fixture
+def short_segments(monkeypatch):
+    # Several decode segments, so stitching is exercised
+    monkeypatch.setattr(settings, "PREPROCESS_SEGMENT_SECONDS", 20)
+    monkeypatch.setattr(settings, "PREPROCESS_WORKERS", 2)
+
+def test_preprocess_call_matches_serial_conversion(tmp_path, pool, short_segments):
+    input_path = str(tmp_path / "call.wav")
+    write_call(input_path, 70)
+
+    serial_wav = str(tmp_path / "serial" / "call.wav")
+    assert convert_audio(input_path, serial_wav)
+    serial_chunks = split_audio(serial_wav, str(tmp_path / "serial_chunks"))
+
+    parallel_wav = str(tmp_path / "parallel" / "call.wav")
+    duration, parallel_chunks = preprocess_call(
+        pool, input_path, parallel_wav, str(tmp_path / "parallel_chunks"), 70.0
+    )
+
+    serial_audio, _ = sf.read(serial_wav, dtype="int16")
+    parallel_audio, _ = sf.read(parallel_wav, dtype="int16")
+    np.testing.assert_array_equal(parallel_audio, serial_audio)
+    assert duration == len(serial_audio) / settings.AUDIO_SAMPLE_RATE
+
+    assert len(serial_chunks) > 2
+    assert [
+        {key: value for key, value in chunk.items() if key != "path"} for chunk in parallel_chunks
+    ] == [
+        {key: value for key, value in chunk.items() if key != "path"} for chunk in serial_chunks
+    ]
+    for parallel, serial in zip(parallel_chunks, serial_chunks):
+        assert os.path.basename(parallel["path"]) == os.path.basename(serial["path"])
+        with open(parallel["path"], "rb") as a, open(serial["path"], "rb") as b:
+            assert a.read() == b.read()
+
+def test_preprocess_call_raises_preprocessing_error_for_undecodable_input(tmp_path, pool, short_segments):
+    input_path = str(tmp_path / "call.wav")
+    with open(input_path, "wb") as f:
+        f.write(b"not audio" * 1000)
+    with pytest.raises(PreprocessingError):
+        preprocess_call(pool, input_path, str(tmp_path / "out.wav"), str(tmp_path / "chunks"), 30.0)
+
+def _preprocess_in_child(tmp_path: str, results):
+    try:
+        settings.PREPROCESS_SEGMENT_SECONDS = 20
+        input_path = os.path.join(tmp_path, "call.wav")
+        write_call(input_path, 30)
+        pool = ProcessPool(2)
+        try:
+            duration, chunks = preprocess_call(
+                pool, input_path, os.path.join(tmp_path, "out.wav"), os.path.join(tmp_path, "chunks"), 30.0
+            )
+        finally:
+            pool.shutdown()
+        results.put(("ok", duration, len(chunks)))
+    except BaseException:
+        results.put(("error", traceback.format_exc(), None))
+
+def test_preprocess_call_runs_in_daemonic_process(tmp_path):
+    """Celery prefork children are daemonic billiard processes started by fork."""
+    context = billiard.get_context("fork")
+    results = context.Queue()
+    child = context.Process(target=_preprocess_in_child, args=(str(tmp_path), results), daemon=True)
+    child.start()
+    try:
+        status, value, chunk_count = results.get(timeout=120)
+    finally:
+        child.join(timeout=30)
+    assert status == "ok", value
+    assert value == 30.0
+    assert chunk_count > 0
@@ -0,0 +1,47 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import profiling
+from app.core.config import settings
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.middleware("http")(profiling.profile_request)
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    return TestClient(app)
+
+def profiled(client):
+    return client.get("/ping", headers={settings.PROFILING_HEADER: "1"})
+
+def test_profiles_flagged_requests(client):
+    response = profiled(client)
+    profile = profiling.profile_store.get(response.headers["X-Profile-Id"])
+    assert profile.profiler == "cprofile"
+    assert profile.report
+
+def test_failing_profiler_releases_lock(client, monkeypatch):
+    def broken_runner():
+        raise RuntimeError("profiler unavailable")
+
+    monkeypatch.setattr(profiling, "_make_runner", broken_runner)
+    with pytest.raises(RuntimeError):
+        profiled(client)
+    assert not profiling._profiler_lock.locked()
+
+    monkeypatch.undo()
+    profile = profiling.profile_store.get(profiled(client).headers["X-Profile-Id"])
+    assert profile.profiler == "cprofile"
+
+def test_concurrent_request_is_not_profiled(client):
+    profiling._profiler_lock.acquire()
+    try:
+        profile = profiling.profile_store.get(profiled(client).headers["X-Profile-Id"])
+    finally:
+        profiling._profiler_lock.release()
+    assert profile.profiler is None
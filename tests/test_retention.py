@@ -0,0 +1,143 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from app.core.config import settings
+from app.models.models import Call, CallStatus, Chunk
+from app.tasks.retention import run_retention
+
+OLD = time.time() - 7 * 24 * 3600
+
+@pytest.fixture
+def data_dirs(tmp_path, monkeypatch):
+    for name in ("UPLOAD_DIR", "PROCESSED_DIR", "CHUNKS_DIR"):
+        path = tmp_path / name.lower()
+        path.mkdir()
+        monkeypatch.setattr(settings, name, str(path))
+    return tmp_path
+
+def write_file(path, old: bool = True, data: bytes = b"data") -> str:
+    path = str(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    if old:
+        os.utime(path, (OLD, OLD))
+    return path
+
+def write_wav(path, old: bool = True) -> str:
+    samples = (np.sin(np.arange(16000) / 10) * 10000).astype(np.int16)
+    sf.write(str(path), samples, 16000, subtype="PCM_16")
+    if old:
+        os.utime(path, (OLD, OLD))
+    return str(path)
+
+def add_call(db, upload: str, status=CallStatus.PROCESSED, age=timedelta(days=30)) -> Call:
+    call = Call(
+        original_filename=os.path.basename(upload), file_path=upload, status=status,
+        updated_at=datetime.utcnow() - age
+    )
+    db.add(call)
+    db.commit()
+    return call
+
+def add_chunk(db, call: Call, file_path: str, timings_path: str = None):
+    db.add(Chunk(
+        call_id=call.id, file_path=file_path, timings_path=timings_path,
+        start_time=0.0, end_time=1.0, duration=1.0
+    ))
+    db.commit()
+
+def all_files(root) -> dict:
+    files = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            with open(path, "rb") as f:
+                files[path] = f.read()
+    return files
+
+def test_referenced_files_survive(db, data_dirs):
+    upload = write_file(data_dirs / "upload_dir" / "call.mp3")
+    call = add_call(db, upload)
+    chunk = write_file(data_dirs / "chunks_dir" / str(call.id) / "chunk_0000.wav")
+    timings = write_file(data_dirs / "chunks_dir" / str(call.id) / "chunk_0000.timings")
+    add_chunk(db, call, chunk, timings)
+    orphan_chunk = write_file(data_dirs / "chunks_dir" / str(call.id) / "chunk_0001.wav")
+    orphan_upload = write_file(data_dirs / "upload_dir" / "interrupted.mp3")
+    converted = write_file(data_dirs / "processed_dir" / str(call.id) / "audio.wav")
+    # Still processing: nothing of it is touched
+    running = add_call(db, write_file(data_dirs / "upload_dir" / "running.mp3"), CallStatus.PROCESSING)
+    running_chunk = write_file(data_dirs / "chunks_dir" / str(running.id) / "chunk_0000.wav")
+    # Not from this database
+    foreign = write_file(data_dirs / "chunks_dir" / str(running.id + 100) / "chunk_0000.wav")
+
+    report = run_retention()
+
+    for path in (upload, chunk, timings, running.file_path, running_chunk, foreign):
+        assert os.path.exists(path)
+    for path in (orphan_chunk, orphan_upload, converted):
+        assert not os.path.exists(path)
+    assert report["categories"]["orphan_chunks"]["files"] == 1
+    assert report["categories"]["orphan_uploads"]["files"] == 1
+    assert report["categories"]["converted_audio"]["files"] == 1
+
+def test_grace_period_keeps_recent_files(db, data_dirs):
+    call = add_call(db, write_file(data_dirs / "upload_dir" / "call.mp3"))
+    recent_chunk = write_file(data_dirs / "chunks_dir" / str(call.id) / "chunk_0000.wav", old=False)
+    recent_upload = write_file(data_dirs / "upload_dir" / "uploading.mp3", old=False)
+    old_upload = write_file(data_dirs / "upload_dir" / "abandoned.mp3")
+    # Processed within RETENTION_PROCESSED_HOURS
+    fresh = add_call(db, write_file(data_dirs / "upload_dir" / "fresh.mp3"), age=timedelta(hours=1))
+    fresh_converted = write_file(data_dirs / "processed_dir" / str(fresh.id) / "audio.wav")
+
+    run_retention()
+
+    assert os.path.exists(recent_chunk)
+    assert os.path.exists(recent_upload)
+    assert os.path.exists(fresh_converted)
+    assert not os.path.exists(old_upload)
+
+def test_dry_run_deletes_nothing(db, data_dirs):
+    call = add_call(db, write_wav(data_dirs / "upload_dir" / "call.wav"))
+    write_file(data_dirs / "chunks_dir" / str(call.id) / "chunk_0000.wav")
+    write_file(data_dirs / "processed_dir" / str(call.id) / "audio.wav")
+    write_file(data_dirs / "upload_dir" / "interrupted.mp3")
+    write_file(data_dirs / "chunks_dir" / str(call.id + 1) / "chunk_0000.wav")
+    before = all_files(data_dirs)
+
+    report = run_retention(dry_run=True)
+
+    assert report["dry_run"]
+    assert report["files"] > 0 and report["bytes"] > 0
+    assert all_files(data_dirs) == before
+    db.expire_all()
+    assert db.get(Call, call.id).file_path == call.file_path
+
+def test_compressed_upload_is_found_by_its_call(db, data_dirs):
+    upload = write_wav(data_dirs / "upload_dir" / "call.wav")
+    samples, _ = sf.read(upload, dtype="int16")
+    call = add_call(db, upload)
+    updated_at = call.updated_at
+
+    report = run_retention()
+
+    db.expire_all()
+    call = db.get(Call, call.id)
+    assert call.file_path.endswith(".flac")
+    assert not os.path.exists(upload)
+    assert np.array_equal(sf.read(call.file_path, dtype="int16")[0], samples)
+    assert call.file_size == os.path.getsize(call.file_path)
+    assert call.metadata_["retention"]["compressed_from"] == "call.wav"
+    # Retention periods are still measured from when the call was processed
+    assert call.updated_at == updated_at
+    assert report["categories"]["compressed_uploads"]["files"] == 1
+
+    # Past the grace period, the next pass still sees it referenced
+    os.utime(call.file_path, (OLD, OLD))
+    run_retention()
+    assert os.path.exists(call.file_path)
@@ -8,10 +8,12 @@ import json
 # API configuration
 API_BASE_URL = "http://localhost:8000/api/v1"
 
+# Chunks fetched per request; more are fetched as the reviewer advances
+CHUNK_PAGE_SIZE = 20
+
 # Cache for storing call and chunk data
 calls_cache = {}
 current_call_id = None
-current_chunk_index = 0
 
 # Helper functions
 def get_auth_headers():
@@ -31,12 +33,25 @@ def fetch_calls() -> List[Dict]:
         print(f"Error fetching calls: {e}")
         return []
 
-def fetch_call_chunks(call_id: int) -> List[Dict]:
-    """Fetch chunks for a specific call."""
+def fetch_call(call_id: int) -> Optional[Dict]:
+    """Fetch a call, including how many of its chunks are ready."""
+    try:
+        response = requests.get(
+            f"{API_BASE_URL}/uploads/{call_id}",
+            headers=get_auth_headers()
+        )
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        print(f"Error fetching call: {e}")
+        return None
+
+def fetch_call_chunks(call_id: int, skip: int = 0, limit: int = CHUNK_PAGE_SIZE) -> List[Dict]:
+    """Fetch a page of a call's chunks in playback order."""
     try:
         response = requests.get(
             f"{API_BASE_URL}/chunks/",
-            params={"call_id": call_id},
+            params={"call_id": call_id, "sort_by": "start_time", "skip": skip, "limit": limit},
             headers=get_auth_headers()
         )
         response.raise_for_status()
@@ -45,6 +60,9 @@ def fetch_call_chunks(call_id: int) -> List[Dict]:
         print(f"Error fetching chunks: {e}")
         return []
 
+def chunk_audio_url(chunk_id: int) -> str:
+    return f"{API_BASE_URL}/chunks/{chunk_id}/audio"
+
 def update_chunk(chunk_id: int, corrected_text: str, speaker_role: str, status: str) -> bool:
     """Update a chunk with corrected text and metadata."""
     try:
@@ -79,6 +97,59 @@ def upload_audio(file_path: str) -> Optional[Dict]:
         print(f"Error uploading file: {e}")
         return None
 
+def stream_call_progress(call_id: int):
+    """Yield progress events for a call from the server-sent event stream."""
+    with requests.get(
+        f"{API_BASE_URL}/uploads/{call_id}/events",
+        headers=get_auth_headers(),
+        stream=True,
+        timeout=(10, None)
+    ) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if line and line.startswith("data: "):
+                yield json.loads(line[len("data: "):])
+
+def format_progress(event: Dict) -> str:
+    """One-line status for a progress event."""
+    call_id = event.get("call_id")
+    kind = event.get("event")
+    if kind == "completed":
+        return f"Call {call_id}: processed ({event.get('chunks_total') or 0} chunks)"
+    if kind == "failed":
+        return f"Call {call_id}: failed - {event.get('error', 'unknown error')}"
+    if kind == "chunk":
+        eta = event.get("eta_seconds")
+        eta_text = f", ~{eta:.0f}s left" if eta is not None else ""
+        return f"Call {call_id}: transcribed {event['chunks_done']}/{event['chunks_total']} chunks{eta_text}"
+    return f"Call {call_id}: {event.get('stage', 'processing')}..."
+
+def start_export(
+    name: str,
+    train_split: int,
+    export_format: str,
+    incremental: bool = False,
+    features: bool = False
+) -> Optional[Dict]:
+    """Start a dataset export of approved chunks."""
+    try:
+        response = requests.post(
+            f"{API_BASE_URL}/exports/",
+            json={
+                "name": name,
+                "train_split": train_split,
+                "format": export_format,
+                "incremental": incremental,
+                "features": features
+            },
+            headers=get_auth_headers()
+        )
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        print(f"Error starting export: {e}")
+        return None
+
 # UI Components
 def create_upload_tab():
     """Create the upload tab UI."""
@@ -103,16 +174,21 @@ def create_upload_tab():
         
         def process_audio(audio_path):
             if not audio_path:
-                return "Error: No audio file provided"
+                yield "Error: No audio file provided"
+                return
             
             try:
                 result = upload_audio(audio_path)
-                if result:
-                    return f"Success! Call ID: {result.get('id')} - {result.get('status')}"
-                else:
-                    return "Error processing audio"
+                if not result:
+                    yield "Error processing audio"
+                    return
+                
+                yield f"Success! Call ID: {result.get('id')} - {result.get('status')}"
+                # Follow processing as it happens instead of polling the call
+                for event in stream_call_progress(result["id"]):
+                    yield format_progress(event)
             except Exception as e:
-                return f"Error: {str(e)}"
+                yield f"Error: {str(e)}"
         
         upload_btn.click(
             fn=process_audio,
@@ -187,6 +263,7 @@ def create_review_tab():
         # State variables
         current_chunk = gr.State(None)
         chunks_list = gr.State([])
+        chunk_index = gr.State(0)
         
         # Event handlers
         def refresh_calls():
@@ -194,37 +271,41 @@ def create_review_tab():
             choices = [(f"{c['id']}: {c['original_filename']}", c['id']) for c in calls]
             return gr.Dropdown(choices=choices)
         
-        def load_chunks(call_id):
-            if not call_id:
-                return [], [], "", "", "unknown", "pending", None
-                
-            chunks = fetch_call_chunks(call_id)
-            if not chunks:
-                return [], [], "", "", "unknown", "pending", None
-                
-            chunk = chunks[0]
-            return (
-                chunks,
-                chunks[0]["file_path"],
-                chunk["original_text"] or "",
-                chunk["corrected_text"] or "",
-                chunk["speaker_role"].lower(),
-                chunk["status"].lower(),
-                chunk
-            )
-        
-        def update_chunk_display(chunks, index):
+        def show_chunk(call_id, chunks, index):
+            """
+            Show chunk `index`, fetching newly available chunks when the
+            reviewer moves past the ones loaded so far. Calls that are still
+            processing gain chunks as they are transcribed.
+            """
+            chunks = list(chunks or [])
+            # Pressing Next while waiting at the end shows the next new chunk
+            index = min(index, len(chunks))
+            if call_id and index >= len(chunks):
+                chunks += fetch_call_chunks(call_id, skip=len(chunks))
+            
             if not chunks or index < 0 or index >= len(chunks):
-                return "", "", "unknown", "pending", None, "No more chunks"
-                
+                # Stay one step past the end so the opposite button comes back
+                index = min(max(index, -1), len(chunks))
+                message = "No more chunks"
+                call = fetch_call(call_id) if call_id and index >= 0 else None
+                if call and call["status"] in ("uploaded", "processing"):
+                    total = call.get("chunks_total")
+                    message = (
+                        f"Waiting for more chunks ({call.get('chunks_ready', 0)} of {total or '?'} ready)"
+                    )
+                return chunks, None, "", "", "unknown", "pending", None, message, index
+            
             chunk = chunks[index]
             return (
-                chunk["file_path"],
+                chunks,
+                chunk_audio_url(chunk["id"]),
                 chunk["original_text"] or "",
+                chunk["corrected_text"] or "",
                 chunk["speaker_role"].lower(),
                 chunk["status"].lower(),
                 chunk,
-                f"Chunk {index + 1} of {len(chunks)}"
+                f"Chunk {index + 1} of {len(chunks)} loaded",
+                index
             )
         
         def save_changes(chunk_data, corrected, speaker, status):
@@ -246,7 +327,7 @@ def create_review_tab():
         )
         
         call_dropdown.change(
-            fn=load_chunks,
+            fn=lambda call_id: show_chunk(call_id, [], 0),
             inputs=call_dropdown,
             outputs=[
                 chunks_list,
@@ -255,33 +336,41 @@ def create_review_tab():
                 corrected_text,
                 speaker_radio,
                 status_radio,
-                current_chunk
+                current_chunk,
+                chunk_info,
+                chunk_index
             ]
         )
         
         next_btn.click(
-            fn=lambda idx, chunks: update_chunk_display(chunks, idx + 1),
-            inputs=[current_chunk_index, chunks_list],
+            fn=lambda call_id, chunks, idx: show_chunk(call_id, chunks, idx + 1),
+            inputs=[call_dropdown, chunks_list, chunk_index],
             outputs=[
+                chunks_list,
                 audio_player,
                 original_text,
+                corrected_text,
                 speaker_radio,
                 status_radio,
                 current_chunk,
-                chunk_info
+                chunk_info,
+                chunk_index
             ]
         )
         
         prev_btn.click(
-            fn=lambda idx, chunks: update_chunk_display(chunks, idx - 1),
-            inputs=[current_chunk_index, chunks_list],
+            fn=lambda call_id, chunks, idx: show_chunk(call_id, chunks, idx - 1),
+            inputs=[call_dropdown, chunks_list, chunk_index],
             outputs=[
+                chunks_list,
                 audio_player,
                 original_text,
+                corrected_text,
                 speaker_radio,
                 status_radio,
                 current_chunk,
-                chunk_info
+                chunk_info,
+                chunk_index
             ]
         )
         
@@ -306,13 +395,28 @@ def create_export_tab():
         
         with gr.Row():
             train_split = gr.Slider(
-                label="Train/Validation Split (%)",
+                label="Train/Validation Split (% of calls)",
                 minimum=50,
                 maximum=100,
                 value=80,
                 step=5
             )
         
+        with gr.Row():
+            export_format = gr.Dropdown(
+                label="Format",
+                choices=["webdataset", "parquet"],
+                value="webdataset"
+            )
+            incremental_checkbox = gr.Checkbox(
+                label="Incremental (only chunks changed since the last export)",
+                value=False
+            )
+            features_checkbox = gr.Checkbox(
+                label="Precompute log-mel features",
+                value=False
+            )
+        
         with gr.Row():
             export_btn = gr.Button("Export Dataset", variant="primary")
         
@@ -322,16 +426,24 @@ def create_export_tab():
             placeholder="Export status will appear here..."
         )
         
-        def export_dataset(split):
+        def export_dataset(split, fmt, incremental, features):
             try:
-                # In a real implementation, this would call your export API
-                return f"Exporting dataset with {split}% training data..."
+                result = start_export(
+                    name=f"export-{datetime.now():%Y%m%d-%H%M%S}",
+                    train_split=int(split),
+                    export_format=fmt,
+                    incremental=incremental,
+                    features=features
+                )
+                if not result:
+                    return "Error starting export"
+                return f"Export {result['id']} started ({fmt}, {int(split)}% training data). Files: {result['file_path']}"
             except Exception as e:
                 return f"Error exporting dataset: {str(e)}"
         
         export_btn.click(
             fn=export_dataset,
-            inputs=train_split,
+            inputs=[train_split, export_format, incremental_checkbox, features_checkbox],
             outputs=export_status
         )
     